@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Measure how throughput scales with threads sharing one Kvdb and Kvs.
+
+Every workload runs with each thread count in --threads, splitting the same
+total number of operations across the threads. Scaling efficiency is the
+throughput relative to perfect scaling of the single-threaded run, so 100%
+means N threads did N times the work of one.
+"""
+
+import threading
+from typing import Callable, Dict, List
+
+from common import PARSER, keys, kvdb_fixture, kvs_fixture, measure, parse_args, report
+
+from hse3 import hse
+
+PARSER.add_argument(
+    "--threads",
+    type=lambda s: [int(n) for n in s.split(",")],
+    default=[1, 2, 4, 8, 16, 32, 64],
+    help="comma separated thread counts",
+)
+
+VALUE = b"v" * 100
+
+
+def run_threads(count: int, fn: Callable[[int], None]) -> None:
+    barrier = threading.Barrier(count)
+
+    def target(t: int) -> None:
+        barrier.wait()
+        fn(t)
+
+    threads = [threading.Thread(target=target, args=(t,)) for t in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def workloads(
+    kvdb: hse.Kvdb, kvs: hse.Kvs, txn_kvs: hse.Kvs, ks: List[bytes]
+) -> Dict[str, Callable[[List[bytes]], None]]:
+    def get(part: List[bytes]) -> None:
+        buf = bytearray(len(VALUE))
+        for k in part:
+            kvs.get(k, buf=buf)
+
+    def put(part: List[bytes]) -> None:
+        for k in part:
+            kvs.put(k, VALUE)
+
+    def scan(part: List[bytes]) -> None:
+        # One short range scan per key
+        with kvs.cursor() as cursor:
+            for k in part:
+                cursor.seek(k)
+                for _ in range(8):
+                    cursor.read()
+
+    def transaction(part: List[bytes]) -> None:
+        txn = kvdb.transaction()
+        for k in part:
+            txn.begin()
+            txn_kvs.put(k, VALUE, txn=txn)
+            txn.commit()
+
+    def mixed(part: List[bytes]) -> None:
+        buf = bytearray(len(VALUE))
+        txn = kvdb.transaction()
+        with kvs.cursor() as cursor:
+            for i, k in enumerate(part):
+                op = i % 10
+                if op < 6:
+                    kvs.get(k, buf=buf)
+                elif op < 8:
+                    kvs.put(k, VALUE)
+                elif op < 9:
+                    cursor.seek(k)
+                    cursor.read()
+                else:
+                    txn.begin()
+                    txn_kvs.put(k, VALUE, txn=txn)
+                    txn.commit()
+
+    for k in ks:
+        kvs.put(k, VALUE)
+
+    return {
+        "get": get,
+        "put": put,
+        "scan": scan,
+        "transaction": transaction,
+        "mixed": mixed,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    kvdb = kvdb_fixture(args)
+    kvs = kvs_fixture(kvdb, "concurrency")
+    txn_kvs = kvs_fixture(
+        kvdb, "concurrency-txn", rparams=("transactions.enabled=true",)
+    )
+
+    ks = keys(args.ops)
+    for name, fn in workloads(kvdb, kvs, txn_kvs, ks).items():
+        base = 0.0
+        for count in args.threads:
+            parts = [ks[t::count] for t in range(count)]
+
+            def run(
+                fn: Callable[[List[bytes]], None] = fn,
+                parts: List[List[bytes]] = parts,
+            ) -> None:
+                run_threads(len(parts), lambda t: fn(parts[t]))
+
+            seconds = measure(run, args.repeat)
+            rate = len(ks) / seconds
+            if count == args.threads[0]:
+                base = rate / count
+            report(f"{name} x{count}", len(ks), seconds)
+            print(f"{'':<40} scaling efficiency {rate / (base * count):>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
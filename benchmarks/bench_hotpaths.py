@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Measure the hot paths of the bindings from a single thread: puts, gets,
+cursor reads and transactional puts of small values.
+
+The values are small so that the time is spent in the bindings and in HSE's
+in-memory paths rather than copying data. This is also the training workload
+of profile-guided builds, see scripts/build/pgo.sh.
+"""
+
+from common import keys, kvdb_fixture, kvs_fixture, measure, parse_args, report
+
+VALUE = b"v" * 64
+
+
+def main() -> None:
+    args = parse_args()
+    kvdb = kvdb_fixture(args)
+    kvs = kvs_fixture(kvdb, "hotpaths")
+    txn_kvs = kvs_fixture(kvdb, "hotpaths-txn", rparams=("transactions.enabled=true",))
+
+    ks = keys(args.ops)
+    buf = bytearray(len(VALUE))
+
+    def put() -> None:
+        for k in ks:
+            kvs.put(k, VALUE)
+
+    def get() -> None:
+        for k in ks:
+            kvs.get(k)
+
+    def get_buf() -> None:
+        for k in ks:
+            kvs.get(k, buf=buf)
+
+    def get_into() -> None:
+        for k in ks:
+            kvs.get_into(k, buf)
+
+    def cursor_read() -> None:
+        with kvs.cursor() as cursor:
+            for _ in cursor.items():
+                pass
+
+    def cursor_seek() -> None:
+        with kvs.cursor() as cursor:
+            for k in ks[::16]:
+                cursor.seek(k)
+                cursor.read()
+
+    def transaction() -> None:
+        txn = kvdb.transaction()
+        for k in ks:
+            txn.begin()
+            txn_kvs.put(k, VALUE, txn=txn)
+            txn.commit()
+
+    for name, fn, ops in (
+        ("put", put, len(ks)),
+        ("get", get, len(ks)),
+        ("get buf", get_buf, len(ks)),
+        ("get_into", get_into, len(ks)),
+        ("cursor read", cursor_read, len(ks)),
+        ("cursor seek+read", cursor_seek, len(ks[::16])),
+        ("transaction put", transaction, len(ks)),
+    ):
+        report(name, ops, measure(fn, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
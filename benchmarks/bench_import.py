@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Measure how long importing each hse3 module takes in a fresh interpreter.
+
+Every import runs in its own ``python -X importtime`` process, and the best
+cumulative time reported for the module over --runs processes is kept, which
+includes the standard library modules it pulls in. The slowest of those are
+listed for hse3.hse, as they are the usual cause of startup regressions.
+
+With --max-ms, the benchmark fails if importing hse3.hse takes longer, so it
+can guard startup time in CI.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from common import PARSER, parse_args
+
+import hse3
+
+PARSER.add_argument(
+    "--runs", type=int, default=20, help="fresh interpreters per module"
+)
+PARSER.add_argument(
+    "--max-ms", type=float, help="fail if importing hse3.hse takes longer"
+)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Return the self and cumulative import time in microseconds of ``module``
+    and of every module it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        check=True,
+        env=os.environ,
+        universal_newlines=True,
+    )
+
+    # Imported modules are listed before the module importing them, indented
+    # one level deeper
+    lines = [
+        line[len("import time:") :].split("|")
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    ]
+    times = {}
+    depth = None
+    for self_us, cumulative_us, name in reversed(lines):
+        indent = len(name) - len(name.lstrip())
+        if depth is None:
+            if name.strip() != module:
+                continue
+            depth = indent
+        elif indent <= depth:
+            break
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    args = parse_args()
+
+    modules = ["hse3", *(f"hse3.{name}" for name in hse3.__all__)]
+    best: Dict[str, float] = {}
+    slowest: List[Tuple[int, str]] = []
+    for module in modules:
+        for _ in range(args.runs):
+            times = import_times(module)
+            seconds = times[module][1] / 1e6
+            if seconds < best.get(module, float("inf")):
+                best[module] = seconds
+                if module == "hse3.hse":
+                    slowest = sorted(
+                        ((t[0], name) for name, t in times.items()), reverse=True
+                    )
+        print(f"import {module:<33} {best[module] * 1000:>10.2f} ms")
+
+    print("slowest modules imported by hse3.hse:")
+    for self_us, name in slowest[:10]:
+        print(f"    {name:<36} {self_us / 1000:>10.2f} ms")
+
+    if args.max_ms is not None and best["hse3.hse"] * 1000 > args.max_ms:
+        sys.exit(
+            f"importing hse3.hse took {best['hse3.hse'] * 1000:.2f} ms, "
+            f"more than {args.max_ms} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
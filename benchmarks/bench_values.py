@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Compare value codecs against hand-rolled serialization around put()/get().
+
+For every codec the benchmark measures put_obj(), get_obj() and a decoding
+cursor scan. The "manual" rows serialize with pickle.dumps() and call
+put()/get() directly, which is what callers did before codecs existed.
+"""
+
+import pickle
+from typing import Any, Callable, List, Tuple
+
+from common import keys, kvdb_fixture, kvs_fixture, measure, parse_args, report
+
+from hse3 import hse, values
+
+RECORD = {"id": 12345, "name": "sensor-17", "tags": ["a", "b", "c"], "reading": 21.5}
+ROW = (12345, 17, 21.5)
+BLOB = bytearray(64 * 1024)
+
+
+def cases() -> List[Tuple[str, values.Codec, Any]]:
+    result = [
+        ("bytes", values.BytesCodec(), b"x" * 100),
+        ("struct", values.StructCodec("<qid"), ROW),
+        ("pickle", values.PickleCodec(), RECORD),
+        ("pickle-blob", values.PickleCodec(), BLOB),
+        ("pickle4-blob", values.PickleCodec(protocol=4), BLOB),
+    ]
+    try:
+        result.append(("msgpack", values.MsgpackCodec(), RECORD))
+    except ImportError:
+        pass
+    return result
+
+
+def run_manual(kvs: hse.Kvs, name: str, obj: Any, ks: List[bytes], repeat: int) -> None:
+    buf = bytearray(len(pickle.dumps(obj)) * 2)
+
+    def put() -> None:
+        for k in ks:
+            kvs.put(k, pickle.dumps(obj))
+
+    def get() -> None:
+        for k in ks:
+            value, _ = kvs.get(k, buf=buf)
+            pickle.loads(value)
+
+    report(f"manual-{name} put", len(ks), measure(put, repeat))
+    report(f"manual-{name} get", len(ks), measure(get, repeat))
+
+
+def run_codec(kvs: hse.Kvs, name: str, obj: Any, ks: List[bytes], repeat: int) -> None:
+    def put() -> None:
+        for k in ks:
+            kvs.put_obj(k, obj)
+
+    def get() -> None:
+        for k in ks:
+            kvs.get_obj(k)
+
+    def scan() -> None:
+        with kvs.cursor() as cursor:
+            for _ in cursor.items():
+                pass
+
+    bench: List[Tuple[str, Callable[[], None]]] = [
+        ("put", put),
+        ("get", get),
+        ("scan", scan),
+    ]
+    for op, fn in bench:
+        report(f"{name} {op}", len(ks), measure(fn, repeat))
+
+
+def main() -> None:
+    args = parse_args()
+    kvdb = kvdb_fixture(args)
+    kvs = kvs_fixture(kvdb, "values")
+
+    for name, codec, obj in cases():
+        # Large values are slow to put, scale the key count down
+        ks = keys(args.ops if len(bytes(codec.encode(obj))) < 4096 else args.ops // 16)
+
+        kvs.codec = codec
+        run_codec(kvs, name, obj, ks, args.repeat)
+        if isinstance(codec, values.PickleCodec):
+            run_manual(kvs, name, obj, ks, args.repeat)
+        kvs.prefix_delete(b"key")
+
+
+if __name__ == "__main__":
+    main()
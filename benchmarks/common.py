@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Shared harness for the hse-python benchmarks.
+
+Each benchmark is a standalone script run by ``meson test --benchmark``. Results
+are printed as one line per measurement::
+
+    <name> <operations> ops <seconds> s <operations per second> ops/s
+"""
+
+import argparse
+import atexit
+import errno
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, List, cast
+
+from hse3 import hse
+
+if TYPE_CHECKING:
+
+    class BenchArgs:
+        home: pathlib.Path
+        config: pathlib.Path
+        ops: int
+        repeat: int
+
+
+def _default_dir() -> str:
+    tmpdir = tempfile.mkdtemp(prefix=f"mbench-{pathlib.Path(sys.argv[0]).name}-")
+    atexit.register(shutil.rmtree, tmpdir, True)
+    return tmpdir
+
+
+PARSER = argparse.ArgumentParser()
+PARSER.add_argument("-C", "--home", type=pathlib.Path)
+PARSER.add_argument("--config", type=pathlib.Path)
+PARSER.add_argument(
+    "-n", "--ops", type=int, default=20000, help="operations per measurement"
+)
+PARSER.add_argument(
+    "-r", "--repeat", type=int, default=3, help="keep the best of N runs"
+)
+
+
+def parse_args(argv: List[str] = sys.argv[1:]) -> "BenchArgs":
+    args = cast("BenchArgs", PARSER.parse_args(argv))
+    if args.home is None:
+        args.home = pathlib.Path(_default_dir())
+    return args
+
+
+def measure(fn: Callable[[], None], repeat: int) -> float:
+    """
+    Return the best wall clock time of ``repeat`` calls to ``fn``.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, ops: int, seconds: float) -> None:
+    print(f"{name:<40} {ops:>10} ops {seconds:>10.4f} s {ops / seconds:>14.0f} ops/s")
+
+
+def kvdb_fixture(args: "BenchArgs", rparams: Iterable[str] = ()) -> hse.Kvdb:
+    hse.init(args.config, "rest.enabled=false")
+    atexit.register(hse.fini)
+    try:
+        hse.Kvdb.create(args.home)
+    except hse.HseException as e:
+        if e.returncode != errno.EEXIST:
+            raise e
+    kvdb = hse.Kvdb.open(args.home, *rparams)
+
+    def cleanup() -> None:
+        kvdb.close()
+        hse.Kvdb.drop(args.home)
+
+    atexit.register(cleanup)
+    return kvdb
+
+
+def kvs_fixture(
+    kvdb: hse.Kvdb,
+    name: str,
+    cparams: Iterable[str] = (),
+    rparams: Iterable[str] = (),
+    **kwargs,
+) -> hse.Kvs:
+    try:
+        kvdb.kvs_create(name, *cparams)
+    except hse.HseException as e:
+        if e.returncode != errno.EEXIST:
+            raise e
+    kvs = kvdb.kvs_open(name, *rparams, **kwargs)
+
+    def cleanup() -> None:
+        kvs.close()
+        kvdb.kvs_drop(name)
+
+    atexit.register(cleanup)
+    return kvs
+
+
+def keys(count: int) -> List[bytes]:
+    return [b"key%010d" % i for i in range(count)]
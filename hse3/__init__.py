@@ -31,4 +31,23 @@ key prefix length - For multi-segment keys, the length of a key prefix (bytes)
 unsegmented key   - A key that is not logically divided into segments
 """
 
-__all__ = ["hse", "limits", "version"]
+__all__ = [
+    "changefeed",
+    "compaction",
+    "compression",
+    "counters",
+    "dump",
+    "groupcommit",
+    "hse",
+    "index",
+    "keys",
+    "limits",
+    "multiprocess",
+    "pagination",
+    "tail",
+    "tiering",
+    "ttl",
+    "tune",
+    "values",
+    "version",
+]
@@ -0,0 +1,215 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Change feed of the writes made through the bindings in this process.
+
+``ChangeFeed`` is a hook for ``hse.add_hook()`` which appends every committed
+batch of ``hse.ChangeEvent`` to a bounded ring buffer, and lets a consumer
+drain it from another thread or from an asyncio task. This suits cache
+invalidation and replication, where writers should not wait for consumers.
+
+The ring buffer is a ``collections.deque`` with a maximum length, whose
+appends and pops are atomic, so writers never take a lock. When the buffer is
+full the oldest batch is dropped and counted in ``ChangeFeed.dropped``.
+
+Each batch holds the changes of one committed transaction followed by its
+COMMIT event, the single change of a write made outside a transaction, or a
+single ABORT event.
+
+Example::
+
+    with ChangeFeed() as feed:
+        ...
+        for event in feed:  # blocks until the feed is closed
+            invalidate(event.kvs.name, event.key)
+"""
+
+import threading
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+)
+
+from hse3 import hse
+
+if TYPE_CHECKING:
+    import asyncio
+
+__all__ = ["ChangeFeed"]
+
+_Batch = List[hse.ChangeEvent]
+
+
+class ChangeFeed:
+    """
+    Bounded buffer of change batches fed by an ``hse`` hook.
+
+    The feed supports a single consumer at a time.
+
+    Args:
+        capacity: Maximum number of batches buffered.
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+
+        self.dropped = 0
+        self._batches: Deque[_Batch] = deque(maxlen=capacity)
+        self._waiter: Optional[Callable[[], None]] = None
+        self._registered = False
+        self._closed = False
+
+    def __call__(self, events: _Batch) -> None:
+        batches = self._batches
+        if len(batches) == batches.maxlen:
+            # Approximate under concurrent writers, which is fine for a gauge
+            self.dropped += 1
+        batches.append(events)
+
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            waiter()
+
+    def __enter__(self) -> "ChangeFeed":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[hse.ChangeEvent]:
+        while True:
+            batch = self.get()
+            if batch is None:
+                if self._closed:
+                    return
+                continue
+            yield from batch
+
+    async def __aiter__(self) -> AsyncIterator[hse.ChangeEvent]:
+        while True:
+            batch = await self.get_async()
+            if batch is None:
+                return
+            for event in batch:
+                yield event
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the feed has been closed.
+        """
+        return self._closed
+
+    def start(self) -> "ChangeFeed":
+        """
+        Register the feed as a hook.
+
+        Returns:
+            ChangeFeed: The feed itself.
+        """
+        if self._closed:
+            raise ValueError("Change feed is closed")
+        if not self._registered:
+            hse.add_hook(self)
+            self._registered = True
+        return self
+
+    def close(self) -> None:
+        """
+        Unregister the feed and wake up a waiting consumer. Batches already
+        buffered can still be read. Safe to call more than once.
+        """
+        if self._registered:
+            hse.remove_hook(self)
+            self._registered = False
+        self._closed = True
+
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            waiter()
+
+    def drain(self) -> List[hse.ChangeEvent]:
+        """
+        Remove and return all buffered events without blocking.
+
+        Returns:
+            List of events, oldest first.
+        """
+        events: List[hse.ChangeEvent] = []
+        batches = self._batches
+        while batches:
+            events.extend(batches.popleft())
+        return events
+
+    def get(self, timeout: Optional[float] = None) -> Optional[_Batch]:
+        """
+        Remove and return the oldest batch, waiting for one if necessary.
+
+        Args:
+            timeout: Maximum time to wait in seconds. Wait until a batch
+                arrives or the feed is closed if not given.
+
+        Returns:
+            Batch of events, or None if the feed is closed and empty or the
+            timeout expired.
+        """
+        batches = self._batches
+        if batches:
+            return batches.popleft()
+
+        event = threading.Event()
+        self._waiter = event.set
+        # Check again, a batch may have arrived before the waiter was set
+        if not batches and not self._closed:
+            event.wait(timeout)
+        self._waiter = None
+
+        return batches.popleft() if batches else None
+
+    async def get_async(self) -> Optional[_Batch]:
+        """
+        Remove and return the oldest batch, waiting for one in the running
+        event loop if necessary.
+
+        Returns:
+            Batch of events, or None if the feed is closed and empty.
+        """
+        # asyncio is slow to import and only needed by asyncio consumers
+        import asyncio
+
+        batches = self._batches
+        # get_running_loop() is new in Python 3.7, where get_event_loop() is
+        # deprecated inside coroutines
+        get_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+        loop = get_loop()
+        while not batches and not self._closed:
+            future = loop.create_future()
+
+            def wake(future: "asyncio.Future[None]" = future) -> None:
+                loop.call_soon_threadsafe(_resolve, future)
+
+            self._waiter = wake
+            if not batches and not self._closed:
+                await future
+            self._waiter = None
+
+        return batches.popleft() if batches else None
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
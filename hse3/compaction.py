@@ -0,0 +1,299 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Scheduling KVDB compaction into off-peak windows.
+
+``Kvdb.compact()`` asks HSE to compact the KVDB until its space amplification
+drops to the low water mark reported by ``Kvdb.compact_status``. Compaction
+competes with foreground operations for the device, so it is best run when
+the application is quiet. A ``CompactionScheduler`` polls the compaction
+status from a background thread and
+
+* starts a compaction when the time is within one of its windows, the
+  foreground latency is acceptable and the space amplification is above a
+  threshold,
+* cancels the compaction it started with ``KvdbCompactFlag.CANCEL`` once the
+  window closes or the foreground latency rises above the limit.
+
+Compactions the scheduler did not start are never cancelled. What the
+scheduler did is counted in ``CompactionScheduler.metrics``, and each action
+can also be passed to a callback, for instance to export it.
+
+Example::
+
+    scheduler = CompactionScheduler(
+        kvdb,
+        windows=[Window.parse("01:00-05:00")],
+        latency=lambda: stats.p99(),
+        max_latency=0.005,
+    )
+    with scheduler:
+        serve()
+
+Compaction is part of the experimental API, so the scheduler needs bindings
+built with it.
+"""
+
+import datetime
+import threading
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+from hse3 import hse
+
+__all__ = ["CompactionMetrics", "CompactionScheduler", "Window"]
+
+_STARTED = "started"
+_CANCELED = "canceled"
+_FINISHED = "finished"
+
+
+class Window(NamedTuple):
+    """
+    Daily time window, which wraps around midnight if ``end`` is not after
+    ``start``.
+
+    Attributes:
+        start: Time of day the window opens.
+        end: Time of day the window closes.
+    """
+
+    start: datetime.time
+    end: datetime.time
+
+    @classmethod
+    def parse(cls, window: str) -> "Window":
+        """
+        Parse a window of the form ``HH:MM-HH:MM``.
+
+        Raises:
+            ValueError: The window is malformed.
+        """
+        start, sep, end = window.partition("-")
+        if not sep:
+            raise ValueError(f"Expected HH:MM-HH:MM: {window}")
+        return cls(
+            datetime.datetime.strptime(start.strip(), "%H:%M").time(),
+            datetime.datetime.strptime(end.strip(), "%H:%M").time(),
+        )
+
+    def __contains__(self, moment: object) -> bool:
+        if isinstance(moment, datetime.datetime):
+            moment = moment.time()
+        if not isinstance(moment, datetime.time):
+            return False
+        if self.start < self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+
+class CompactionMetrics(NamedTuple):
+    """
+    What a ``CompactionScheduler`` has done so far.
+
+    Attributes:
+        polls: Compaction status polls.
+        started: Compactions started.
+        finished: Compactions started which ran to completion.
+        canceled: Compactions cancelled by the scheduler or by HSE.
+        deferred_latency: Polls which did not start a compaction because the
+            foreground latency was too high.
+        samp: Space amplification at the last poll, in percent.
+        active: Whether a compaction started by the scheduler is running.
+    """
+
+    polls: int = 0
+    started: int = 0
+    finished: int = 0
+    canceled: int = 0
+    deferred_latency: int = 0
+    samp: int = 0
+    active: bool = False
+
+
+class CompactionScheduler:
+    """
+    Background thread running compactions in time windows.
+
+    Args:
+        kvdb: KVDB to compact.
+        windows: Windows compaction may run in. Without any, compaction may
+            run at any time.
+        latency: Function returning the current foreground latency in
+            seconds, or None if unknown.
+        max_latency: Latency above which no compaction is started and the
+            running one is cancelled.
+        min_samp: Space amplification in percent above which a compaction is
+            started. Defaults to the low water mark of the KVDB.
+        interval: Seconds between polls.
+        on_action: Function called with ``"started"``, ``"canceled"`` or
+            ``"finished"`` and the status which led to it.
+        clock: Function returning the current local time.
+    """
+
+    def __init__(
+        self,
+        kvdb: hse.Kvdb,
+        windows: Iterable[Window] = (),
+        latency: Optional[Callable[[], Optional[float]]] = None,
+        max_latency: float = float("inf"),
+        min_samp: Optional[int] = None,
+        interval: float = 10.0,
+        on_action: Optional[Callable[[str, "hse.KvdbCompactStatus"], None]] = None,
+        clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+
+        self.kvdb = kvdb
+        self.windows: List[Window] = list(windows)
+        self.latency = latency
+        self.max_latency = max_latency
+        self.min_samp = min_samp
+        self.interval = interval
+        self.on_action = on_action
+        self.clock = clock
+        self.metrics = CompactionMetrics()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "CompactionScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _in_window(self) -> bool:
+        if not self.windows:
+            return True
+        now = self.clock()
+        return any(now in window for window in self.windows)
+
+    def _latency_high(self) -> bool:
+        if self.latency is None:
+            return False
+        latency = self.latency()
+        return latency is not None and latency > self.max_latency
+
+    def _act(self, action: str, status: "hse.KvdbCompactStatus", **counts) -> None:
+        self.metrics = self.metrics._replace(**counts)
+        if self.on_action is not None:
+            self.on_action(action, status)
+
+    def poll(self) -> Optional[str]:
+        """
+        Check the compaction status once and start or cancel compaction.
+
+        The background thread calls this every ``interval`` seconds.
+
+        Returns:
+            The action taken, ``"started"``, ``"canceled"`` or
+            ``"finished"``, or None.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        status = self.kvdb.compact_status
+        metrics = self.metrics = self.metrics._replace(
+            polls=self.metrics.polls + 1, samp=status.samp_curr
+        )
+
+        if metrics.active:
+            if not status.active:
+                # HSE finished the compaction, or someone cancelled it
+                if status.canceled:
+                    self._act(
+                        _CANCELED, status, canceled=metrics.canceled + 1, active=False
+                    )
+                    return _CANCELED
+                self._act(
+                    _FINISHED, status, finished=metrics.finished + 1, active=False
+                )
+                return _FINISHED
+            if not self._in_window() or self._latency_high():
+                self.kvdb.compact(flags=hse.KvdbCompactFlag.CANCEL)
+                self._act(
+                    _CANCELED,
+                    self.kvdb.compact_status,
+                    canceled=metrics.canceled + 1,
+                    active=False,
+                )
+                return _CANCELED
+            return None
+
+        min_samp = status.samp_lwm if self.min_samp is None else self.min_samp
+        if status.active or status.samp_curr <= min_samp or not self._in_window():
+            return None
+        if self._latency_high():
+            self.metrics = metrics._replace(
+                deferred_latency=metrics.deferred_latency + 1
+            )
+            return None
+
+        self.kvdb.compact(flags=hse.KvdbCompactFlag.SAMP_LWM)
+        self._act(
+            _STARTED, self.kvdb.compact_status, started=metrics.started + 1, active=True
+        )
+        return _STARTED
+
+    def start(self) -> None:
+        """
+        Start polling from a background thread.
+
+        Raises:
+            RuntimeError: The scheduler is already running.
+        """
+        if self._thread is not None:
+            raise RuntimeError("CompactionScheduler is already running")
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="hse3-compaction", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, cancel: bool = True) -> None:
+        """
+        Stop the background thread and wait for it. Safe to call more than
+        once.
+
+        Args:
+            cancel: Also cancel the compaction the scheduler started, if it
+                is still running.
+
+        Raises:
+            HseException: The last poll failed, or cancelling failed.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+        if cancel and self.metrics.active and self.kvdb.compact_status.active:
+            self.kvdb.compact(flags=hse.KvdbCompactFlag.CANCEL)
+            self._act(
+                _CANCELED,
+                self.kvdb.compact_status,
+                canceled=self.metrics.canceled + 1,
+                active=False,
+            )
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except BaseException as e:
+                self._error = e
+                return
+            if self._stop.wait(self.interval):
+                return
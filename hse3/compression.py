@@ -0,0 +1,297 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Client-side value compression with trained zstd dictionaries.
+
+HSE compresses values with LZ4 one at a time, which does little for small,
+similar values such as serialized records. ``ZstdDictCodec`` trains a zstd
+dictionary from a sample of the values already stored in a KVS and compresses
+every value against it, which typically shrinks small structured values
+several times over and reduces the media class usage reported by
+``Kvdb.mclass_info()``.
+
+Dictionaries are versioned and stored in the KVS itself, under keys beginning
+with ``DICTIONARY_PREFIX``. Every value carries the version of the dictionary
+it was compressed with, so values written before a retrain stay readable.
+Cursors created from a KVS using the codec skip the dictionary keys. All
+values in the KVS must be written through the codec, since values without the
+version header cannot be told apart from compressed ones.
+
+Example::
+
+    codec = ZstdDictCodec(kvs, inner=values.PickleCodec())
+    kvs.codec = codec
+    ...
+    codec.train()        # sample existing values, store dictionary 1
+    codec.recompress()   # optionally rewrite existing values with it
+
+Requires the optional zstandard package.
+"""
+
+import random
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from hse3 import hse, limits
+from hse3.values import BytesCodec, Codec
+
+__all__ = ["DICTIONARY_PREFIX", "ZstdDictCodec"]
+
+DICTIONARY_PREFIX = b"\xffhse3.zstd.dict\x00"
+
+_HEADER = struct.Struct("<H")
+_VERSION = struct.Struct(">H")
+_VERSION_MAX = 0xFFFF
+
+
+def _zstd() -> Any:
+    import zstandard
+
+    return zstandard
+
+
+class ZstdDictCodec(Codec):
+    """
+    Codec compressing the output of another codec with a zstd dictionary.
+
+    Each stored value starts with a little-endian uint16 dictionary version.
+    Version 0 means the value is stored uncompressed, either because no
+    dictionary has been trained yet or because compression did not make the
+    value smaller. Compressed values are magicless zstd frames without a
+    checksum or dictionary ID, keeping the per-value overhead to a few bytes.
+
+    Args:
+        kvs: KVS holding the dictionaries. Usually the KVS the codec is
+            attached to.
+        inner: Codec serializing objects to bytes before compression, or
+            BytesCodec if not given.
+        level: zstd compression level.
+        min_size: Values shorter than this are never compressed.
+
+    Raises:
+        ImportError: zstandard is not installed.
+        HseException: Underlying C function returned a non-zero value.
+    """
+
+    reserved_prefix = DICTIONARY_PREFIX
+
+    def __init__(
+        self,
+        kvs: hse.Kvs,
+        inner: Optional[Codec] = None,
+        level: int = 3,
+        min_size: int = 32,
+    ) -> None:
+        # Fail early if zstandard is missing
+        _zstd()
+        self.kvs = kvs
+        self.inner = inner if inner is not None else BytesCodec()
+        self.level = level
+        self.min_size = min_size
+        self._dictionaries: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reload()
+
+    @property
+    def version(self) -> int:
+        """
+        Version of the dictionary used for new values, 0 if none is trained.
+        """
+        return max(self._dictionaries, default=0)
+
+    def reload(self) -> None:
+        """
+        Load dictionaries stored in the KVS, for example after another process
+        trained a new version.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        found = {}
+        with self.kvs.cursor(DICTIONARY_PREFIX) as cursor:
+            cursor.codec = None
+            for key, value in cursor.items():
+                assert key is not None
+                (version,) = _VERSION.unpack_from(key, len(DICTIONARY_PREFIX))
+                found[version] = _zstd().ZstdCompressionDict(
+                    value if value is not None else b""
+                )
+        with self._lock:
+            self._dictionaries = found
+
+    def train(
+        self,
+        samples: int = 2000,
+        dict_size: int = 16 * 1024,
+        filt: Optional[Union[str, bytes]] = None,
+        txn: Optional[hse.KvdbTransaction] = None,
+        seed: Optional[int] = None,
+    ) -> int:
+        """
+        Train a new dictionary from the values stored in the KVS.
+
+        Values are sampled uniformly with reservoir sampling over a single
+        cursor pass, decompressed with their own dictionary if needed, and
+        passed to zstd's dictionary trainer. The dictionary is stored under
+        the next version and used for all values encoded afterwards.
+
+        Args:
+            samples: Maximum number of values to sample.
+            dict_size: Maximum dictionary size in bytes.
+            filt: Only sample values whose keys start with this prefix.
+            txn: Transaction used to store the dictionary, required for
+                transactional KVSs.
+            seed: Seed for the sampler, for reproducible dictionaries.
+
+        Returns:
+            int: Version of the new dictionary.
+
+        Raises:
+            ValueError: Not enough data to train a dictionary, or all
+                dictionary versions are in use.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        if dict_size > limits.KVS_VALUE_LEN_MAX:
+            raise ValueError(f"dict_size must not exceed {limits.KVS_VALUE_LEN_MAX}")
+
+        reservoir, seen = self._sample(samples, filt, txn, random.Random(seed))
+        try:
+            trained = _zstd().train_dictionary(dict_size, reservoir)
+        except _zstd().ZstdError as e:
+            raise ValueError(
+                f"Unable to train dictionary from {seen} values: {e}"
+            ) from e
+
+        with self._lock:
+            version = self.version + 1
+            if version > _VERSION_MAX:
+                raise ValueError("All dictionary versions are in use")
+            self.kvs.put(
+                DICTIONARY_PREFIX + _VERSION.pack(version), trained.as_bytes(), txn=txn
+            )
+            self._dictionaries[version] = trained
+
+        return version
+
+    def recompress(
+        self,
+        filt: Optional[Union[str, bytes]] = None,
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> int:
+        """
+        Rewrite stored values not compressed with the current dictionary.
+
+        Args:
+            filt: Only rewrite values whose keys start with this prefix.
+            txn: Transaction used for the rewrites, required for
+                transactional KVSs.
+
+        Returns:
+            int: Number of values rewritten.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        version = self.version
+        if version == 0:
+            return 0
+
+        count = 0
+        with self.kvs.cursor(filt, txn=txn) as cursor:
+            cursor.codec = None
+            for key, value in cursor.items():
+                assert key is not None
+                if not value or key.startswith(DICTIONARY_PREFIX):
+                    continue
+                if _HEADER.unpack_from(value)[0] == version:
+                    continue
+                self.kvs.put(key, self._compress(self._uncompress(value)), txn=txn)
+                count += 1
+
+        return count
+
+    def _sample(
+        self,
+        samples: int,
+        filt: Optional[Union[str, bytes]],
+        txn: Optional[hse.KvdbTransaction],
+        rng: random.Random,
+    ) -> Tuple[List[bytes], int]:
+        reservoir: List[bytes] = []
+        seen = 0
+        with self.kvs.cursor(filt, txn=txn) as cursor:
+            cursor.codec = None
+            for key, value in cursor.items():
+                assert key is not None
+                if not value or key.startswith(DICTIONARY_PREFIX):
+                    continue
+                seen += 1
+                if len(reservoir) < samples:
+                    reservoir.append(self._uncompress(value))
+                else:
+                    i = rng.randrange(seen)
+                    if i < samples:
+                        reservoir[i] = self._uncompress(value)
+        return reservoir, seen
+
+    def _compressor(self, version: int) -> Any:
+        compressors = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        cctx = compressors.get(version)
+        if cctx is None:
+            params = _zstd().ZstdCompressionParameters.from_level(
+                self.level,
+                format=_zstd().FORMAT_ZSTD1_MAGICLESS,
+                write_checksum=False,
+                write_dict_id=False,
+                write_content_size=True,
+            )
+            cctx = compressors[version] = _zstd().ZstdCompressor(
+                dict_data=self._dictionaries[version], compression_params=params
+            )
+        return cctx
+
+    def _decompressor(self, version: int) -> Any:
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        dctx = decompressors.get(version)
+        if dctx is None:
+            if version not in self._dictionaries:
+                self.reload()
+                if version not in self._dictionaries:
+                    raise ValueError(
+                        f"Unknown compression dictionary version {version}"
+                    )
+            dctx = decompressors[version] = _zstd().ZstdDecompressor(
+                dict_data=self._dictionaries[version],
+                format=_zstd().FORMAT_ZSTD1_MAGICLESS,
+            )
+        return dctx
+
+    def _compress(self, data: Any) -> bytes:
+        version = self.version
+        raw = memoryview(data)
+        if version > 0 and raw.nbytes >= self.min_size:
+            compressed = self._compressor(version).compress(raw)
+            if len(compressed) < raw.nbytes:
+                return _HEADER.pack(version) + compressed
+        return _HEADER.pack(0) + raw.tobytes()
+
+    def _uncompress(self, data: bytes) -> bytes:
+        (version,) = _HEADER.unpack_from(data)
+        start = _HEADER.size
+        if version == 0:
+            return data[start:]
+        return self._decompressor(version).decompress(memoryview(data)[start:])
+
+    def encode(self, obj: Any) -> bytes:
+        return self._compress(self.inner.encode(obj))
+
+    def decode(self, data: bytes) -> Any:
+        return self.inner.decode(self._uncompress(data))
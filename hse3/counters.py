@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Counters which many threads and processes can increment without conflicting.
+
+Incrementing a counter stored in a single key reads and writes that key in a
+transaction, so concurrent increments conflict with each other and all but
+one have to be retried. ``Counters`` spreads each counter over shards, keys
+sharing the prefix of the counter, and each increment updates one shard
+picked at random. Reading a counter sums its shards with one prefix cursor.
+
+The number of shards each counter uses adapts to contention. Every
+``window`` increments of a counter, its shard count doubles if more than
+``raise_rate`` of the attempts conflicted, and halves if fewer than
+``lower_rate`` did. Shards which fall out of use keep their counts and are
+still summed, so processes may use different shard counts for the same
+counter.
+
+Layout of the KVS, under an optional prefix::
+
+    <name length> <name> <shard>   count
+
+with the name length and the shard as 2 big-endian bytes and the count as
+8 big-endian bytes, signed. The KVS must have transactions enabled.
+
+Example::
+
+    counters = Counters(kvdb, kvs)
+    counters.increment("page-views")
+    total = counters.value("page-views")
+"""
+
+import errno
+import random
+import struct
+import threading
+from typing import Dict, Optional, SupportsBytes, Union
+
+from hse3 import hse
+
+__all__ = ["Counters"]
+
+_LENGTH = struct.Struct(">H")
+_COUNT = struct.Struct(">q")
+
+
+def _to_bytes(obj: Union[str, bytes, SupportsBytes]) -> bytes:
+    if isinstance(obj, str):
+        return obj.encode()
+    return bytes(obj)
+
+
+class _Shards:
+    # Shard count of one counter and the attempts of its current window
+    __slots__ = ("count", "attempts", "conflicts")
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.attempts = 0
+        self.conflicts = 0
+
+
+class Counters:
+    """
+    Sharded counters stored in a KVS.
+
+    Args:
+        kvdb: KVDB of the KVS.
+        kvs: KVS holding the counters, with transactions enabled.
+        prefix: Prefix of all the counter keys.
+        min_shards: Fewest shards a counter is spread over.
+        max_shards: Most shards a counter is spread over.
+        window: Increments of a counter between shard count adjustments.
+        raise_rate: Conflict rate above which the shard count doubles.
+        lower_rate: Conflict rate below which the shard count halves.
+        retries: Attempts of an increment before giving up.
+    """
+
+    def __init__(
+        self,
+        kvdb: hse.Kvdb,
+        kvs: hse.Kvs,
+        prefix: Union[str, bytes] = b"",
+        min_shards: int = 1,
+        max_shards: int = 64,
+        window: int = 64,
+        raise_rate: float = 0.05,
+        lower_rate: float = 0.005,
+        retries: int = 100,
+    ) -> None:
+        if not 1 <= min_shards <= max_shards <= 0xFFFF:
+            raise ValueError("Shard counts must satisfy 1 <= min <= max <= 65535")
+        if window < 1 or retries < 1:
+            raise ValueError("window and retries must be positive")
+
+        self.kvdb = kvdb
+        self.kvs = kvs
+        self.prefix = _to_bytes(prefix)
+        self.min_shards = min_shards
+        self.max_shards = max_shards
+        self.window = window
+        self.raise_rate = raise_rate
+        self.lower_rate = lower_rate
+        self.retries = retries
+        self._shards: Dict[bytes, _Shards] = {}
+        self._lock = threading.Lock()
+        # Transactions are reused rather than allocated per increment
+        self._local = threading.local()
+
+    def _prefix(self, name: Union[str, bytes, SupportsBytes]) -> bytes:
+        name = _to_bytes(name)
+        return self.prefix + _LENGTH.pack(len(name)) + name
+
+    def _transaction(self) -> hse.KvdbTransaction:
+        txn = getattr(self._local, "txn", None)
+        if txn is None:
+            txn = self._local.txn = self.kvdb.transaction()
+        return txn
+
+    def _record(self, shards: _Shards, conflicted: bool) -> None:
+        with self._lock:
+            shards.attempts += 1
+            shards.conflicts += conflicted
+            if shards.attempts < self.window:
+                return
+
+            rate = shards.conflicts / shards.attempts
+            if rate > self.raise_rate:
+                shards.count = min(shards.count * 2, self.max_shards)
+            elif rate < self.lower_rate:
+                shards.count = max(shards.count // 2, self.min_shards)
+            shards.attempts = shards.conflicts = 0
+
+    def shards(self, name: Union[str, bytes, SupportsBytes]) -> int:
+        """
+        Number of shards increments of a counter are currently spread over
+        by this object.
+        """
+        shards = self._shards.get(self._prefix(name))
+        return shards.count if shards is not None else self.min_shards
+
+    def increment(self, name: Union[str, bytes, SupportsBytes], delta: int = 1) -> None:
+        """
+        Add to a counter, retrying on conflicts.
+
+        Args:
+            name: Counter to add to. Counters start at 0.
+            delta: Amount to add, possibly negative.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value, or
+                the increment kept conflicting for ``retries`` attempts.
+        """
+        prefix = self._prefix(name)
+        shards = self._shards.get(prefix)
+        if shards is None:
+            shards = self._shards.setdefault(prefix, _Shards(self.min_shards))
+
+        txn = self._transaction()
+        for attempt in range(self.retries):
+            key = prefix + _LENGTH.pack(random.randrange(shards.count))
+            txn.begin()
+            try:
+                count = self.kvs.get(key, txn=txn)[0]
+                count = _COUNT.unpack(count)[0] if count is not None else 0
+                self.kvs.put(key, _COUNT.pack(count + delta), txn=txn)
+                txn.commit()
+            except hse.HseException as e:
+                if txn.state == hse.KvdbTransactionState.ACTIVE:
+                    txn.abort()
+                if e.returncode != errno.ECANCELED or attempt == self.retries - 1:
+                    raise
+                self._record(shards, True)
+            else:
+                self._record(shards, False)
+                return
+
+    def value(
+        self,
+        name: Union[str, bytes, SupportsBytes],
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> int:
+        """
+        Read a counter by summing its shards.
+
+        Args:
+            name: Counter to read.
+            txn: Transaction to read in, for a value consistent with other
+                reads of the transaction.
+
+        Returns:
+            int: Value of the counter, 0 if it was never incremented.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        total = 0
+        with self.kvs.cursor(self._prefix(name), txn=txn) as cursor:
+            while True:
+                _, count = cursor.read()
+                if cursor.eof:
+                    break
+                assert count is not None
+                total += _COUNT.unpack(count)[0]
+        return total
+
+    def reset(self, name: Union[str, bytes, SupportsBytes]) -> None:
+        """
+        Delete all the shards of a counter, setting it back to 0.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self.kvdb.transaction() as txn:
+            self.kvs.prefix_delete(self._prefix(name), txn=txn)
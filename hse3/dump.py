@@ -0,0 +1,407 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Binary export and import of a single KVS.
+
+A dump is produced by streaming a KVS cursor into a sequence of independently
+compressed blocks. Each block holds whole key-value records, is compressed with
+zlib and is protected by a CRC-32 of its compressed bytes. A footer index
+records the offset, checksum and first/last key of every block, which allows a
+single key range to be restored without decompressing the rest of the file.
+
+File layout::
+
+    header   MAGIC, format version
+    block 0  zlib(record, record, ...)
+    ...
+    block N
+    index    zlib(index entry, index entry, ...)
+    footer   index offset, index length, index CRC-32, block count,
+             record count, MAGIC
+
+A record is a big-endian ``(key length, value length)`` pair followed by the
+key and value bytes. Memory usage during both export and import is bounded by
+the block size plus the largest value.
+"""
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from hse3 import hse
+
+MAGIC = b"HSEDUMP\x00"
+VERSION = 1
+
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+_HEADER = struct.Struct(">8sHH4x")
+_RECORD = struct.Struct(">II")
+_INDEX_ENTRY = struct.Struct(">QIIIIHH")
+_FOOTER = struct.Struct(">QIIIQ8s")
+
+_Source = Union[str, "os.PathLike[str]", BinaryIO]
+
+
+class DumpFormatError(ValueError):
+    """
+    Raised when a dump file is truncated, corrupted or of an unknown version.
+    """
+
+
+class BlockInfo(NamedTuple):
+    """
+    Footer index entry describing one block of a dump.
+    """
+
+    offset: int
+    compressed_len: int
+    raw_len: int
+    crc: int
+    count: int
+    first_key: bytes
+    last_key: bytes
+
+
+def _open(file: _Source, mode: str) -> Tuple[BinaryIO, bool]:
+    if isinstance(file, (str, os.PathLike)):
+        return open(file, mode), True  # pylint: disable=consider-using-with
+    return file, False
+
+
+def _in_range(key: bytes, filt_min: Optional[bytes], filt_max: Optional[bytes]) -> bool:
+    if filt_min is not None and key < filt_min:
+        return False
+    if filt_max is not None and key[: len(filt_max)] > filt_max:
+        return False
+    return True
+
+
+class _Writer:
+    def __init__(self, out: BinaryIO, block_size: int, level: int) -> None:
+        self.__out = out
+        self.__block_size = block_size
+        self.__level = level
+        self.__buf = bytearray()
+        self.__count = 0
+        self.__first_key = b""
+        self.__last_key = b""
+        self.__offset = _HEADER.size
+        self.index: List[BlockInfo] = []
+        self.records = 0
+
+        out.write(_HEADER.pack(MAGIC, VERSION, 0))
+
+    def add(self, key: bytes, value: bytes) -> None:
+        if self.__count == 0:
+            self.__first_key = key
+        self.__last_key = key
+        self.__buf += _RECORD.pack(len(key), len(value))
+        self.__buf += key
+        self.__buf += value
+        self.__count += 1
+        if len(self.__buf) >= self.__block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.__count == 0:
+            return
+
+        data = zlib.compress(self.__buf, self.__level)
+        self.__out.write(data)
+        self.index.append(
+            BlockInfo(
+                self.__offset,
+                len(data),
+                len(self.__buf),
+                zlib.crc32(data),
+                self.__count,
+                self.__first_key,
+                self.__last_key,
+            )
+        )
+        self.__offset += len(data)
+        self.records += self.__count
+        self.__buf = bytearray()
+        self.__count = 0
+
+    def close(self) -> None:
+        self.flush()
+
+        raw = bytearray()
+        for block in self.index:
+            raw += _INDEX_ENTRY.pack(
+                block.offset,
+                block.compressed_len,
+                block.raw_len,
+                block.crc,
+                block.count,
+                len(block.first_key),
+                len(block.last_key),
+            )
+            raw += block.first_key
+            raw += block.last_key
+        data = zlib.compress(raw, self.__level)
+        self.__out.write(data)
+        self.__out.write(
+            _FOOTER.pack(
+                self.__offset,
+                len(data),
+                zlib.crc32(data),
+                len(self.index),
+                self.records,
+                MAGIC,
+            )
+        )
+
+
+def dump(
+    kvs: hse.Kvs,
+    file: _Source,
+    filt: Optional[Union[str, bytes]] = None,
+    txn: Optional[hse.KvdbTransaction] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    level: int = 1,
+) -> int:
+    """
+    Export the contents of a KVS to a dump file.
+
+    The export reads through a single cursor, so the dump reflects the
+    cursor's snapshot view of the KVS at the time it was created. Pass an
+    ACTIVE ``txn`` to export the view of that transaction instead, for
+    instance to dump several KVSs at the same point in time.
+
+    Args:
+        kvs: KVS to export.
+        file: Path or binary file object to write the dump to.
+        filt: Only export keys matching this prefix filter.
+        txn: Transaction context.
+        block_size: Uncompressed size at which a block is written out.
+        level: zlib compression level.
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        HseException: Underlying C function returned a non-zero value.
+    """
+    out, owned = _open(file, "wb")
+    try:
+        writer = _Writer(out, block_size, level)
+        with kvs.cursor(filt, txn=txn) as cursor:
+            # Dumps always hold the stored bytes, whatever the KVS codec
+            cursor.codec = None
+            for key, value in cursor.items():
+                assert key is not None
+                writer.add(key, value if value is not None else b"")
+        writer.close()
+        return writer.records
+    finally:
+        if owned:
+            out.close()
+
+
+def index(file: _Source) -> List[BlockInfo]:
+    """
+    Read the footer index of a dump file.
+
+    Args:
+        file: Path or seekable binary file object of the dump.
+
+    Returns:
+        list: Block descriptors in key order.
+
+    Raises:
+        DumpFormatError: File is not a valid dump.
+    """
+    src, owned = _open(file, "rb")
+    try:
+        return _read_index(src)
+    finally:
+        if owned:
+            src.close()
+
+
+def _read_index(src: BinaryIO) -> List[BlockInfo]:
+    src.seek(0)
+    header = src.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise DumpFormatError("Not an HSE dump file")
+    magic, version, _ = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise DumpFormatError("Not an HSE dump file")
+    if version != VERSION:
+        raise DumpFormatError(f"Unsupported dump version {version}")
+
+    src.seek(-_FOOTER.size, os.SEEK_END)
+    footer = src.read(_FOOTER.size)
+    if len(footer) != _FOOTER.size:
+        raise DumpFormatError("Truncated dump footer")
+    offset, length, crc, count, _, magic = _FOOTER.unpack(footer)
+    if magic != MAGIC:
+        raise DumpFormatError("Truncated dump footer")
+
+    src.seek(offset)
+    data = src.read(length)
+    if len(data) != length or zlib.crc32(data) != crc:
+        raise DumpFormatError("Dump index checksum mismatch")
+    raw = memoryview(zlib.decompress(data))
+
+    result: List[BlockInfo] = []
+    pos = 0
+    for _ in range(count):
+        (
+            block_offset,
+            compressed_len,
+            raw_len,
+            block_crc,
+            records,
+            first_len,
+            last_len,
+        ) = _INDEX_ENTRY.unpack_from(raw, pos)
+        pos += _INDEX_ENTRY.size
+        first_end = pos + first_len
+        last_end = first_end + last_len
+        first_key = bytes(raw[pos:first_end])
+        last_key = bytes(raw[first_end:last_end])
+        pos = last_end
+        result.append(
+            BlockInfo(
+                block_offset,
+                compressed_len,
+                raw_len,
+                block_crc,
+                records,
+                first_key,
+                last_key,
+            )
+        )
+
+    return result
+
+
+def _read_block(src: BinaryIO, block: BlockInfo) -> Iterator[Tuple[bytes, bytes]]:
+    src.seek(block.offset)
+    data = src.read(block.compressed_len)
+    if len(data) != block.compressed_len or zlib.crc32(data) != block.crc:
+        raise DumpFormatError(f"Block at offset {block.offset} checksum mismatch")
+    raw = memoryview(zlib.decompress(data))
+    if len(raw) != block.raw_len:
+        raise DumpFormatError(f"Block at offset {block.offset} has the wrong size")
+
+    pos = 0
+    for _ in range(block.count):
+        key_len, value_len = _RECORD.unpack_from(raw, pos)
+        pos += _RECORD.size
+        key_end = pos + key_len
+        value_end = key_end + value_len
+        yield bytes(raw[pos:key_end]), bytes(raw[key_end:value_end])
+        pos = value_end
+
+
+def scan(
+    file: _Source,
+    filt_min: Optional[Union[str, bytes]] = None,
+    filt_max: Optional[Union[str, bytes]] = None,
+) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Iterate over the key-value pairs stored in a dump file.
+
+    Keys are returned in the order they were exported. When a range is given,
+    only blocks overlapping the closed interval [``filt_min``, ``filt_max``]
+    are read. A key is at most ``filt_max`` when its first ``len(filt_max)``
+    bytes compare less than or equal to ``filt_max``, so a key prefix can be
+    used as the upper bound.
+
+    Args:
+        file: Path or seekable binary file object of the dump.
+        filt_min: Range minimum.
+        filt_max: Range maximum.
+
+    Returns:
+        Iterator of key-value pairs.
+
+    Raises:
+        DumpFormatError: File is not a valid dump or a block is corrupted.
+    """
+    lo = hse.to_bytes(filt_min)
+    hi = hse.to_bytes(filt_max)
+
+    src, owned = _open(file, "rb")
+    try:
+        for block in _read_index(src):
+            if lo is not None and block.last_key < lo:
+                continue
+            if hi is not None and block.first_key[: len(hi)] > hi:
+                break
+            for key, value in _read_block(src, block):
+                if _in_range(key, lo, hi):
+                    yield key, value
+    finally:
+        if owned:
+            src.close()
+
+
+def load(
+    kvs: hse.Kvs,
+    file: _Source,
+    filt_min: Optional[Union[str, bytes]] = None,
+    filt_max: Optional[Union[str, bytes]] = None,
+    txn: Optional[hse.KvdbTransaction] = None,
+    flags: Optional[hse.KvsPutFlags] = None,
+) -> int:
+    """
+    Import the contents of a dump file into a KVS.
+
+    Records are put one block at a time. When ``txn`` is given, it must not be
+    ACTIVE; it is reused to put every block in its own transaction, which is
+    required for transactional KVSs.
+
+    Args:
+        kvs: KVS to import into.
+        file: Path or seekable binary file object of the dump.
+        filt_min: Range minimum, see ``scan()``.
+        filt_max: Range maximum, see ``scan()``.
+        txn: Transaction object used to commit each block.
+        flags: Flags for operation specialization.
+
+    Returns:
+        int: Number of records put.
+
+    Raises:
+        DumpFormatError: File is not a valid dump or a block is corrupted.
+        HseException: Underlying C function returned a non-zero value.
+    """
+    lo = hse.to_bytes(filt_min)
+    hi = hse.to_bytes(filt_max)
+    records = 0
+
+    src, owned = _open(file, "rb")
+    try:
+        for block in _read_index(src):
+            if lo is not None and block.last_key < lo:
+                continue
+            if hi is not None and block.first_key[: len(hi)] > hi:
+                break
+
+            if txn is not None:
+                txn.begin()
+            try:
+                for key, value in _read_block(src, block):
+                    if _in_range(key, lo, hi):
+                        kvs.put(key, value if value else None, txn=txn, flags=flags)
+                        records += 1
+            except BaseException:
+                if txn is not None:
+                    txn.abort()
+                raise
+            if txn is not None:
+                txn.commit()
+    finally:
+        if owned:
+            src.close()
+
+    return records
@@ -0,0 +1,178 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Group commit of ``Kvdb.sync()`` calls made by many threads.
+
+Every ``Kvdb.sync()`` flushes the KVDB to stable media on its own, so threads
+which each sync after their writes pay for one flush apiece. ``GroupCommit``
+collects the sync requests which arrive within a short window and serves them
+all with a single ``Kvdb.sync()`` from a background thread. A request is only
+ever served by a sync which started after it arrived, so the writes made
+before it are durable once it returns. Requests arriving while a sync runs
+are served by the next one.
+
+Example::
+
+    with GroupCommit(kvdb, window=0.001) as group:
+        # In each request thread
+        kvs.put(key, value)
+        group.sync()
+
+        # Or without blocking
+        future = group.sync(flags=hse.KvdbSyncFlag.ASYNC)
+        ...
+        future.result()
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from hse3 import hse
+
+__all__ = ["GroupCommit"]
+
+
+class GroupCommit:
+    """
+    Background thread merging concurrent sync requests of a KVDB.
+
+    An error of a sync is raised to every request it was serving, and does
+    not stop the thread.
+
+    Args:
+        kvdb: KVDB to sync.
+        window: Seconds to wait for more requests after the first one of a
+            group arrives.
+        max_group: Requests after which a group is synced without waiting
+            for the rest of the window.
+    """
+
+    def __init__(
+        self, kvdb: hse.Kvdb, window: float = 0.001, max_group: int = 1024
+    ) -> None:
+        if window < 0:
+            raise ValueError("window must not be negative")
+        if max_group < 1:
+            raise ValueError("max_group must be positive")
+
+        self.kvdb = kvdb
+        self.window = window
+        self.max_group = max_group
+        self.syncs = 0
+        self.requests = 0
+        self._group: List["Future[None]"] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "GroupCommit":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Start the thread.
+
+        Raises:
+            RuntimeError: The group commit is already running.
+        """
+        if self._thread is not None:
+            raise RuntimeError("GroupCommit is already running")
+
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="hse3-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Sync the requests still pending, then stop the thread and wait for
+        it. Safe to call more than once.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread.join()
+        self._thread = None
+
+    def sync(
+        self, flags: Optional[hse.KvdbSyncFlag] = None
+    ) -> Optional["Future[None]"]:
+        """
+        Sync the KVDB together with the other pending requests.
+
+        Args:
+            flags: With ``KvdbSyncFlag.ASYNC``, return a future instead of
+                waiting. The future is done once the sync has completed, so
+                unlike ``Kvdb.sync()`` the flag does not weaken durability.
+
+        Returns:
+            With ``KvdbSyncFlag.ASYNC``, a future whose result is None, or
+            which raises the error of the sync. Otherwise None.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+            RuntimeError: The group commit is not running.
+        """
+        future: "Future[None]" = Future()
+        with self._cond:
+            if self._thread is None or self._stopping:
+                raise RuntimeError("GroupCommit is not running")
+            self._group.append(future)
+            self.requests += 1
+            if len(self._group) == 1 or len(self._group) >= self.max_group:
+                self._cond.notify()
+
+        if flags is not None and flags & hse.KvdbSyncFlag.ASYNC:
+            return future
+        return future.result()
+
+    def _take(self) -> Optional[List["Future[None]"]]:
+        with self._cond:
+            while not self._group:
+                if self._stopping:
+                    return None
+                self._cond.wait()
+
+            deadline = time.monotonic() + self.window
+            while len(self._group) < self.max_group and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            group, self._group = self._group, []
+        return group
+
+    def _run(self) -> None:
+        while True:
+            group = self._take()
+            if group is None:
+                return
+
+            # Cancelled requests need no sync
+            group = [f for f in group if f.set_running_or_notify_cancel()]
+            if not group:
+                continue
+
+            try:
+                self.kvdb.sync()
+            except BaseException as e:
+                for future in group:
+                    future.set_exception(e)
+            else:
+                for future in group:
+                    future.set_result(None)
+            self.syncs += 1
@@ -7,7 +7,20 @@ import pathlib
 from collections.abc import Iterator
 from enum import Enum, IntEnum, IntFlag, unique
 from types import TracebackType
-from typing import List, Optional, SupportsBytes, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    SupportsBytes,
+    Tuple,
+    Type,
+    Union,
+)
+
+from hse3.values import Codec
 
 def init(config: Optional[Union[str, os.PathLike[str]]] = ..., *params: str) -> None:
     """
@@ -48,6 +61,7 @@ class HseException(Exception):
         @SUB@ hse.HseException.returncode
         """
         ...
+
     @property
     def ctx(self) -> ErrCtx:
         """
@@ -90,66 +104,78 @@ class Kvdb:
         @SUB@ hse.Kvdb.close
         """
         ...
+
     @staticmethod
     def create(kvdb_home: Union[str, os.PathLike[str]], *params: str) -> None:
         """
         @SUB@ hse.Kvdb.create
         """
         ...
+
     @staticmethod
     def drop(kvdb_home: Union[str, os.PathLike[str]]) -> None:
         """
         @SUB@ hse.Kvdb.drop
         """
         ...
+
     @staticmethod
     def open(kvdb_home: Union[str, os.PathLike[str]], *params: str) -> Kvdb:
         """
         @SUB@ hse.Kvdb.open
         """
         ...
+
     @property
     def home(self) -> pathlib.Path:
         """
         @SUB@ hse.Kvdb.home
         """
         ...
+
     def param(self, param: str) -> str:
         """
         @SUB@ hse.Kvdb.param
         """
         ...
+
     @property
     def kvs_names(self) -> List[str]:
         """
         @SUB@ hse.Kvdb.kvs_names
         """
         ...
+
     def kvs_create(self, name: str, *params: str) -> None:
         """
         @SUB@ hse.Kvdb.kvs_create
         """
         ...
+
     def kvs_drop(self, name: str) -> None:
         """
         @SUB@ hse.Kvdb.kvs_drop
         """
         ...
-    def kvs_open(self, name: str, *params: str) -> Kvs:
+
+    def kvs_open(self, name: str, *params: str, codec: Optional[Codec] = ...) -> Kvs:
         """
         @SUB@ hse.Kvdb.kvs_open
         """
         ...
+
     def sync(self, flags: Optional[KvdbSyncFlag] = ...) -> None:
         """
         @SUB@ hse.Kvdb.sync
         """
         ...
+
     def mclass_info(self, mclass: Mclass) -> MclassInfo:
         """
         @SUB@ hse.Kvdb.mclass_info
         """
         ...
+
     def mclass_is_configured(self, mclass: Mclass) -> bool:
         """
         @SUB@ hse.Kvdb.mclass_is_configured
@@ -161,6 +187,7 @@ class Kvdb:
         @SUB@ hse.Kvdb.compact
         """
         ...
+
     @property
     def compact_status(self) -> KvdbCompactStatus:
         """
@@ -173,12 +200,19 @@ class Kvdb:
         """
         @SUB@ hse.Kvdb.storage_add
         """
+
     def transaction(self) -> KvdbTransaction:
         """
         @SUB@ hse.Kvdb.transaction
         """
         ...
 
+    def snapshot(self) -> KvdbSnapshot:
+        """
+        @SUB@ hse.Kvdb.snapshot
+        """
+        ...
+
 class KvsPutFlags(IntFlag):
     """
     @SUB@ hse.KvsPutFlags
@@ -195,6 +229,39 @@ class CursorCreateFlag(IntFlag):
 
     REV = ...
 
+class ChangeOp(IntEnum):
+    """
+    @SUB@ hse.ChangeOp
+    """
+
+    PUT = ...
+    DELETE = ...
+    PREFIX_DELETE = ...
+    COMMIT = ...
+    ABORT = ...
+
+class ChangeEvent(NamedTuple):
+    """
+    @SUB@ hse.ChangeEvent
+    """
+
+    op: ChangeOp
+    kvs: Optional[Kvs]
+    key: Optional[bytes]
+    value: Optional[bytes]
+
+def add_hook(hook: Callable[[List[ChangeEvent]], None]) -> None:
+    """
+    @SUB@ hse.add_hook
+    """
+    ...
+
+def remove_hook(hook: Callable[[List[ChangeEvent]], None]) -> None:
+    """
+    @SUB@ hse.remove_hook
+    """
+    ...
+
 # ifdef HSE_PYTHON_EXPERIMENTAL
 class KvsPfxProbeCnt(Enum):
     """
@@ -214,16 +281,19 @@ class Kvs:
         @SUB@ hse.Kvs.name
         """
         ...
+
     def param(self, param: str) -> str:
         """
         @SUB@ hse.Kvs.param
         """
         ...
+
     def close(self) -> None:
         """
         @SUB@ hse.Kvs.close
         """
         ...
+
     def put(
         self,
         key: Union[str, bytes, SupportsBytes],
@@ -235,6 +305,7 @@ class Kvs:
         @SUB@ hse.Kvs.put
         """
         ...
+
     def get(
         self,
         key: Union[str, bytes, SupportsBytes],
@@ -245,6 +316,82 @@ class Kvs:
         @SUB@ hse.Kvs.get
         """
         ...
+
+    def get_into(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        buf: Union[bytearray, memoryview],
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> Optional[int]:
+        """
+        @SUB@ hse.Kvs.get_into
+        """
+        ...
+
+    def put_array(
+        self,
+        keys: Any,
+        values: Any,
+        txn: Optional[KvdbTransaction] = ...,
+        flags: Optional[KvsPutFlags] = ...,
+    ) -> None:
+        """
+        @SUB@ hse.Kvs.put_array
+        """
+        ...
+
+    def get_array(
+        self,
+        keys: Any,
+        out: Any = ...,
+        dtype: Any = ...,
+        shape: Tuple[int, ...] = ...,
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> Tuple[Any, Any]:
+        """
+        @SUB@ hse.Kvs.get_array
+        """
+        ...
+
+    @property
+    def writes(self) -> int:
+        """
+        @SUB@ hse.Kvs.writes
+        """
+        ...
+
+    @property
+    def codec(self) -> Optional[Codec]:
+        """
+        @SUB@ hse.Kvs.codec
+        """
+        ...
+
+    @codec.setter
+    def codec(self, codec: Optional[Codec]) -> None: ...
+    def put_obj(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        obj: Any,
+        txn: Optional[KvdbTransaction] = ...,
+        flags: Optional[KvsPutFlags] = ...,
+    ) -> None:
+        """
+        @SUB@ hse.Kvs.put_obj
+        """
+        ...
+
+    def get_obj(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        txn: Optional[KvdbTransaction] = ...,
+        default: Any = ...,
+    ) -> Any:
+        """
+        @SUB@ hse.Kvs.get_obj
+        """
+        ...
+
     def delete(
         self,
         key: Union[str, bytes, SupportsBytes],
@@ -254,6 +401,7 @@ class Kvs:
         @SUB@ hse.Kvs.delete
         """
         ...
+
     def prefix_delete(
         self, pfx: Union[str, bytes], txn: Optional[KvdbTransaction] = ...
     ) -> None:
@@ -285,6 +433,46 @@ class Kvs:
         """
         ...
 
+    def count(
+        self,
+        prefix: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> int:
+        """
+        @SUB@ hse.Kvs.count
+        """
+        ...
+
+    def size(
+        self,
+        prefix: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> int:
+        """
+        @SUB@ hse.Kvs.size
+        """
+        ...
+
+    def first(
+        self,
+        prefix: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> Optional[bytes]:
+        """
+        @SUB@ hse.Kvs.first
+        """
+        ...
+
+    def last(
+        self,
+        prefix: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        txn: Optional[KvdbTransaction] = ...,
+    ) -> Optional[bytes]:
+        """
+        @SUB@ hse.Kvs.last
+        """
+        ...
+
 class KvdbTransactionState(Enum):
     """
     @SUB@ hse.KvdbTransactionState
@@ -312,16 +500,19 @@ class KvdbTransaction:
         @SUB@ hse.KvdbTransaction.begin
         """
         ...
+
     def commit(self) -> None:
         """
         @SUB@ hse.KvdbTransaction.commit
         """
         ...
+
     def abort(self) -> None:
         """
         @SUB@ hse.KvdbTransaction.abort
         """
         ...
+
     @property
     def state(self) -> KvdbTransactionState:
         """
@@ -329,6 +520,56 @@ class KvdbTransaction:
         """
         ...
 
+class KvdbSnapshot:
+    """
+    @SUB@ hse.KvdbSnapshot
+    """
+
+    def __enter__(self) -> KvdbSnapshot: ...
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None: ...
+    def close(self) -> None:
+        """
+        @SUB@ hse.KvdbSnapshot.close
+        """
+        ...
+
+    @property
+    def closed(self) -> bool:
+        """
+        @SUB@ hse.KvdbSnapshot.closed
+        """
+        ...
+
+    def get(self, kvs: Kvs, key: Union[str, bytes, SupportsBytes]) -> Optional[bytes]:
+        """
+        @SUB@ hse.KvdbSnapshot.get
+        """
+        ...
+
+    def get_many(
+        self, kvs: Kvs, keys: Iterable[Union[str, bytes, SupportsBytes]]
+    ) -> List[Optional[bytes]]:
+        """
+        @SUB@ hse.KvdbSnapshot.get_many
+        """
+        ...
+
+    def cursor(
+        self,
+        kvs: Kvs,
+        filt_min: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        filt_max: Optional[Union[str, bytes, SupportsBytes]] = ...,
+    ) -> KvsCursor:
+        """
+        @SUB@ hse.KvdbSnapshot.cursor
+        """
+        ...
+
 class KvsCursor:
     def __enter__(self) -> KvsCursor: ...
     def __exit__(
@@ -343,20 +584,44 @@ class KvsCursor:
         @SUB@ hse.KvsCursor.eof
         """
         ...
+
     def destroy(self) -> None:
         """
         @SUB@ hse.KvsCursor.destroy
         """
         ...
+
     def items(
         self,
         key_buf: Optional[bytearray] = ...,
         value_buf: Optional[bytearray] = ...,
-    ) -> Iterator[Tuple[Optional[bytes], Optional[bytes]]]:
+    ) -> Iterator[Tuple[Optional[bytes], Any]]:
         """
         @SUB@ hse.KvsCursor.items
         """
         ...
+
+    def record_batches(
+        self,
+        batch_size: int = ...,
+        filt_min: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        filt_max: Optional[Union[str, bytes, SupportsBytes]] = ...,
+        batch_bytes: int = ...,
+    ) -> Iterator[Any]:
+        """
+        @SUB@ hse.KvsCursor.record_batches
+        """
+        ...
+
+    @property
+    def codec(self) -> Optional[Codec]:
+        """
+        @SUB@ hse.KvsCursor.codec
+        """
+        ...
+
+    @codec.setter
+    def codec(self, codec: Optional[Codec]) -> None: ...
     def read(
         self, key_buf: Optional[bytearray] = ..., value_buf: Optional[bytearray] = ...
     ) -> Tuple[Optional[bytes], Optional[bytes]]:
@@ -364,6 +629,7 @@ class KvsCursor:
         @SUB@ hse.KvsCursor.read
         """
         ...
+
     def update_view(
         self,
         txn: Optional[KvdbTransaction] = ...,
@@ -372,11 +638,13 @@ class KvsCursor:
         @SUB@ hse.KvsCursor.update_view
         """
         ...
+
     def seek(self, key: Optional[Union[str, bytes, SupportsBytes]]) -> Optional[bytes]:
         """
         @SUB@ hse.KvsCursor.seek
         """
         ...
+
     def seek_range(
         self,
         filt_min: Optional[Union[str, bytes, SupportsBytes]],
@@ -399,24 +667,28 @@ class KvdbCompactStatus:
         @SUB@ hse.KvdbCompactStatus.samp_lwm
         """
         ...
+
     @property
     def samp_hwm(self) -> int:
         """
         @SUB@ hse.KvdbCompactStatus.samp_hwm
         """
         ...
+
     @property
     def samp_curr(self) -> int:
         """
         @SUB@ hse.KvdbCompactStatus.samp_curr
         """
         ...
+
     @property
     def active(self) -> int:
         """
         @SUB@ hse.KvdbCompactStatus.active
         """
         ...
+
     @property
     def canceled(self) -> int:
         """
@@ -437,12 +709,14 @@ class MclassInfo:
         @SUB@ hse.MclassInfo.allocated_bytes
         """
         ...
+
     @property
     def used_bytes(self) -> int:
         """
         @SUB@ hse.MclassInfo.used_bytes
         """
         ...
+
     @property
     def path(self) -> pathlib.Path:
         """
@@ -4,16 +4,29 @@
 
 import errno
 import os
-import pathlib
+import threading
+import weakref
+from collections import namedtuple
 
 cimport cython
 cimport limits
 
-from enum import Enum, IntEnum, IntFlag, unique
-from types import TracebackType
-from typing import Dict, Iterable, Iterator, List, Optional, SupportsBytes, Tuple, Type, Union
+from enum import Enum, IntEnum, IntFlag
 
-from libc.stdlib cimport free, malloc
+# Names used in annotations. Cython resolves them when compiling but never
+# evaluates annotations at runtime, so these modules, which are slow to import,
+# are not imported.
+_TYPE_CHECKING = False
+if _TYPE_CHECKING:
+    import pathlib
+    from types import TracebackType
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, SupportsBytes, Tuple, Type, Union
+
+from cpython.buffer cimport PyBuffer_FillInfo
+from cpython.exc cimport PyErr_Restore, PyErr_WriteUnraisable
+from cpython.ref cimport PyObject, Py_INCREF, Py_XINCREF
+from libc.stdlib cimport free, malloc, realloc
+from libc.string cimport memcmp, memcpy
 
 # Throughout these bindings, you will see C pointers be set to NULL after their
 # destruction. Please continue to follow this pattern as the HSE C code does
@@ -22,6 +35,50 @@ from libc.stdlib cimport free, malloc
 
 # bytes(<bytes object>) returns the original bytes object. It is not a copy.
 
+# Handles are released by atomically taking the pointer and leaving NULL
+# behind, so concurrent close()/destroy() calls and __dealloc__ free a handle
+# exactly once, with or without the GIL. Using a handle from one thread while
+# another thread closes it remains an error, as it is in C.
+cdef extern from *:
+    """
+    static inline void *hse_python_take(void **p)
+    {
+        return __atomic_exchange_n(p, NULL, __ATOMIC_ACQ_REL);
+    }
+
+    static inline void hse_python_count(unsigned long long *p, unsigned long long n)
+    {
+        __atomic_fetch_add(p, n, __ATOMIC_RELAXED);
+    }
+    """
+    void *hse_python_take(void **p) nogil
+    void hse_python_count(unsigned long long *p, unsigned long long n) nogil
+
+
+def _numpy():
+    # NumPy is optional and only needed by the array APIs
+    import numpy
+
+    return numpy
+
+
+cdef object _key_array(np, keys):
+    keys = np.asarray(keys)
+    if keys.ndim != 1 or keys.dtype.kind not in "ui":
+        raise TypeError("keys must be a one-dimensional integer array")
+    if keys.dtype.kind == "i" and keys.size > 0 and keys.min() < 0:
+        raise ValueError("keys must not be negative")
+
+    # Big-endian keys sort in numerical order
+    return np.ascontiguousarray(keys, dtype=">u8").view(np.uint8)
+
+
+def _pyarrow():
+    # pyarrow is optional and only needed by KvsCursor.record_batches()
+    import pyarrow
+
+    return pyarrow
+
 
 def to_bytes(obj: Optional[Union[str, bytes, SupportsBytes]]) -> bytes:
     if obj is None:
@@ -33,6 +90,17 @@ def to_bytes(obj: Optional[Union[str, bytes, SupportsBytes]]) -> bytes:
     return bytes(obj)
 
 
+cdef object _to_buffer(obj):
+    # Like to_bytes(), but contiguous byte memoryviews, such as views of
+    # shared memory, are used in place instead of being copied. Strided views
+    # are copied, since callers pass the address of the first byte to HSE.
+    if (type(obj) is memoryview and obj.format == "B" and obj.ndim == 1
+            and obj.c_contiguous):
+        return obj
+
+    return to_bytes(obj)
+
+
 cdef char **to_paramv(tuple params) except NULL:
     cdef char **paramv = <char **>malloc(len(params) * sizeof(char *))
     if not paramv:
@@ -47,10 +115,53 @@ cdef char **to_paramv(tuple params) except NULL:
     return paramv
 
 
+# HSE's state, including its threads, does not survive fork(), so neither HSE
+# nor the handles a child process inherits can be used in it. The KVDB and KVS
+# handles, which are opened rarely, are kept here so that the child can disown
+# them. Transactions and cursors are too many to track, so they check
+# _inherited when used or released instead.
+_handles = weakref.WeakSet()
+cdef long _init_pid = 0
+cdef bint _inherited = False
+
+
+cdef inline int _check_not_inherited() except -1:
+    if _inherited:
+        raise RuntimeError(
+            "HSE was initialized before this process was forked and cannot be "
+            "used in it. Initialize HSE after forking, see hse3.multiprocess.")
+    return 0
+
+
+def _after_fork_in_child() -> None:
+    global _inherited
+
+    if _init_pid == 0:
+        return
+    _inherited = True
+
+    # Forget the handles without releasing them. They point into the parent's
+    # copy of HSE, and close() skips NULL handles.
+    for handle in list(_handles):
+        if isinstance(handle, Kvdb):
+            (<Kvdb>handle)._c_hse_kvdb = NULL
+        else:
+            (<Kvs>handle)._c_hse_kvs = NULL
+    _handles.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
 def init(config: Optional[Union[str, os.PathLike[str]]] = None, *params: str) -> None:
     """
     @SUB@ hse.init
     """
+    global _init_pid
+
+    _check_not_inherited()
+
     config_bytes = os.fspath(config).encode() if config else None
     cdef const char *config_addr = <char *>config_bytes if config_bytes else NULL
     cdef char **paramv = to_paramv(params) if len(params) > 0 else NULL
@@ -62,12 +173,22 @@ def init(config: Optional[Union[str, os.PathLike[str]]] = None, *params: str) ->
     if err != 0:
         raise HseException(err)
 
+    _init_pid = os.getpid()
+
 
 def fini() -> None:
     """
     @SUB@ hse.fini
     """
+    global _init_pid
+
+    # Finalizing a copy of HSE inherited across fork() would wait on threads
+    # which only exist in the parent
+    if _inherited:
+        return
+
     hse_fini()
+    _init_pid = 0
 
 
 def param(str param) -> str:
@@ -97,7 +218,6 @@ def param(str param) -> str:
         free(buf)
 
 
-@unique
 class ErrCtx(IntEnum):
     """
     @SUB@ hse.ErrCtx
@@ -138,7 +258,6 @@ class HseException(Exception):
         return self.__ctx
 
 
-@unique
 class KvdbSyncFlag(IntFlag):
     """
     @SUB@ hse.KvdbSyncFlag
@@ -146,13 +265,11 @@ class KvdbSyncFlag(IntFlag):
     ASYNC = HSE_KVDB_SYNC_ASYNC
 
 IF HSE_PYTHON_EXPERIMENTAL == 1:
-    @unique
     class KvdbCompactFlag(IntFlag):
         CANCEL = HSE_KVDB_COMPACT_CANCEL
         SAMP_LWM = HSE_KVDB_COMPACT_SAMP_LWM
 
 
-@unique
 class Mclass(Enum):
     """
     @SUB@ hse.Mclass
@@ -189,12 +306,15 @@ cdef class MclassInfo:
         """
         @SUB@ hse.MclassInfo.path
         """
+        import pathlib
+
         return pathlib.Path(self._c_hse_mclass_info.mi_path.decode())
 
 
 cdef class Kvdb:
     def __cinit__(self, kvdb_home: Union[str, os.PathLike[str]], *params: str):
         self._c_hse_kvdb = NULL
+        _check_not_inherited()
 
         kvdb_home_bytes = os.fspath(kvdb_home).encode() if kvdb_home else None
         cdef const char *kvdb_home_addr = <char *>kvdb_home_bytes if kvdb_home_bytes else NULL
@@ -204,31 +324,37 @@ cdef class Kvdb:
         free(paramv)
         if err != 0:
             raise HseException(err)
+        _handles.add(self)
 
     @property
     def home(self) -> pathlib.Path:
         """
         @SUB@ hse.Kvdb.home
         """
+        import pathlib
+
         return pathlib.Path(hse_kvdb_home_get(self._c_hse_kvdb).decode())
 
     def close(self) -> None:
         """
         @SUB@ hse.Kvdb.close
         """
-        if not self._c_hse_kvdb:
+        cdef hse_kvdb *kvdb = <hse_kvdb *>hse_python_take(<void **>&self._c_hse_kvdb)
+        if not kvdb:
             return
 
-        cdef hse_err_t err = hse_kvdb_close(self._c_hse_kvdb)
+        cdef hse_err_t err = hse_kvdb_close(kvdb)
         if err != 0:
+            self._c_hse_kvdb = kvdb
             raise HseException(err)
-        self._c_hse_kvdb = NULL
 
     @staticmethod
     def create(kvdb_home: Union[str, os.PathLike[str]], *params: str) -> None:
         """
         @SUB@ hse.Kvdb.create
         """
+        _check_not_inherited()
+
         kvdb_home_bytes = os.fspath(kvdb_home).encode() if kvdb_home else None
         cdef const char *kvdb_home_addr = <char *>kvdb_home_bytes if kvdb_home_bytes else NULL
         cdef char **paramv = to_paramv(params) if len(params) > 0 else NULL
@@ -299,11 +425,14 @@ cdef class Kvdb:
         if err != 0:
             raise HseException(err)
 
-    def kvs_open(self, str kvs_name, *params: str) -> Kvs:
+    def kvs_open(self, str kvs_name, *params: str, codec=None) -> Kvs:
         """
         @SUB@ hse.Kvdb.kvs_open
         """
-        return Kvs(self, kvs_name, *params)
+        kvs = Kvs(self, kvs_name, *params)
+        kvs.codec = codec
+
+        return kvs
 
     def param(self, str param) -> str:
         """
@@ -420,8 +549,16 @@ cdef class Kvdb:
 
         return txn
 
+    def snapshot(self) -> KvdbSnapshot:
+        """
+        @SUB@ hse.Kvdb.snapshot
+        """
+        return KvdbSnapshot(self)
+
+    cdef hse_kvdb *handle_c(self) nogil:
+        return self._c_hse_kvdb
+
 
-@unique
 class KvsPutFlags(IntFlag):
     """
     @SUB@ hse.KvsPutFlags
@@ -431,7 +568,6 @@ class KvsPutFlags(IntFlag):
     VCOMP_ON = HSE_KVS_PUT_VCOMP_ON
 
 
-@unique
 class CursorCreateFlag(IntFlag):
     """
     @SUB@ hse.CursorCreateFlag
@@ -439,8 +575,91 @@ class CursorCreateFlag(IntFlag):
     REV = HSE_CURSOR_CREATE_REV
 
 
+class ChangeOp(IntEnum):
+    """
+    @SUB@ hse.ChangeOp
+    """
+    PUT = 1
+    DELETE = 2
+    PREFIX_DELETE = 3
+    COMMIT = 4
+    ABORT = 5
+
+
+ChangeEvent = namedtuple("ChangeEvent", ("op", "kvs", "key", "value"))
+ChangeEvent.__doc__ = """
+    @SUB@ hse.ChangeEvent
+    """
+
+_COMMIT = ChangeEvent(ChangeOp.COMMIT, None, None, None)
+_ABORT = ChangeEvent(ChangeOp.ABORT, None, None, None)
+
+# Hooks are replaced rather than mutated, so they can be iterated without a
+# lock while another thread adds or removes one. Writes only test _hooked
+# when no hooks are registered.
+cdef list _hooks = []
+cdef bint _hooked = False
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Callable[[List[ChangeEvent]], None]) -> None:
+    """
+    @SUB@ hse.add_hook
+    """
+    global _hooks, _hooked
+
+    with _hooks_lock:
+        _hooks = _hooks + [hook]
+        _hooked = True
+
+
+def remove_hook(hook: Callable[[List[ChangeEvent]], None]) -> None:
+    """
+    @SUB@ hse.remove_hook
+    """
+    global _hooks, _hooked
+
+    with _hooks_lock:
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = hooks
+        _hooked = len(hooks) > 0
+
+
+cdef _emit(list events):
+    # The changes have already been made, so an exception from a hook must not
+    # reach the caller, who would take it for a failed write or commit
+    for hook in _hooks:
+        try:
+            hook(events)
+        except Exception as e:
+            _unraisable(hook, e)
+
+
+cdef void _unraisable(hook, e):
+    # Hands the exception to sys.unraisablehook, which prints it by default
+    cdef object exc_type = type(e)
+    cdef object tb = e.__traceback__
+    Py_INCREF(exc_type)
+    Py_INCREF(e)
+    Py_XINCREF(<PyObject *>tb)
+    PyErr_Restore(<PyObject *>exc_type, <PyObject *>e, <PyObject *>tb)
+    PyErr_WriteUnraisable(hook)
+
+
+cdef _record(KvdbTransaction txn, event):
+    # Writes outside a transaction are committed once they return. Writes in
+    # a transaction are held until it commits.
+    if txn is None:
+        _emit([event])
+        return
+
+    if txn._events is None:
+        txn._events = []
+    txn._events.append(event)
+
+
 IF HSE_PYTHON_EXPERIMENTAL == 1:
-    @unique
     class KvsPfxProbeCnt(Enum):
         """
         @SUB@ hse.KvsPfxProbeCnt
@@ -450,9 +669,20 @@ IF HSE_PYTHON_EXPERIMENTAL == 1:
         MUL = HSE_KVS_PFX_FOUND_MUL
 
 
+# Only identifies the default of Kvs.get(), it is never written to, so it does
+# not need to hold a value
+_GET_BUF = bytearray(1)
+
+# Initial and smallest size hint of Kvs._get_exact()
+cdef size_t _VALUE_HINT = 4096
+
+
 cdef class Kvs:
     def __cinit__(self, Kvdb kvdb, str name, *params: str):
         self._c_hse_kvs = NULL
+        self._codec = None
+        self._value_hint = _VALUE_HINT
+        self._writes = 0
 
         name_bytes = name.encode() if name else None
         cdef const char *name_addr = <char *>name_bytes if name_bytes else NULL
@@ -463,6 +693,7 @@ cdef class Kvs:
         free(paramv)
         if err != 0:
             raise HseException(err)
+        _handles.add(self)
 
     @property
     def name(self) -> str:
@@ -475,13 +706,14 @@ cdef class Kvs:
         """
         @SUB@ hse.Kvs.close
         """
-        if not self._c_hse_kvs:
+        cdef hse_kvs *kvs = <hse_kvs *>hse_python_take(<void **>&self._c_hse_kvs)
+        if not kvs:
             return
 
-        cdef hse_err_t err = hse_kvdb_kvs_close(self._c_hse_kvs)
+        cdef hse_err_t err = hse_kvdb_kvs_close(kvs)
         if err != 0:
+            self._c_hse_kvs = kvs
             raise HseException(err)
-        self._c_hse_kvs = NULL
 
     def param(self, str param) -> str:
         """
@@ -527,7 +759,7 @@ cdef class Kvs:
         cdef size_t value_len = 0
 
         cdef const unsigned char [:]key_view = to_bytes(key)
-        cdef const unsigned char [:]value_view = to_bytes(value)
+        cdef const unsigned char [:]value_view = _to_buffer(value)
 
         if txn:
             txn_addr = txn._c_hse_kvdb_txn
@@ -543,16 +775,29 @@ cdef class Kvs:
             err = hse_kvs_put(self._c_hse_kvs, cflags, txn_addr, key_addr, key_len, value_addr, value_len)
         if err != 0:
             raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            _record(txn, ChangeEvent(ChangeOp.PUT, self, to_bytes(key), to_bytes(value)))
 
     def get(
             self,
             key: Union[str, bytes, SupportsBytes],
             KvdbTransaction txn=None,
-            unsigned char [:]buf=bytearray(limits.HSE_KVS_VALUE_LEN_MAX),
+            unsigned char [:]buf=_GET_BUF,
         ) -> Tuple[Optional[bytes], int]:
         """
         @SUB@ hse.Kvs.get
         """
+        if buf is not None and buf.base is _GET_BUF:
+            # Read into a private bytes object of the exact length, which
+            # concurrent calls cannot share. The result is the same as with a
+            # buffer as large as the largest value.
+            value = self._get_exact(key, txn)
+            if value is None:
+                return None, 0
+            return value, len(value)
+
         cdef unsigned int cflags = 0
         cdef hse_kvdb_txn *txn_addr = NULL
         cdef const void *key_addr = NULL
@@ -586,10 +831,306 @@ cdef class Kvs:
             return None, value_len
 
         if value_len < len(buf):
-            return bytes(buf)[:value_len], value_len
+            return bytes(buf[:value_len]), value_len
 
         return bytes(buf), value_len
 
+    def get_into(
+            self,
+            key: Union[str, bytes, SupportsBytes],
+            unsigned char [:]buf not None,
+            KvdbTransaction txn=None,
+        ) -> Optional[int]:
+        """
+        @SUB@ hse.Kvs.get_into
+        """
+        cdef unsigned int cflags = 0
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const void *key_addr = NULL
+        cdef size_t key_len = 0
+        cdef void *buf_addr = NULL
+        cdef size_t buf_len = buf.shape[0]
+
+        cdef const unsigned char [:]key_view = to_bytes(key)
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+        if key_view is not None:
+            key_addr = &key_view[0]
+            key_len = key_view.shape[0]
+        if buf_len > 0:
+            buf_addr = &buf[0]
+
+        cdef cbool found = False
+        cdef size_t value_len = 0
+        cdef hse_err_t err = 0
+        with nogil:
+            err = hse_kvs_get(self._c_hse_kvs, cflags, txn_addr, key_addr,
+                key_len, &found, buf_addr, buf_len, &value_len)
+        if err != 0:
+            raise HseException(err)
+        if not found:
+            return None
+
+        return value_len
+
+    def put_array(
+            self,
+            keys: Any,
+            values: Any,
+            KvdbTransaction txn=None,
+            flags: Optional[KvsPutFlags]=None,
+        ) -> None:
+        """
+        @SUB@ hse.Kvs.put_array
+        """
+        np = _numpy()
+
+        key_array = _key_array(np, keys)
+        value_array = np.ascontiguousarray(values)
+        cdef Py_ssize_t count = key_array.shape[0] // 8
+        if value_array.ndim == 0 or value_array.shape[0] != count:
+            raise ValueError("values must have one row per key")
+        if count == 0:
+            return
+
+        value_array = value_array.reshape(count, -1).view(np.uint8)
+        if value_array.shape[1] > limits.HSE_KVS_VALUE_LEN_MAX:
+            raise ValueError(f"Value rows must not exceed {limits.HSE_KVS_VALUE_LEN_MAX} bytes")
+
+        cdef unsigned int cflags = int(flags) if flags else 0
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const unsigned char [::1]key_view = key_array
+        cdef const unsigned char [:, ::1]value_view = value_array
+        cdef size_t value_len = value_view.shape[1]
+        cdef const void *value_addr = NULL
+        cdef Py_ssize_t i = 0
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+
+        cdef hse_err_t err = 0
+        with nogil:
+            while i < count:
+                value_addr = &value_view[i, 0] if value_len > 0 else NULL
+                err = hse_kvs_put(self._c_hse_kvs, cflags, txn_addr, &key_view[8 * i], 8,
+                    value_addr, value_len)
+                if err != 0:
+                    break
+                i += 1
+        hse_python_count(&self._writes, i)
+        if _hooked:
+            for j in range(i):
+                _record(txn, ChangeEvent(ChangeOp.PUT, self, key_array[8 * j:8 * j + 8].tobytes(),
+                    value_array[j].tobytes()))
+        if err != 0:
+            raise HseException(err)
+
+    def get_array(
+            self,
+            keys: Any,
+            out: Any=None,
+            dtype: Any=None,
+            shape: Tuple[int, ...]=(),
+            KvdbTransaction txn=None,
+        ) -> Tuple[Any, Any]:
+        """
+        @SUB@ hse.Kvs.get_array
+        """
+        np = _numpy()
+
+        key_array = _key_array(np, keys)
+        cdef Py_ssize_t count = key_array.shape[0] // 8
+
+        if out is None:
+            if dtype is None:
+                raise ValueError("dtype is required when out is not given")
+            out = np.zeros((count, *shape), dtype=dtype)
+        elif out.ndim == 0 or out.shape[0] != count or not out.flags.c_contiguous:
+            raise ValueError("out must be C-contiguous with one row per key")
+
+        found = np.zeros(count, dtype=np.bool_)
+        if count == 0:
+            return out, found
+
+        cdef unsigned int cflags = 0
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const unsigned char [::1]key_view = key_array
+        cdef unsigned char [:, ::1]out_view = out.reshape(count, -1).view(np.uint8)
+        cdef unsigned char [::1]found_view = found.view(np.uint8)
+        cdef size_t row_len = out_view.shape[1]
+        cdef void *row_addr = NULL
+        cdef cbool row_found = False
+        cdef size_t value_len = 0
+        cdef Py_ssize_t bad = -1
+        cdef Py_ssize_t i = 0
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+
+        cdef hse_err_t err = 0
+        with nogil:
+            while i < count:
+                row_addr = &out_view[i, 0] if row_len > 0 else NULL
+                err = hse_kvs_get(self._c_hse_kvs, cflags, txn_addr, &key_view[8 * i], 8,
+                    &row_found, row_addr, row_len, &value_len)
+                if err != 0:
+                    break
+                if row_found:
+                    if value_len != row_len and bad < 0:
+                        bad = i
+                    found_view[i] = 1
+                i += 1
+        if err != 0:
+            raise HseException(err)
+        if bad >= 0:
+            raise ValueError(f"Value of key {int(key_array[8 * bad:8 * bad + 8].view('>u8')[0])} "
+                "does not match the row size of out")
+
+        return out, found
+
+    @property
+    def writes(self) -> int:
+        """
+        @SUB@ hse.Kvs.writes
+        """
+        return self._writes
+
+    @property
+    def codec(self):
+        """
+        @SUB@ hse.Kvs.codec
+        """
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec) -> None:
+        self._codec = codec
+
+    def put_obj(
+            self,
+            key: Union[str, bytes, SupportsBytes],
+            obj: Any,
+            KvdbTransaction txn=None,
+            flags: Optional[KvsPutFlags]=None,
+        ) -> None:
+        """
+        @SUB@ hse.Kvs.put_obj
+        """
+        if self._codec is None:
+            raise ValueError("KVS has no codec")
+
+        cdef unsigned int cflags = int(flags) if flags else 0
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const void *key_addr = NULL
+        cdef size_t key_len = 0
+        cdef const void *value_addr = NULL
+        cdef size_t value_len = 0
+
+        cdef const unsigned char [:]key_view = to_bytes(key)
+        # Encoded buffers are used in place, they are only valid until the
+        # codec's next encode() on this thread.
+        encoded = self._codec.encode(obj)
+        cdef const unsigned char [:]value_view = encoded
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+        if key_view is not None:
+            key_addr = &key_view[0]
+            key_len = key_view.shape[0]
+        if value_view is not None and value_view.shape[0] > 0:
+            value_addr = &value_view[0]
+            value_len = value_view.shape[0]
+
+        cdef hse_err_t err = 0
+        with nogil:
+            err = hse_kvs_put(self._c_hse_kvs, cflags, txn_addr, key_addr, key_len, value_addr, value_len)
+        if err != 0:
+            raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            # The encoded buffer may be reused by the codec, so keep a copy
+            _record(txn, ChangeEvent(ChangeOp.PUT, self, to_bytes(key), bytes(encoded)))
+
+    def get_obj(
+            self,
+            key: Union[str, bytes, SupportsBytes],
+            KvdbTransaction txn=None,
+            default: Any=None,
+        ) -> Any:
+        """
+        @SUB@ hse.Kvs.get_obj
+        """
+        if self._codec is None:
+            raise ValueError("KVS has no codec")
+
+        value = self._get_exact(key, txn)
+        if value is None:
+            return default
+
+        return self._codec.decode(value)
+
+    cdef bytes _get_exact(self, key, KvdbTransaction txn):
+        # Read a value straight into a bytes object of the exact value length.
+        # The object is allocated from a size hint, then shrunk in place, so
+        # the value is copied exactly once. The hint grows to the largest
+        # value seen, and halves whenever a value fills less than a quarter
+        # of it, so one large value does not make every later get allocate
+        # that much.
+        cdef unsigned int cflags = 0
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const void *key_addr = NULL
+        cdef size_t key_len = 0
+
+        cdef const unsigned char [:]key_view = to_bytes(key)
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+        if key_view is not None:
+            key_addr = &key_view[0]
+            key_len = key_view.shape[0]
+
+        cdef cbool found = False
+        cdef size_t value_len = 0
+        cdef size_t buf_len = self._value_hint
+        cdef PyObject *value = NULL
+        cdef char *buf_addr = NULL
+        cdef hse_err_t err = 0
+
+        while True:
+            value = PyBytes_FromStringAndSize(NULL, buf_len)
+            if value == NULL:
+                raise MemoryError()
+            buf_addr = PyBytes_AS_STRING(value)
+            with nogil:
+                err = hse_kvs_get(self._c_hse_kvs, cflags, txn_addr, key_addr,
+                    key_len, &found, buf_addr, buf_len, &value_len)
+            if err != 0 or not found:
+                Py_DECREF(value)
+                if err != 0:
+                    raise HseException(err)
+                return None
+            if value_len <= buf_len:
+                break
+
+            # The value outgrew the hint. Retry with the reported length.
+            Py_DECREF(value)
+            buf_len = value_len
+            self._value_hint = value_len
+
+        if value_len < buf_len // 4 and buf_len > _VALUE_HINT:
+            self._value_hint = max(buf_len // 2, _VALUE_HINT)
+
+        if value_len < buf_len:
+            # On failure the object is released and value is set to NULL
+            _PyBytes_Resize(&value, value_len)
+
+        result = <bytes>value
+        Py_DECREF(value)
+
+        return result
+
     def delete(self, key: Union[str, bytes, SupportsBytes], KvdbTransaction txn=None) -> None:
         """
         @SUB@ hse.Kvs.delete
@@ -612,6 +1153,10 @@ cdef class Kvs:
             err = hse_kvs_delete(self._c_hse_kvs, cflags, txn_addr, key_addr, key_len)
         if err != 0:
             raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            _record(txn, ChangeEvent(ChangeOp.DELETE, self, to_bytes(key), None))
 
     def prefix_delete(self, pfx: Union[str, bytes], txn: KvdbTransaction=None) -> None:
         """
@@ -635,6 +1180,10 @@ cdef class Kvs:
             err = hse_kvs_prefix_delete(self._c_hse_kvs, cflags, txn_addr, pfx_addr, pfx_len)
         if err != 0:
             raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            _record(txn, ChangeEvent(ChangeOp.PREFIX_DELETE, self, to_bytes(pfx), None))
 
     IF HSE_PYTHON_EXPERIMENTAL == 1:
         def prefix_probe(
@@ -708,8 +1257,163 @@ cdef class Kvs:
 
         return cursor
 
+    cdef tuple _walk(self, prefix, KvdbTransaction txn, unsigned int cflags, bint first):
+        # Walk a cursor over the keys starting with prefix in C, without
+        # creating Python objects, skipping keys reserved by the codec. With
+        # first, stop at the first key and return it.
+        cdef hse_kvdb_txn *txn_addr = NULL
+        cdef const void *filt_addr = NULL
+        cdef size_t filt_len = 0
+        cdef const void *reserved_addr = NULL
+        cdef size_t reserved_len = 0
+        cdef hse_kvs_cursor *cursor = NULL
+        cdef const void *key = NULL
+        cdef size_t key_len = 0
+        cdef const void *value = NULL
+        cdef size_t value_len = 0
+        cdef cbool eof = False
+        cdef unsigned long long count = 0
+        cdef unsigned long long size = 0
+        cdef hse_err_t err = 0
+
+        cdef const unsigned char [:]filt_view = to_bytes(prefix)
+        reserved = getattr(self._codec, "reserved_prefix", None) if self._codec is not None else None
+        cdef const unsigned char [:]reserved_view = reserved if reserved else None
+
+        if txn:
+            txn_addr = txn._c_hse_kvdb_txn
+        if filt_view is not None and filt_view.shape[0] > 0:
+            filt_addr = &filt_view[0]
+            filt_len = filt_view.shape[0]
+        if reserved_view is not None:
+            reserved_addr = &reserved_view[0]
+            reserved_len = reserved_view.shape[0]
+
+        with nogil:
+            err = hse_kvs_cursor_create(self._c_hse_kvs, cflags, txn_addr, filt_addr,
+                filt_len, &cursor)
+            while err == 0:
+                err = hse_kvs_cursor_read(cursor, 0, &key, &key_len, &value, &value_len, &eof)
+                if err != 0 or eof:
+                    break
+                if key_len >= reserved_len > 0 and memcmp(key, reserved_addr, reserved_len) == 0:
+                    continue
+                count += 1
+                size += key_len + value_len
+                if first:
+                    break
+
+        # The key is only valid until the cursor is destroyed
+        found = (<char *>key)[:key_len] if err == 0 and first and count > 0 else None
+        if cursor:
+            with nogil:
+                hse_kvs_cursor_destroy(cursor)
+        if err != 0:
+            raise HseException(err)
+
+        return count, size, found
+
+    def count(
+            self,
+            prefix: Optional[Union[str, bytes, SupportsBytes]]=None,
+            KvdbTransaction txn=None,
+        ) -> int:
+        """
+        @SUB@ hse.Kvs.count
+        """
+        return self._walk(prefix, txn, 0, False)[0]
+
+    def size(
+            self,
+            prefix: Optional[Union[str, bytes, SupportsBytes]]=None,
+            KvdbTransaction txn=None,
+        ) -> int:
+        """
+        @SUB@ hse.Kvs.size
+        """
+        return self._walk(prefix, txn, 0, False)[1]
+
+    def first(
+            self,
+            prefix: Optional[Union[str, bytes, SupportsBytes]]=None,
+            KvdbTransaction txn=None,
+        ) -> Optional[bytes]:
+        """
+        @SUB@ hse.Kvs.first
+        """
+        return self._walk(prefix, txn, 0, True)[2]
+
+    def last(
+            self,
+            prefix: Optional[Union[str, bytes, SupportsBytes]]=None,
+            KvdbTransaction txn=None,
+        ) -> Optional[bytes]:
+        """
+        @SUB@ hse.Kvs.last
+        """
+        return self._walk(prefix, txn, HSE_CURSOR_CREATE_REV, True)[2]
+
+    cdef hse_kvs *handle_c(self) nogil:
+        return self._c_hse_kvs
+
+    cdef int get_c(
+            self,
+            const void *key,
+            size_t key_len,
+            void *buf,
+            size_t buf_len,
+            size_t *value_len,
+            KvdbTransaction txn=None,
+        ) except -1:
+        cdef hse_kvdb_txn *txn_addr = txn._c_hse_kvdb_txn if txn else NULL
+        cdef cbool found = False
+        cdef hse_err_t err = 0
+        with nogil:
+            err = hse_kvs_get(self._c_hse_kvs, 0, txn_addr, key, key_len, &found,
+                buf, buf_len, value_len)
+        if err != 0:
+            raise HseException(err)
+
+        return found
+
+    cdef int put_c(
+            self,
+            const void *key,
+            size_t key_len,
+            const void *value,
+            size_t value_len,
+            KvdbTransaction txn=None,
+            unsigned int flags=0,
+        ) except -1:
+        cdef hse_kvdb_txn *txn_addr = txn._c_hse_kvdb_txn if txn else NULL
+        cdef hse_err_t err = 0
+        with nogil:
+            err = hse_kvs_put(self._c_hse_kvs, flags, txn_addr, key, key_len, value, value_len)
+        if err != 0:
+            raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            _record(txn, ChangeEvent(ChangeOp.PUT, self, (<const char *>key)[:key_len],
+                (<const char *>value)[:value_len] if value else None))
+
+        return 0
+
+    cdef int delete_c(self, const void *key, size_t key_len, KvdbTransaction txn=None) except -1:
+        cdef hse_kvdb_txn *txn_addr = txn._c_hse_kvdb_txn if txn else NULL
+        cdef hse_err_t err = 0
+        with nogil:
+            err = hse_kvs_delete(self._c_hse_kvs, 0, txn_addr, key, key_len)
+        if err != 0:
+            raise HseException(err)
+        hse_python_count(&self._writes, 1)
+
+        if _hooked:
+            _record(txn, ChangeEvent(ChangeOp.DELETE, self, (<const char *>key)[:key_len], None))
+
+        return 0
+
 
-@unique
 class KvdbTransactionState(Enum):
     """
     @SUB@ hse.KvdbTransactionState
@@ -734,14 +1438,17 @@ cdef class KvdbTransaction:
             raise MemoryError()
 
     def __dealloc__(self):
-        if not self.kvdb._c_hse_kvdb:
+        if _inherited or not self.kvdb._c_hse_kvdb:
             return
-        if not self._c_hse_kvdb_txn:
+
+        cdef hse_kvdb_txn *txn = <hse_kvdb_txn *>hse_python_take(<void **>&self._c_hse_kvdb_txn)
+        if not txn:
             return
 
-        with nogil:
-            hse_kvdb_txn_free(self.kvdb._c_hse_kvdb, self._c_hse_kvdb_txn)
-            self._c_hse_kvdb_txn = NULL
+        # Keep the GIL. Kvdb.close() holds it too, so on builds with a GIL the
+        # KVDB cannot be closed by another thread between the check above and
+        # the free.
+        hse_kvdb_txn_free(self.kvdb._c_hse_kvdb, txn)
 
     def __enter__(self):
         self.begin()
@@ -756,9 +1463,10 @@ cdef class KvdbTransaction:
         if self.state == KvdbTransactionState.ACTIVE:
             self.commit()
 
-        with nogil:
-            hse_kvdb_txn_free(self.kvdb._c_hse_kvdb, self._c_hse_kvdb_txn)
-            self._c_hse_kvdb_txn = NULL
+        cdef hse_kvdb_txn *txn = <hse_kvdb_txn *>hse_python_take(<void **>&self._c_hse_kvdb_txn)
+        if txn and not _inherited:
+            with nogil:
+                hse_kvdb_txn_free(self.kvdb._c_hse_kvdb, txn)
 
     def begin(self) -> None:
         """
@@ -770,6 +1478,8 @@ cdef class KvdbTransaction:
         if err != 0:
             raise HseException(err)
 
+        self._events = None
+
     def commit(self) -> None:
         """
         @SUB@ hse.KvdbTransaction.commit
@@ -780,6 +1490,14 @@ cdef class KvdbTransaction:
         if err != 0:
             raise HseException(err)
 
+        events = self._events
+        self._events = None
+        if _hooked:
+            if events is None:
+                events = []
+            events.append(_COMMIT)
+            _emit(events)
+
     def abort(self) -> None:
         """
         @SUB@ hse.KvdbTransaction.abort
@@ -790,6 +1508,10 @@ cdef class KvdbTransaction:
         if err != 0:
             raise HseException(err)
 
+        self._events = None
+        if _hooked:
+            _emit([_ABORT])
+
     @property
     def state(self) -> KvdbTransactionState:
         """
@@ -800,6 +1522,150 @@ cdef class KvdbTransaction:
             state = hse_kvdb_txn_state_get(self.kvdb._c_hse_kvdb, self._c_hse_kvdb_txn)
         return KvdbTransactionState(state)
 
+    cdef hse_kvdb_txn *handle_c(self) nogil:
+        return self._c_hse_kvdb_txn
+
+
+cdef class KvdbSnapshot:
+    """
+    @SUB@ hse.KvdbSnapshot
+    """
+    def __cinit__(self, Kvdb kvdb):
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._txn = KvdbTransaction(kvdb)
+        self._txn.begin()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]):
+        self.close()
+
+    def close(self) -> None:
+        """
+        @SUB@ hse.KvdbSnapshot.close
+        """
+        cdef KvdbTransaction txn = None
+        cdef hse_err_t err = 0
+
+        with self._lock:
+            txn = self._txn
+            self._txn = None
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        if txn is None:
+            return
+
+        for cursor in cursors:
+            cursor.destroy()
+
+        # Nothing was written, so the abort only releases the view. The engine
+        # is called directly since this is not a transaction abort to hooks.
+        with nogil:
+            err = hse_kvdb_txn_abort(txn.kvdb._c_hse_kvdb, txn._c_hse_kvdb_txn)
+        if err != 0:
+            raise HseException(err)
+
+    @property
+    def closed(self) -> bool:
+        """
+        @SUB@ hse.KvdbSnapshot.closed
+        """
+        return self._txn is None
+
+    cdef KvdbTransaction _view(self):
+        if self._txn is None:
+            raise ValueError("Snapshot is closed")
+        return self._txn
+
+    def get(self, Kvs kvs, key: Union[str, bytes, SupportsBytes]) -> Optional[bytes]:
+        """
+        @SUB@ hse.KvdbSnapshot.get
+        """
+        return kvs._get_exact(key, self._view())
+
+    def get_many(self, Kvs kvs, keys: Iterable[Union[str, bytes, SupportsBytes]]) -> List[Optional[bytes]]:
+        """
+        @SUB@ hse.KvdbSnapshot.get_many
+        """
+        cdef KvdbTransaction txn = self._view()
+
+        return [kvs._get_exact(key, txn) for key in keys]
+
+    def cursor(
+        self,
+        Kvs kvs,
+        filt_min: Optional[Union[str, bytes, SupportsBytes]]=None,
+        filt_max: Optional[Union[str, bytes, SupportsBytes]]=None,
+    ) -> KvsCursor:
+        """
+        @SUB@ hse.KvdbSnapshot.cursor
+        """
+        cdef KvdbTransaction txn = self._view()
+        cdef KvsCursor cursor = self._cursors.get(kvs)
+
+        # A cursor used as a context manager is destroyed on exit
+        if cursor is None or cursor._c_hse_kvs_cursor == NULL:
+            cursor = KvsCursor(kvs, txn=txn)
+            self._cursors[kvs] = cursor
+        elif not cursor._eof:
+            # Repositioning it would move the scan of whoever holds it
+            raise RuntimeError(
+                "The snapshot's cursor over this KVS is still in use, read it "
+                "to the end or destroy it first")
+        else:
+            cursor.codec = kvs.codec
+        cursor.seek_range(filt_min, filt_max)
+
+        return cursor
+
+
+cdef class _Buffer:
+    # Growable malloc()ed buffer exposed read-only through the buffer protocol,
+    # so that it can be handed to Arrow without a copy.
+    def __cinit__(self):
+        self._data = NULL
+        self._size = 0
+        self._capacity = 0
+
+    def __dealloc__(self):
+        free(self._data)
+        self._data = NULL
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        PyBuffer_FillInfo(buffer, self, self._data, self._size, 1, flags)
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        pass
+
+    cdef int _reserve(self, size_t capacity) nogil:
+        cdef char *data = NULL
+
+        if capacity <= self._capacity:
+            return 0
+
+        data = <char *>realloc(self._data, capacity)
+        if not data:
+            return -1
+        self._data = data
+        self._capacity = capacity
+
+        return 0
+
+    cdef int _append(self, const void *src, size_t length) nogil:
+        cdef size_t capacity = self._capacity if self._capacity > 0 else 4096
+
+        while capacity < self._size + length:
+            capacity *= 2
+        if self._reserve(capacity) != 0:
+            return -1
+        if length > 0:
+            memcpy(self._data + self._size, src, length)
+        self._size += length
+
+        return 0
+
 
 cdef class KvsCursor:
     def __cinit__(
@@ -810,6 +1676,7 @@ cdef class KvsCursor:
         flags: Optional[CursorCreateFlag]=None,
     ):
         self._eof = False
+        self._codec = kvs._codec
 
         cdef unsigned int cflags = int(flags) if flags else 0
         cdef hse_kvdb_txn *txn_addr = NULL
@@ -837,10 +1704,11 @@ cdef class KvsCursor:
             raise HseException(err)
 
     def __dealloc__(self):
-        if self._c_hse_kvs_cursor:
-            with nogil:
-                hse_kvs_cursor_destroy(self._c_hse_kvs_cursor)
-            self._c_hse_kvs_cursor = NULL
+        # Keep the GIL so on builds with a GIL the destroy is ordered with
+        # Kvs.close() and Kvdb.close(), which hold it too
+        cdef hse_kvs_cursor *cursor = <hse_kvs_cursor *>hse_python_take(<void **>&self._c_hse_kvs_cursor)
+        if cursor and not _inherited:
+            hse_kvs_cursor_destroy(cursor)
 
     def __enter__(self):
         return self
@@ -852,10 +1720,10 @@ cdef class KvsCursor:
         """
         @SUB@ hse.KvsCursor.destroy
         """
-        if self._c_hse_kvs_cursor:
+        cdef hse_kvs_cursor *cursor = <hse_kvs_cursor *>hse_python_take(<void **>&self._c_hse_kvs_cursor)
+        if cursor and not _inherited:
             with nogil:
-                hse_kvs_cursor_destroy(self._c_hse_kvs_cursor)
-            self._c_hse_kvs_cursor = NULL
+                hse_kvs_cursor_destroy(cursor)
 
     def items(self, unsigned char [:]key_buf=None, unsigned char [:]value_buf=None) -> Iterator[Tuple[Optional[bytes], Optional[bytes]]]:
         """
@@ -869,7 +1737,129 @@ cdef class KvsCursor:
                 else:
                     return
 
-        return _iter(key_buf=key_buf, value_buf=value_buf)
+        def _iter_decoded(unsigned char [:]key_buf=None, unsigned char [:]value_buf=None):
+            decode = self._codec.decode
+            reserved = getattr(self._codec, "reserved_prefix", None)
+            while True:
+                key, val = self.read(key_buf=key_buf, value_buf=value_buf)
+                if self._eof:
+                    return
+                if reserved and key.startswith(reserved):
+                    continue
+                yield key, decode(val if val is not None else b"")
+
+        if self._codec is None:
+            return _iter(key_buf=key_buf, value_buf=value_buf)
+
+        return _iter_decoded(key_buf=key_buf, value_buf=value_buf)
+
+    def record_batches(
+        self,
+        Py_ssize_t batch_size=65536,
+        filt_min: Optional[Union[str, bytes, SupportsBytes]]=None,
+        filt_max: Optional[Union[str, bytes, SupportsBytes]]=None,
+        size_t batch_bytes=64 * 1024 * 1024,
+    ) -> Iterator[Any]:
+        """
+        @SUB@ hse.KvsCursor.record_batches
+        """
+        pa = _pyarrow()
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if filt_min is not None or filt_max is not None:
+            self.seek_range(filt_min, filt_max)
+
+        binary = pa.large_binary()
+        schema = pa.schema([("key", binary), ("value", binary)])
+
+        def _iter():
+            cdef _Buffer key_offsets
+            cdef _Buffer keys
+            cdef _Buffer value_offsets
+            cdef _Buffer values
+
+            while not self._eof:
+                key_offsets = _Buffer()
+                keys = _Buffer()
+                value_offsets = _Buffer()
+                values = _Buffer()
+
+                count = self._fill_batch(key_offsets, keys, value_offsets, values,
+                    batch_size, batch_bytes)
+                if count == 0:
+                    return
+
+                yield pa.RecordBatch.from_arrays([
+                    pa.Array.from_buffers(binary, count, [None, pa.py_buffer(key_offsets), pa.py_buffer(keys)]),
+                    pa.Array.from_buffers(binary, count, [None, pa.py_buffer(value_offsets), pa.py_buffer(values)]),
+                ], schema=schema)
+
+        return _iter()
+
+    cdef Py_ssize_t _fill_batch(
+            self,
+            _Buffer key_offsets,
+            _Buffer keys,
+            _Buffer value_offsets,
+            _Buffer values,
+            Py_ssize_t batch_size,
+            size_t batch_bytes) except -1:
+        # Read up to batch_size records into Arrow binary layout: int64 offset
+        # arrays of count + 1 entries and concatenated data buffers.
+        cdef size_t offsets_size = (batch_size + 1) * sizeof(int64_t)
+        if key_offsets._reserve(offsets_size) != 0 or value_offsets._reserve(offsets_size) != 0:
+            raise MemoryError()
+
+        cdef int64_t *key_offs = <int64_t *>key_offsets._data
+        cdef int64_t *value_offs = <int64_t *>value_offsets._data
+        cdef const void *key = NULL
+        cdef size_t key_len = 0
+        cdef const void *value = NULL
+        cdef size_t value_len = 0
+        cdef cbool eof = False
+        cdef int nomem = 0
+        cdef Py_ssize_t count = 0
+        cdef hse_err_t err = 0
+
+        key_offs[0] = 0
+        value_offs[0] = 0
+        _check_not_inherited()
+        with nogil:
+            while count < batch_size:
+                err = hse_kvs_cursor_read(self._c_hse_kvs_cursor, 0, &key, &key_len,
+                    &value, &value_len, &eof)
+                if err != 0 or eof:
+                    break
+                if keys._append(key, key_len) != 0 or values._append(value, value_len) != 0:
+                    nomem = 1
+                    break
+                count += 1
+                key_offs[count] = keys._size
+                value_offs[count] = values._size
+                if keys._size + values._size >= batch_bytes:
+                    break
+        if err != 0:
+            raise HseException(err)
+        if nomem:
+            raise MemoryError()
+
+        self._eof = eof
+        key_offsets._size = (count + 1) * sizeof(int64_t)
+        value_offsets._size = (count + 1) * sizeof(int64_t)
+
+        return count
+
+    @property
+    def codec(self):
+        """
+        @SUB@ hse.KvsCursor.codec
+        """
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec) -> None:
+        self._codec = codec
 
     def update_view(self) -> None:
         """
@@ -878,6 +1868,7 @@ cdef class KvsCursor:
         cdef unsigned int cflags = 0
 
         cdef hse_err_t err = 0
+        _check_not_inherited()
         with nogil:
             err = hse_kvs_cursor_update_view(self._c_hse_kvs_cursor, cflags)
         if err != 0:
@@ -900,6 +1891,7 @@ cdef class KvsCursor:
         cdef const void *found = NULL
         cdef size_t found_len = 0
         cdef hse_err_t err = 0
+        _check_not_inherited()
         with nogil:
             err = hse_kvs_cursor_seek(
                 self._c_hse_kvs_cursor,
@@ -912,6 +1904,7 @@ cdef class KvsCursor:
         if err != 0:
             raise HseException(err)
 
+        self._eof = False
         if not found:
             return None
 
@@ -940,6 +1933,7 @@ cdef class KvsCursor:
         cdef const void *found = NULL
         cdef size_t found_len = 0
         cdef hse_err_t err = 0
+        _check_not_inherited()
         with nogil:
             err = hse_kvs_cursor_seek_range(
                 self._c_hse_kvs_cursor,
@@ -954,6 +1948,7 @@ cdef class KvsCursor:
         if err != 0:
             raise HseException(err)
 
+        self._eof = False
         if not found:
             return None
 
@@ -979,6 +1974,7 @@ cdef class KvsCursor:
 
         copy = key_buf is not None or value_buf is not None
 
+        _check_not_inherited()
         if copy:
             if key_buf is not None and len(key_buf) > 0:
                 key_buf_addr = &key_buf[0]
@@ -1018,7 +2014,10 @@ cdef class KvsCursor:
             return None, None
         else:
             if copy:
-                return bytes(key_buf)[:key_len] if key_buf is not None else None, bytes(value_buf)[:value_len] if value_buf is not None else None
+                return (
+                    bytes(key_buf[:min(key_len, key_buf.shape[0])]) if key_buf is not None else None,
+                    bytes(value_buf[:min(value_len, value_buf.shape[0])]) if value_buf is not None else None,
+                )
             else:
                 return (<char *>key)[:key_len] if key else None, (<char *>value)[:value_len] if value else None
 
@@ -1030,6 +2029,45 @@ cdef class KvsCursor:
         """
         return self._eof
 
+    cdef hse_kvs_cursor *handle_c(self) nogil:
+        return self._c_hse_kvs_cursor
+
+    cdef int seek_c(
+            self,
+            const void *key,
+            size_t key_len,
+            const void **found,
+            size_t *found_len,
+        ) except -1:
+        cdef hse_err_t err = 0
+        _check_not_inherited()
+        with nogil:
+            err = hse_kvs_cursor_seek(self._c_hse_kvs_cursor, 0, key, key_len, found, found_len)
+        if err != 0:
+            raise HseException(err)
+        self._eof = False
+
+        return 0
+
+    cdef int read_c(
+            self,
+            const void **key,
+            size_t *key_len,
+            const void **value,
+            size_t *value_len,
+        ) except -1:
+        cdef cbool eof = False
+        cdef hse_err_t err = 0
+        _check_not_inherited()
+        with nogil:
+            err = hse_kvs_cursor_read(self._c_hse_kvs_cursor, 0, key, key_len, value,
+                value_len, &eof)
+        if err != 0:
+            raise HseException(err)
+        self._eof = eof
+
+        return not eof
+
 
 IF HSE_PYTHON_EXPERIMENTAL == 1:
     cdef class KvdbCompactStatus:
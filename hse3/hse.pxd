@@ -2,7 +2,27 @@
 #
 # SPDX-FileCopyrightText: Copyright 2020 Micron Technology, Inc.
 
-from libc.stdint cimport uint64_t
+# This file is installed next to the extension module so that other Cython
+# extensions can call into the bindings without going through Python calls:
+#
+#     from hse3.hse cimport Kvs
+#
+#     cdef int store(Kvs kvs, const char *key, size_t key_len) except -1:
+#         return kvs.put_c(key, key_len, NULL, 0)
+#
+# Such extensions compile against the HSE headers but should not link HSE. The
+# bindings may carry a static copy of the library, and calls must go through
+# the copy which owns the handles.
+#
+# The methods ending in _c form the C API. They take raw pointers and lengths,
+# are called with the GIL held and release it around calls into HSE, and raise
+# HseException on errors. Values are stored and returned as they are, without
+# the KVS codec. The handle_c() methods return the underlying HSE handles,
+# which remain owned by the Python objects. Everything else in this file is
+# private.
+
+from cpython.object cimport PyObject
+from libc.stdint cimport int64_t, uint64_t
 
 # Avoid interfering with Python bool type since Cython seems to struggle
 # differentiating the two
@@ -11,6 +31,11 @@ from libcpp cimport bool as cbool
 
 cdef extern from "Python.h":
     char* PyUnicode_AsUTF8(object unicode)
+    # Raw bytes API, used to return values without an intermediate copy
+    PyObject *PyBytes_FromStringAndSize(const char *v, Py_ssize_t len)
+    char *PyBytes_AS_STRING(PyObject *o)
+    int _PyBytes_Resize(PyObject **o, Py_ssize_t newsize) except -1
+    void Py_DECREF(PyObject *o)
 
 
 cdef extern from "hse/flags.h":
@@ -229,20 +254,101 @@ cdef extern from "hse/hse.h":
 
 cdef class Kvdb:
     cdef hse_kvdb *_c_hse_kvdb
+    cdef object __weakref__
+
+    cdef hse_kvdb *handle_c(self) nogil
 
 
 cdef class Kvs:
     cdef hse_kvs *_c_hse_kvs
+    cdef object __weakref__
+    cdef object _codec
+    cdef size_t _value_hint
+    cdef unsigned long long _writes
+
+    cdef bytes _get_exact(self, key, KvdbTransaction txn)
+    cdef tuple _walk(self, prefix, KvdbTransaction txn, unsigned int cflags, bint first)
+
+    cdef hse_kvs *handle_c(self) nogil
+    # Returns 1 if the key was found, 0 otherwise. value_len is set to the
+    # length of the value, which may be more than buf_len.
+    cdef int get_c(
+        self,
+        const void *key,
+        size_t key_len,
+        void *buf,
+        size_t buf_len,
+        size_t *value_len,
+        KvdbTransaction txn=*) except -1
+    cdef int put_c(
+        self,
+        const void *key,
+        size_t key_len,
+        const void *value,
+        size_t value_len,
+        KvdbTransaction txn=*,
+        unsigned int flags=*) except -1
+    cdef int delete_c(self, const void *key, size_t key_len, KvdbTransaction txn=*) except -1
 
 
 cdef class KvdbTransaction:
     cdef hse_kvdb_txn *_c_hse_kvdb_txn
+    cdef object __weakref__
     cdef Kvdb kvdb
+    cdef list _events
+
+    cdef hse_kvdb_txn *handle_c(self) nogil
+
+
+cdef class KvdbSnapshot:
+    cdef KvdbTransaction _txn
+    cdef dict _cursors
+    cdef object _lock
+
+    cdef KvdbTransaction _view(self)
+
+
+cdef class _Buffer:
+    cdef char *_data
+    cdef size_t _size
+    cdef size_t _capacity
+
+    cdef int _reserve(self, size_t capacity) nogil
+    cdef int _append(self, const void *src, size_t length) nogil
 
 
 cdef class KvsCursor:
     cdef hse_kvs_cursor *_c_hse_kvs_cursor
+    cdef object __weakref__
     cdef cbool _eof
+    cdef object _codec
+
+    cdef Py_ssize_t _fill_batch(
+        self,
+        _Buffer key_offsets,
+        _Buffer keys,
+        _Buffer value_offsets,
+        _Buffer values,
+        Py_ssize_t batch_size,
+        size_t batch_bytes) except -1
+
+    cdef hse_kvs_cursor *handle_c(self) nogil
+    # found is set to the first key at or after key, or to NULL if there is
+    # none. It is valid until the next operation on the cursor.
+    cdef int seek_c(
+        self,
+        const void *key,
+        size_t key_len,
+        const void **found,
+        size_t *found_len) except -1
+    # Returns 1 if an entry was read, 0 at the end of the cursor. The key and
+    # the value are valid until the next operation on the cursor.
+    cdef int read_c(
+        self,
+        const void **key,
+        size_t *key_len,
+        const void **value,
+        size_t *value_len) except -1
 
 
 cdef class MclassInfo:
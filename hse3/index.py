@@ -0,0 +1,397 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Secondary indexes over a primary KVS, maintained in KVDB transactions.
+
+A KVDB is a transaction domain across all of its KVSs. ``IndexedKvs`` uses that
+to keep any number of index KVSs consistent with a primary KVS: each put or
+delete reads the previous value, removes its stale index entries, writes the
+new entries and writes the primary record, all in one ``KvdbTransaction``.
+
+Each index is declared with an extractor function mapping a value to the index
+values it should be found under. An index entry is a key in the index KVS
+encoded with ``hse3.keys`` as ``(index value, primary key)`` with an empty
+value, so all primary keys for one index value are adjacent and ordered.
+
+A unique index instead keys each entry by the index value alone, with the
+primary key as its value. Two transactions claiming the same index value for
+different primary keys then write the same key, and HSE fails the second
+write with a conflict.
+
+All KVSs involved must be opened with ``transactions.enabled=true``.
+
+Example::
+
+    by_email = Index(kvdb.kvs_open("users.email", "transactions.enabled=true"),
+                     lambda user: [user["email"]], unique=True)
+    users = IndexedKvs(kvdb, kvdb.kvs_open("users", "transactions.enabled=true",
+                       codec=values.PickleCodec()), email=by_email)
+
+    users.put(b"u1", {"email": "a@example.com"})
+    users.lookup("email", "a@example.com")  # [(b"u1", {...})]
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    SupportsBytes,
+    Tuple,
+    Union,
+)
+
+from hse3 import hse, keys
+
+__all__ = ["Index", "IndexConflictError", "IndexedKvs"]
+
+_Key = Union[str, bytes, SupportsBytes]
+
+_ENTRY = keys.KeyCodec(keys.Bytes(), keys.Bytes())
+_UNIQUE_ENTRY = keys.KeyCodec(keys.Bytes())
+
+_MISSING = object()
+
+
+def _to_bytes(obj: _Key) -> bytes:
+    if isinstance(obj, str):
+        return obj.encode()
+    return bytes(obj)
+
+
+class IndexConflictError(ValueError):
+    """
+    Raised when a put would give a unique index value a second primary key.
+    """
+
+
+class Index:
+    """
+    Secondary index stored in its own KVS.
+
+    Args:
+        kvs: KVS holding the index entries. It must not be shared with another
+            index or the primary data.
+        extractor: Function returning the index values of a primary value, as
+            an iterable of str, bytes or bytes-like objects. It receives the
+            decoded object if the primary KVS has a codec, otherwise the raw
+            value bytes.
+        unique: Reject puts which would map one index value to more than one
+            primary key. Concurrent transactions claiming the same value
+            conflict: the put of the later one raises an HseException with
+            ECANCELED, and that transaction must be aborted.
+    """
+
+    def __init__(
+        self,
+        kvs: hse.Kvs,
+        extractor: Callable[[Any], Optional[Iterable[_Key]]],
+        unique: bool = False,
+    ) -> None:
+        self.kvs = kvs
+        self.extractor = extractor
+        self.unique = unique
+
+    def values(self, value: Any) -> Set[bytes]:
+        """
+        Return the encoded index values of a primary value.
+        """
+        extracted = self.extractor(value)
+        if extracted is None:
+            return set()
+        return {_to_bytes(v) for v in extracted}
+
+    def _delete(self, value: bytes, pkey: bytes, txn: hse.KvdbTransaction) -> None:
+        if self.unique:
+            self.kvs.delete(_UNIQUE_ENTRY.encode(value), txn=txn)
+        else:
+            self.kvs.delete(_ENTRY.encode(value, pkey), txn=txn)
+
+    def _put(self, value: bytes, pkey: bytes, txn: hse.KvdbTransaction) -> None:
+        if self.unique:
+            self.kvs.put(_UNIQUE_ENTRY.encode(value), pkey, txn=txn)
+        else:
+            self.kvs.put(_ENTRY.encode(value, pkey), None, txn=txn)
+
+
+class IndexedKvs:
+    """
+    Primary KVS whose writes keep a set of secondary indexes up to date.
+
+    Reads and writes take an optional transaction. Without one, every write
+    runs in its own transaction, committed before returning, and reads use a
+    transaction only to get a consistent view across the index and primary
+    KVSs.
+
+    Args:
+        kvdb: KVDB containing all KVSs.
+        primary: KVS holding the primary records. If it has a codec, values
+            are written and read through it.
+        indexes: Indexes keyed by name.
+    """
+
+    def __init__(self, kvdb: hse.Kvdb, primary: hse.Kvs, **indexes: Index) -> None:
+        self.kvdb = kvdb
+        self.primary = primary
+        self.indexes: Dict[str, Index] = indexes
+
+    def _update(self, key: bytes, old: Any, new: Any, txn: hse.KvdbTransaction) -> None:
+        # old and new are _MISSING when there is no record before or after
+        for index in self.indexes.values():
+            before = index.values(old) if old is not _MISSING else set()
+            after = index.values(new) if new is not _MISSING else set()
+            for value in before - after:
+                index._delete(value, key, txn)
+            for value in after - before:
+                if index.unique:
+                    self._check_unique(index, value, key, txn)
+                index._put(value, key, txn)
+
+    @staticmethod
+    def _check_unique(
+        index: Index, value: bytes, key: bytes, txn: hse.KvdbTransaction
+    ) -> None:
+        other = index.kvs.get(_UNIQUE_ENTRY.encode(value), txn=txn)[0]
+        if other is not None and other != key:
+            raise IndexConflictError(
+                f"Index value {value!r} already maps to primary key {other!r}"
+            )
+
+    def _run(
+        self,
+        txn: Optional[hse.KvdbTransaction],
+        fn: Callable[[hse.KvdbTransaction], None],
+    ) -> None:
+        if txn is not None:
+            fn(txn)
+            return
+
+        with self.kvdb.transaction() as own:
+            fn(own)
+
+    def put(
+        self,
+        key: _Key,
+        value: Any,
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> None:
+        """
+        Put a primary record and update all indexes.
+
+        Args:
+            key: Primary key.
+            value: Value, encoded with the primary KVS codec if it has one.
+            txn: Transaction to run in. A new transaction is used and
+                committed if not given.
+
+        Raises:
+            IndexConflictError: A unique index value is already in use by
+                another primary key. The transaction is aborted if it was
+                created by this call.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        pkey = _to_bytes(key)
+
+        def fn(t: hse.KvdbTransaction) -> None:
+            found, old = self._get_raw_or_obj(pkey, t)
+            self._update(pkey, old if found else _MISSING, value, t)
+            if self.primary.codec is not None:
+                self.primary.put_obj(pkey, value, txn=t)
+            else:
+                self.primary.put(pkey, value, txn=t)
+
+        self._run(txn, fn)
+
+    def delete(self, key: _Key, txn: Optional[hse.KvdbTransaction] = None) -> None:
+        """
+        Delete a primary record and its index entries.
+
+        It is not an error if the key does not exist.
+
+        Args:
+            key: Primary key.
+            txn: Transaction to run in. A new transaction is used and
+                committed if not given.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        pkey = _to_bytes(key)
+
+        def fn(t: hse.KvdbTransaction) -> None:
+            found, old = self._get_raw_or_obj(pkey, t)
+            if not found:
+                return
+            self._update(pkey, old, _MISSING, t)
+            self.primary.delete(pkey, txn=t)
+
+        self._run(txn, fn)
+
+    def get(self, key: _Key, txn: Optional[hse.KvdbTransaction] = None) -> Any:
+        """
+        Get a primary record by primary key.
+
+        Returns:
+            Any: Value, decoded with the primary KVS codec if it has one, or
+            None if the key does not exist.
+        """
+        return self._get_raw_or_obj(_to_bytes(key), txn)[1]
+
+    def _get_raw_or_obj(
+        self, key: bytes, txn: Optional[hse.KvdbTransaction]
+    ) -> Tuple[bool, Any]:
+        if self.primary.codec is not None:
+            missing = object()
+            value = self.primary.get_obj(key, txn=txn, default=missing)
+            if value is missing:
+                return False, None
+            return True, value
+
+        value, _ = self.primary.get(key, txn=txn)
+        return value is not None, value
+
+    def primary_keys(
+        self,
+        index: str,
+        values: Iterable[_Key],
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> Iterator[bytes]:
+        """
+        Find the primary keys filed under any of the given index values.
+
+        The index values are sorted and resolved with a single cursor over the
+        index KVS, seeking to each value's prefix in turn.
+
+        Args:
+            index: Index name.
+            values: Index values to look up.
+            txn: Transaction whose view to read.
+
+        Returns:
+            Iterator of primary keys, grouped by index value in index order.
+            Unique indexes are read with a get per value instead.
+        """
+        idx = self.indexes[index]
+        if idx.unique:
+            for entry in sorted({_UNIQUE_ENTRY.encode(_to_bytes(v)) for v in values}):
+                pkey = idx.kvs.get(entry, txn=txn)[0]
+                if pkey is not None:
+                    yield pkey
+            return
+
+        prefixes = sorted({_ENTRY.prefix(_to_bytes(v)) for v in values})
+        if not prefixes:
+            return
+
+        with idx.kvs.cursor(txn=txn) as cursor:
+            cursor.codec = None
+            for prefix in prefixes:
+                cursor.seek(prefix)
+                while True:
+                    entry, _ = cursor.read()
+                    if cursor.eof or entry is None or not entry.startswith(prefix):
+                        break
+                    yield _ENTRY.decode(entry)[1]
+
+    def lookup_many(
+        self,
+        index: str,
+        values: Iterable[_Key],
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> List[Tuple[bytes, Any]]:
+        """
+        Look up primary records by several index values at once.
+
+        Primary keys are collected with ``primary_keys()``, deduplicated and
+        fetched from the primary KVS in key order. When no transaction is
+        given, a transaction which is aborted afterwards provides a single
+        view of the index and primary KVSs, so an index entry never points at
+        a record written after the lookup started.
+
+        Args:
+            index: Index name.
+            values: Index values to look up.
+            txn: Transaction whose view to read.
+
+        Returns:
+            List of ``(primary key, value)`` pairs in primary key order.
+            Values are decoded with the primary KVS codec if it has one.
+        """
+        if txn is None:
+            with self.kvdb.transaction() as view:
+                result = self.lookup_many(index, values, txn=view)
+                view.abort()
+            return result
+
+        pkeys = sorted(set(self.primary_keys(index, values, txn=txn)))
+        result = []
+        for pkey in pkeys:
+            found, value = self._get_raw_or_obj(pkey, txn)
+            if found:
+                result.append((pkey, value))
+        return result
+
+    def lookup(
+        self,
+        index: str,
+        value: _Key,
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> List[Tuple[bytes, Any]]:
+        """
+        Look up primary records by one index value.
+
+        See ``lookup_many()``.
+        """
+        return self.lookup_many(index, (value,), txn=txn)
+
+    def rebuild(self, index: str, txn: Optional[hse.KvdbTransaction] = None) -> int:
+        """
+        Rebuild an index from the primary KVS, for example after adding it to
+        existing data.
+
+        The index KVS is cleared and refilled in a single transaction, whose
+        size is bounded by HSE's transaction limits.
+
+        Args:
+            index: Index name.
+            txn: Transaction to run in. A new transaction is used and
+                committed if not given.
+
+        Returns:
+            int: Number of index entries written.
+
+        Raises:
+            IndexConflictError: The data violates a unique index.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        idx = self.indexes[index]
+        count = 0
+
+        def fn(t: hse.KvdbTransaction) -> None:
+            nonlocal count
+            with idx.kvs.cursor(txn=t) as cursor:
+                cursor.codec = None
+                for entry, _ in cursor.items():
+                    idx.kvs.delete(entry, txn=t)
+
+            seen: Dict[bytes, bytes] = {}
+            with self.primary.cursor(txn=t) as cursor:
+                for pkey, value in cursor.items():
+                    assert pkey is not None
+                    for v in idx.values(value):
+                        if idx.unique and seen.setdefault(v, pkey) != pkey:
+                            raise IndexConflictError(
+                                f"Index value {v!r} maps to primary keys "
+                                f"{seen[v]!r} and {pkey!r}"
+                            )
+                        idx._put(v, pkey, t)
+                        count += 1
+
+        self._run(txn, fn)
+        return count
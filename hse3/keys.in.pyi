@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+@SUB@ keys
+"""
+
+from typing import Any, Optional, Tuple
+
+class Segment:
+    """
+    @SUB@ keys.Segment
+    """
+
+    @property
+    def width(self) -> Optional[int]:
+        """
+        @SUB@ keys.Segment.width
+        """
+        ...
+
+class UInt(Segment):
+    """
+    @SUB@ keys.UInt
+    """
+
+    def __init__(self, width: int = ...) -> None: ...
+
+class Int(Segment):
+    """
+    @SUB@ keys.Int
+    """
+
+    def __init__(self, width: int = ...) -> None: ...
+
+class Float(Segment):
+    """
+    @SUB@ keys.Float
+    """
+
+    def __init__(self) -> None: ...
+
+class Timestamp(Int):
+    """
+    @SUB@ keys.Timestamp
+    """
+
+    def __init__(self) -> None: ...
+
+class Bytes(Segment):
+    """
+    @SUB@ keys.Bytes
+    """
+
+    def __init__(self, width: Optional[int] = ...) -> None: ...
+
+class Str(Segment):
+    """
+    @SUB@ keys.Str
+    """
+
+    def __init__(self, width: Optional[int] = ...) -> None: ...
+
+class KeyCodec:
+    """
+    @SUB@ keys.KeyCodec
+    """
+
+    def __init__(self, *segments: Segment) -> None: ...
+    @property
+    def segments(self) -> Tuple[Segment, ...]:
+        """
+        @SUB@ keys.KeyCodec.segments
+        """
+        ...
+    def encode(self, *values: Any) -> bytes:
+        """
+        @SUB@ keys.KeyCodec.encode
+        """
+        ...
+    def prefix(self, *values: Any) -> bytes:
+        """
+        @SUB@ keys.KeyCodec.prefix
+        """
+        ...
+    def decode(self, key: bytes) -> Tuple[Any, ...]:
+        """
+        @SUB@ keys.KeyCodec.decode
+        """
+        ...
+    def prefix_length(self, count: int = ...) -> int:
+        """
+        @SUB@ keys.KeyCodec.prefix_length
+        """
+        ...
@@ -0,0 +1,399 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+@SUB@ keys
+"""
+
+import datetime
+
+cimport limits
+
+# Names used in annotations, see hse.pyx
+_TYPE_CHECKING = False
+if _TYPE_CHECKING:
+    from typing import Any, Optional, Tuple
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_FromStringAndSize
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport free, malloc
+from libc.string cimport memcpy, memset
+
+cdef object _EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+cdef object _MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+cdef inline void _store_be(uint64_t value, unsigned char *out, Py_ssize_t width) nogil:
+    cdef Py_ssize_t i
+    for i in range(width - 1, -1, -1):
+        out[i] = value & 0xFF
+        value >>= 8
+
+
+cdef inline uint64_t _load_be(const unsigned char *buf, Py_ssize_t width) nogil:
+    cdef uint64_t value = 0
+    cdef Py_ssize_t i
+    for i in range(width):
+        value = (value << 8) | buf[i]
+    return value
+
+
+cdef inline int _reserve(Py_ssize_t need, Py_ssize_t avail) except -1:
+    if need > avail:
+        raise ValueError(f"Encoded key exceeds {limits.HSE_KVS_KEY_LEN_MAX} bytes")
+    return 0
+
+
+cdef inline int _need(Py_ssize_t pos, Py_ssize_t need, Py_ssize_t length) except -1:
+    if pos + need > length:
+        raise ValueError("Truncated key")
+    return 0
+
+
+cdef Py_ssize_t _encode_raw(
+        Py_ssize_t width,
+        const unsigned char *data,
+        Py_ssize_t length,
+        unsigned char *out,
+        Py_ssize_t avail) except -1:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = 0
+
+    if width >= 0:
+        if length > width:
+            raise ValueError(f"Segment value is longer than {width} bytes")
+        # The NUL padding is stripped on decode, so it must be unambiguous
+        if length > 0 and data[length - 1] == 0:
+            raise ValueError("Fixed-width segment value ends with a NUL byte")
+        _reserve(width, avail)
+        memcpy(out, data, length)
+        memset(out + length, 0, width - length)
+        return width
+
+    # Variable-length segments escape NUL as 0x00 0x01 and are terminated by
+    # 0x00 0x00, so a shorter value always sorts before its extensions.
+    for i in range(length):
+        if data[i] == 0:
+            _reserve(n + 2, avail)
+            out[n] = 0
+            out[n + 1] = 1
+            n += 2
+        else:
+            _reserve(n + 1, avail)
+            out[n] = data[i]
+            n += 1
+    _reserve(n + 2, avail)
+    out[n] = 0
+    out[n + 1] = 0
+
+    return n + 2
+
+
+cdef bytes _decode_raw(Py_ssize_t width, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+    cdef Py_ssize_t start = pos[0]
+    cdef Py_ssize_t end = 0
+    cdef Py_ssize_t i = start
+    cdef Py_ssize_t n = 0
+    cdef bytes result
+    cdef char *dst = NULL
+
+    if width >= 0:
+        _need(start, width, length)
+        end = start + width
+        while end > start and buf[end - 1] == 0:
+            end -= 1
+        pos[0] = start + width
+        return PyBytes_FromStringAndSize(<const char *>buf + start, end - start)
+
+    while True:
+        _need(i, 1, length)
+        if buf[i] == 0:
+            _need(i, 2, length)
+            if buf[i + 1] == 0:
+                break
+            if buf[i + 1] != 1:
+                raise ValueError("Malformed key segment")
+            i += 2
+        else:
+            i += 1
+        n += 1
+
+    result = PyBytes_FromStringAndSize(NULL, n)
+    dst = PyBytes_AS_STRING(result)
+    end = i
+    i = start
+    n = 0
+    while i < end:
+        dst[n] = <char>buf[i]
+        i += 2 if buf[i] == 0 else 1
+        n += 1
+    pos[0] = end + 2
+
+    return result
+
+
+cdef class Segment:
+    """
+    @SUB@ keys.Segment
+    """
+    def __cinit__(self, *args, **kwargs):
+        if type(self) is Segment:
+            raise TypeError("Segment is abstract, use one of its subclasses")
+        self._width = -1
+
+    @property
+    def width(self) -> Optional[int]:
+        """
+        @SUB@ keys.Segment.width
+        """
+        return self._width if self._width >= 0 else None
+
+    def __repr__(self) -> str:
+        if self._width < 0:
+            return f"{type(self).__name__}()"
+        return f"{type(self).__name__}({self._width})"
+
+    # Implemented by every segment type. Segment itself cannot be instantiated,
+    # so these are never called.
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        raise NotImplementedError()
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        raise NotImplementedError()
+
+
+cdef class UInt(Segment):
+    """
+    @SUB@ keys.UInt
+    """
+    def __init__(self, int width=8):
+        if width < 1 or width > 8:
+            raise ValueError("Integer width must be between 1 and 8 bytes")
+        self._width = width
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        _reserve(self._width, avail)
+        if value < 0 or value >> (8 * self._width):
+            raise OverflowError(f"{value} does not fit in {self._width} unsigned bytes")
+        _store_be(<uint64_t>value, out, self._width)
+        return self._width
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        _need(pos[0], self._width, length)
+        value = _load_be(buf + pos[0], self._width)
+        pos[0] += self._width
+        return value
+
+
+cdef class Int(Segment):
+    """
+    @SUB@ keys.Int
+    """
+    def __init__(self, int width=8):
+        if width < 1 or width > 8:
+            raise ValueError("Integer width must be between 1 and 8 bytes")
+        self._width = width
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        bias = (<object>1) << (8 * self._width - 1)
+        _reserve(self._width, avail)
+        if value < -bias or value >= bias:
+            raise OverflowError(f"{value} does not fit in {self._width} signed bytes")
+        _store_be(<uint64_t>(value + bias), out, self._width)
+        return self._width
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        _need(pos[0], self._width, length)
+        value = _load_be(buf + pos[0], self._width)
+        pos[0] += self._width
+        return value - ((<object>1) << (8 * self._width - 1))
+
+
+cdef class Float(Segment):
+    """
+    @SUB@ keys.Float
+    """
+    def __init__(self):
+        self._width = 8
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        cdef double d = value
+        cdef uint64_t bits = 0
+
+        _reserve(8, avail)
+        memcpy(&bits, &d, 8)
+        if bits >> 63:
+            bits = ~bits
+        else:
+            bits ^= (<uint64_t>1) << 63
+        _store_be(bits, out, 8)
+        return 8
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        cdef double d = 0
+        cdef uint64_t bits = 0
+
+        _need(pos[0], 8, length)
+        bits = _load_be(buf + pos[0], 8)
+        if bits >> 63:
+            bits ^= (<uint64_t>1) << 63
+        else:
+            bits = ~bits
+        memcpy(&d, &bits, 8)
+        pos[0] += 8
+        return d
+
+
+cdef class Timestamp(Int):
+    """
+    @SUB@ keys.Timestamp
+    """
+    def __init__(self):
+        Int.__init__(self, 8)
+
+    def __repr__(self) -> str:
+        return "Timestamp()"
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        if not isinstance(value, datetime.datetime):
+            raise TypeError(f"Expected datetime, got {type(value).__name__}")
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return Int._encode(self, (value - _EPOCH) // _MICROSECOND, out, avail)
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        return _EPOCH + datetime.timedelta(microseconds=Int._decode(self, buf, length, pos))
+
+
+cdef class Bytes(Segment):
+    """
+    @SUB@ keys.Bytes
+    """
+    def __init__(self, width: Optional[int] = None):
+        if width is not None:
+            if width < 1:
+                raise ValueError("Segment width must be positive")
+            self._width = width
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        cdef bytes data = value if type(value) is bytes else bytes(value)
+        return _encode_raw(self._width, <const unsigned char *>PyBytes_AS_STRING(data), len(data), out, avail)
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        return _decode_raw(self._width, buf, length, pos)
+
+
+cdef class Str(Segment):
+    """
+    @SUB@ keys.Str
+    """
+    def __init__(self, width: Optional[int] = None):
+        if width is not None:
+            if width < 1:
+                raise ValueError("Segment width must be positive")
+            self._width = width
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1:
+        cdef bytes data = (<str?>value).encode()
+        return _encode_raw(self._width, <const unsigned char *>PyBytes_AS_STRING(data), len(data), out, avail)
+
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos):
+        return _decode_raw(self._width, buf, length, pos).decode()
+
+
+cdef class KeyCodec:
+    """
+    @SUB@ keys.KeyCodec
+    """
+    def __init__(self, *segments: Segment):
+        if not segments:
+            raise ValueError("A key needs at least one segment")
+        for segment in segments:
+            if not isinstance(segment, Segment):
+                raise TypeError(f"Expected Segment, got {type(segment).__name__}")
+        self._segments = segments
+
+    def __repr__(self) -> str:
+        return f"KeyCodec{self._segments!r}"
+
+    @property
+    def segments(self) -> Tuple[Segment, ...]:
+        """
+        @SUB@ keys.KeyCodec.segments
+        """
+        return self._segments
+
+    cdef bytes _encode_values(self, tuple values):
+        cdef unsigned char *buf = NULL
+        cdef Py_ssize_t n = 0
+        cdef Py_ssize_t i
+        cdef Segment segment
+
+        if len(values) > len(self._segments):
+            raise ValueError(f"Expected at most {len(self._segments)} values, got {len(values)}")
+
+        buf = <unsigned char *>malloc(limits.HSE_KVS_KEY_LEN_MAX)
+        if not buf:
+            raise MemoryError()
+
+        try:
+            for i in range(len(values)):
+                segment = <Segment>self._segments[i]
+                n += segment._encode(values[i], buf + n, limits.HSE_KVS_KEY_LEN_MAX - n)
+
+            return PyBytes_FromStringAndSize(<char *>buf, n)
+        finally:
+            free(buf)
+
+    def encode(self, *values: Any) -> bytes:
+        """
+        @SUB@ keys.KeyCodec.encode
+        """
+        if len(values) != len(self._segments):
+            raise ValueError(f"Expected {len(self._segments)} values, got {len(values)}")
+        return self._encode_values(values)
+
+    def prefix(self, *values: Any) -> bytes:
+        """
+        @SUB@ keys.KeyCodec.prefix
+        """
+        return self._encode_values(values)
+
+    def decode(self, key: bytes) -> Tuple[Any, ...]:
+        """
+        @SUB@ keys.KeyCodec.decode
+        """
+        cdef bytes data = key if type(key) is bytes else bytes(key)
+        cdef const unsigned char *buf = <const unsigned char *>PyBytes_AS_STRING(data)
+        cdef Py_ssize_t length = len(data)
+        cdef Py_ssize_t pos = 0
+        cdef Segment segment
+
+        result = []
+        for segment in self._segments:
+            result.append(segment._decode(buf, length, &pos))
+        if pos != length:
+            raise ValueError("Trailing bytes after last key segment")
+
+        return tuple(result)
+
+    def prefix_length(self, int count=1) -> int:
+        """
+        @SUB@ keys.KeyCodec.prefix_length
+        """
+        cdef Py_ssize_t total = 0
+        cdef Segment segment
+
+        if count < 1 or count > len(self._segments):
+            raise ValueError(f"Segment count must be between 1 and {len(self._segments)}")
+
+        for segment in self._segments[:count]:
+            if segment._width < 0:
+                raise ValueError(f"{segment!r} is variable-length and cannot be part of a key prefix")
+            total += segment._width
+
+        if total > limits.HSE_KVS_PFX_LEN_MAX:
+            raise ValueError(f"Key prefix of {total} bytes exceeds {limits.HSE_KVS_PFX_LEN_MAX} bytes")
+
+        return total
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+
+cdef class Segment:
+    # Encoded width in bytes, -1 for variable-length segments
+    cdef Py_ssize_t _width
+
+    cdef Py_ssize_t _encode(self, object value, unsigned char *out, Py_ssize_t avail) except -1
+    cdef object _decode(self, const unsigned char *buf, Py_ssize_t length, Py_ssize_t *pos)
+
+
+cdef class UInt(Segment):
+    pass
+
+
+cdef class Int(Segment):
+    pass
+
+
+cdef class Float(Segment):
+    pass
+
+
+cdef class Timestamp(Int):
+    pass
+
+
+cdef class Bytes(Segment):
+    pass
+
+
+cdef class Str(Segment):
+    pass
+
+
+cdef class KeyCodec:
+    cdef tuple _segments
+
+    cdef bytes _encode_values(self, tuple values)
@@ -0,0 +1,679 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Using HSE from pre-fork worker processes.
+
+HSE does not survive ``fork()``: its threads exist only in the process which
+called ``hse.init()``. The bindings therefore make handles inherited by a
+forked child unusable, and refuse to initialize HSE again in such a child.
+A KVDB can also be open in only one process at a time. This module offers two
+ways to work within those rules.
+
+``init_in_children()`` registers ``os.register_at_fork()`` hooks so that every
+child forked afterwards initializes HSE on its own, for workers which each
+open a different KVDB.
+
+``KvdbServer`` starts a process owning one KVDB and serving requests from
+worker processes through ``KvdbClient``. The owner is started before the
+workers are forked and opens the KVDB once, so workers skip the cold open.
+Each client exchanges keys and values with the owner through its own shared
+memory segment. Only small headers with offsets and lengths cross the
+connection: values put are handed to HSE straight from the segment, and
+values read are copied by HSE straight into it with ``Kvs.get_into()``.
+``KvdbClient.get_many()`` fetches many values with one round trip.
+
+Example::
+
+    server = KvdbServer("/var/lib/app/kvdb", ["users"])  # before forking
+    ...
+    client = server.connect()                            # in each worker
+    client.put("users", b"u1", b"...")
+    client.get("users", b"u1")
+
+Requires Python 3.8 or later for ``multiprocessing.shared_memory``.
+"""
+
+import atexit
+import errno
+import multiprocessing
+import os
+import socket
+import struct
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterable, List, Optional, SupportsBytes, Tuple, Union
+
+from hse3 import hse, limits
+
+__all__ = ["KvdbClient", "KvdbServer", "init_in_children"]
+
+_Key = Union[str, bytes, SupportsBytes]
+
+# Request: operation, KVS index, key length, value length. A get of many
+# keys sends the number of keys and their total length instead, followed by
+# the length of each key.
+_REQUEST = struct.Struct("<BHHI")
+# Reply: status, value length. A get of many keys replies with the number of
+# values read instead, followed by the length of each value.
+_REPLY = struct.Struct("<BI")
+
+_GET = 1
+_PUT = 2
+_DELETE = 3
+_PREFIX_DELETE = 4
+_GET_MANY = 5
+
+_OK = 0
+_NOT_FOUND = 1
+_ERROR = 2
+
+_KEY_AREA = limits.KVS_KEY_LEN_MAX
+_MAX_BATCH = 0xFFFF
+# Value length of a key which does not exist in a get of many keys
+_MISSING = 0xFFFFFFFF
+
+
+def _shared_memory() -> Any:
+    from multiprocessing import shared_memory
+
+    return shared_memory
+
+
+def _attach(name: str) -> Any:
+    shared_memory = _shared_memory()
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with the resource
+        # tracker. The owner shares the tracker of the process which started
+        # it, where the client already registered the segment, so this is a
+        # no-op and the client's unlink() unregisters it.
+        return shared_memory.SharedMemory(name)
+
+
+def _to_bytes(obj: _Key) -> bytes:
+    if isinstance(obj, str):
+        return obj.encode()
+    return bytes(obj)
+
+
+def _to_key(obj: _Key) -> bytes:
+    key = _to_bytes(obj)
+    if len(key) > _KEY_AREA:
+        raise ValueError(f"Keys must not exceed {_KEY_AREA} bytes")
+    return key
+
+
+def init_in_children(
+    config: Optional[Union[str, "os.PathLike[str]"]] = None, *params: str
+) -> None:
+    """
+    Initialize HSE in every child process forked from now on.
+
+    The parent must not initialize HSE itself. Each child finalizes HSE when
+    it exits normally.
+
+    Args:
+        config: Path to a global configuration file.
+        params: Parameters in key=value format.
+    """
+
+    def after_in_child() -> None:
+        hse.init(config, *params)
+        atexit.register(hse.fini)
+
+    os.register_at_fork(after_in_child=after_in_child)
+
+
+def _serve_client(conn: Connection, kvss: List[hse.Kvs]) -> None:
+    shm = _attach(conn.recv())
+    try:
+        buf = shm.buf
+        keys = buf[:_KEY_AREA]
+        values = buf[_KEY_AREA:]
+        while True:
+            try:
+                request = conn.recv_bytes()
+            except EOFError:
+                break
+
+            op, index, key_len, value_len = _REQUEST.unpack_from(request)
+            kvs = kvss[index]
+            try:
+                if op == _GET_MANY:
+                    key_lens = struct.unpack_from(
+                        f"<{key_len}H", request, _REQUEST.size
+                    )
+                    reply = _get_many(kvs, values, key_lens, value_len)
+                else:
+                    with keys[:key_len] as key:
+                        reply = _handle(kvs, op, key, values, value_len)
+            except Exception as e:  # pylint: disable=broad-except
+                conn.send_bytes(_REPLY.pack(_ERROR, 0))
+                conn.send(e)
+                continue
+            conn.send_bytes(reply)
+    except OSError:
+        # The owner shut the connection down to stop
+        pass
+    finally:
+        keys.release()
+        values.release()
+        buf.release()
+        shm.close()
+        conn.close()
+
+
+def _handle(
+    kvs: hse.Kvs, op: int, key: memoryview, values: memoryview, value_len: int
+) -> bytes:
+    if op == _GET:
+        # HSE copies the value into the segment
+        length = kvs.get_into(key, values)
+        if length is None:
+            return _REPLY.pack(_NOT_FOUND, 0)
+        return _REPLY.pack(_OK, length)
+    if op == _PUT:
+        with values[:value_len] as value:
+            kvs.put(key, value)
+    elif op == _DELETE:
+        kvs.delete(key)
+    elif op == _PREFIX_DELETE:
+        kvs.prefix_delete(key)
+    else:
+        raise ValueError(f"Unknown operation {op}")
+    return _REPLY.pack(_OK, 0)
+
+
+def _get_many(
+    kvs: hse.Kvs, values: memoryview, key_lens: Tuple[int, ...], keys_len: int
+) -> bytes:
+    # The keys are at the start of the value area. The values are read one
+    # after the other behind them, until one does not fit.
+    lengths: List[int] = []
+    key_offset = 0
+    offset = keys_len
+    for key_len in key_lens:
+        with values[key_offset : key_offset + key_len] as key:
+            with values[offset:] as buf:
+                length = kvs.get_into(key, buf)
+        if length is None:
+            lengths.append(_MISSING)
+        elif offset + length > len(values):
+            break
+        else:
+            lengths.append(length)
+            offset += length
+        key_offset += key_len
+
+    return _REPLY.pack(_OK, len(lengths)) + struct.pack(f"<{len(lengths)}I", *lengths)
+
+
+def _create(home: str, kvs_names: List[str]) -> None:
+    try:
+        hse.Kvdb.create(home)
+    except hse.HseException as e:
+        if e.returncode != errno.EEXIST:
+            raise
+
+    kvdb = hse.Kvdb.open(home)
+    try:
+        for name in kvs_names:
+            try:
+                kvdb.kvs_create(name)
+            except hse.HseException as e:
+                if e.returncode != errno.EEXIST:
+                    raise
+    finally:
+        kvdb.close()
+
+
+def _serve(
+    ready: Connection,
+    home: str,
+    kvs_names: List[str],
+    params: Tuple[str, ...],
+    config: Optional[str],
+    init_params: Tuple[str, ...],
+    create: bool,
+    authkey: bytes,
+) -> None:
+    try:
+        hse.init(config, *init_params)
+        if create:
+            _create(home, kvs_names)
+        kvdb = hse.Kvdb.open(home, *params)
+        kvss = [kvdb.kvs_open(name) for name in kvs_names]
+        listener = Listener(family="AF_UNIX", authkey=authkey)
+    except BaseException as e:
+        ready.send(e)
+        raise
+    ready.send(listener.address)
+    ready.close()
+
+    # Each client connection's socket, duplicated so that it stays valid after
+    # its thread closes the connection, and the thread serving it
+    clients: List[Tuple[socket.socket, threading.Thread]] = []
+    try:
+        while True:
+            conn = listener.accept()
+            if conn.recv() != "connect":
+                conn.close()
+                break
+            conn.send(kvs_names)
+            sock = socket.socket(
+                socket.AF_UNIX, socket.SOCK_STREAM, fileno=os.dup(conn.fileno())
+            )
+            thread = threading.Thread(
+                target=_serve_client, args=(conn, kvss), daemon=True
+            )
+            thread.start()
+
+            for done in [c for c in clients if not c[1].is_alive()]:
+                done[0].close()
+                clients.remove(done)
+            clients.append((sock, thread))
+    finally:
+        listener.close()
+        # No thread may be using a KVS once it is closed, so wake up the
+        # threads waiting for requests and wait for all of them
+        for sock, _ in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for sock, thread in clients:
+            thread.join()
+            sock.close()
+        for kvs in kvss:
+            kvs.close()
+        kvdb.close()
+        hse.fini()
+
+
+class KvdbServer:
+    """
+    Process owning a KVDB and serving ``KvdbClient`` requests.
+
+    The owner is a fresh process started with the "spawn" method, so it is
+    safe to create the server before forking workers, and the creating
+    process does not need to initialize HSE. Each client is served by its own
+    thread in the owner.
+
+    Args:
+        home: KVDB home directory.
+        kvs_names: KVSs to open and serve.
+        params: Runtime parameters for ``Kvdb.open()``.
+        config: Global configuration file for ``hse.init()``.
+        init_params: Global parameters for ``hse.init()``.
+        create: Create the KVDB and KVSs first if they do not exist.
+
+    Raises:
+        HseException: The owner failed to open the KVDB or a KVS.
+    """
+
+    def __init__(
+        self,
+        home: Union[str, "os.PathLike[str]"],
+        kvs_names: Iterable[str],
+        params: Iterable[str] = (),
+        config: Optional[Union[str, "os.PathLike[str]"]] = None,
+        init_params: Iterable[str] = (),
+        create: bool = False,
+    ) -> None:
+        self.kvs_names = list(kvs_names)
+        self._authkey = os.urandom(32)
+
+        ctx = multiprocessing.get_context("spawn")
+        receiver, sender = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(
+            target=_serve,
+            args=(
+                sender,
+                os.fspath(home),
+                self.kvs_names,
+                tuple(params),
+                os.fspath(config) if config is not None else None,
+                tuple(init_params),
+                create,
+                self._authkey,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        sender.close()
+
+        try:
+            result = receiver.recv()
+        except EOFError as e:
+            self._process.join()
+            raise RuntimeError("KVDB owner process exited during startup") from e
+        finally:
+            receiver.close()
+        if isinstance(result, BaseException):
+            self._process.join()
+            raise result
+        self.address: str = result
+
+    def __enter__(self) -> "KvdbServer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """
+        Process ID of the owner.
+        """
+        return self._process.pid
+
+    def connect(self, size: int = limits.KVS_VALUE_LEN_MAX) -> "KvdbClient":
+        """
+        Connect a client, usually from a worker process after forking.
+
+        Args:
+            size: Size of the value area of the client's shared memory
+                segment, see ``KvdbClient``.
+
+        Returns:
+            KvdbClient: New client.
+        """
+        return KvdbClient(self.address, self._authkey, size)
+
+    def close(self) -> None:
+        """
+        Stop the owner, which closes the KVDB. Safe to call more than once.
+        """
+        if not self._process.is_alive():
+            return
+
+        with Client(self.address, family="AF_UNIX", authkey=self._authkey) as conn:
+            conn.send("shutdown")
+        self._process.join()
+
+
+class KvdbClient:
+    """
+    Connection from a worker process to a ``KvdbServer``.
+
+    The client owns a shared memory segment with room for the largest key and
+    a value area, by default large enough for the largest value. A larger
+    value area lets ``get_many()`` read more values per round trip. Requests
+    are serialized by a lock, so a client may be shared by the threads of a
+    worker, but views returned by ``get_view()`` and ``get_many_views()`` are
+    only valid until that client's next request.
+
+    Args:
+        address: Address of the server, see ``KvdbServer.address``.
+        authkey: Authentication key of the server.
+        size: Size of the value area in bytes.
+    """
+
+    def __init__(
+        self, address: str, authkey: bytes, size: int = limits.KVS_VALUE_LEN_MAX
+    ) -> None:
+        if size < 2 * _KEY_AREA:
+            raise ValueError(f"size must be at least {2 * _KEY_AREA} bytes")
+
+        shared_memory = _shared_memory()
+
+        self._shm = shared_memory.SharedMemory(create=True, size=_KEY_AREA + size)
+        self._keys = self._shm.buf[:_KEY_AREA]
+        self._values = self._shm.buf[_KEY_AREA:]
+        self._lock = threading.Lock()
+        try:
+            self._conn: Optional[Connection] = Client(
+                address, family="AF_UNIX", authkey=authkey
+            )
+            self._conn.send("connect")
+            self._indexes: Dict[str, int] = {
+                name: i for i, name in enumerate(self._conn.recv())
+            }
+            self._conn.send(self._shm.name)
+        except BaseException:
+            self._release()
+            raise
+
+    def __enter__(self) -> "KvdbClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _release(self) -> None:
+        self._keys.release()
+        self._values.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def close(self) -> None:
+        """
+        Disconnect and release the shared memory segment. Safe to call more
+        than once.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.close()
+            self._conn = None
+            self._release()
+
+    def _connection(self) -> Connection:
+        conn = self._conn
+        if conn is None:
+            raise ValueError("Client is closed")
+        return conn
+
+    def _request(
+        self, op: int, kvs: str, key: _Key, value: Optional[_Key] = None
+    ) -> Tuple[int, int]:
+        conn = self._connection()
+
+        key_bytes = _to_key(key)
+        key_len = len(key_bytes)
+        self._keys[:key_len] = key_bytes
+
+        value_len = 0
+        if value is not None:
+            if not isinstance(value, (bytes, bytearray, memoryview)):
+                value = _to_bytes(value)
+            view = memoryview(value)
+            value_len = view.nbytes
+            if value_len > len(self._values):
+                raise ValueError(f"Values must not exceed {len(self._values)} bytes")
+            self._values[:value_len] = view.cast("B")
+
+        conn.send_bytes(_REQUEST.pack(op, self._indexes[kvs], key_len, value_len))
+        status, length = _REPLY.unpack(conn.recv_bytes())
+        if status == _ERROR:
+            raise conn.recv()
+
+        return status, length
+
+    def _get(self, kvs: str, key: _Key) -> Optional[memoryview]:
+        status, length = self._request(_GET, kvs, key)
+        if status == _NOT_FOUND:
+            return None
+        if length > len(self._values):
+            raise ValueError(
+                f"Value of {length} bytes does not fit in the shared memory segment"
+            )
+        return self._values[:length].toreadonly()
+
+    def _get_batch(self, kvs: str, keys: List[bytes]) -> List[Optional[memoryview]]:
+        conn = self._connection()
+        values = self._values
+
+        # Leave at least half of the value area for the values
+        key_lens: List[int] = []
+        offset = 0
+        for key in keys:
+            key_len = len(key)
+            if len(key_lens) == _MAX_BATCH or offset + key_len > len(values) // 2:
+                break
+            values[offset : offset + key_len] = key
+            key_lens.append(key_len)
+            offset += key_len
+
+        conn.send_bytes(
+            _REQUEST.pack(_GET_MANY, self._indexes[kvs], len(key_lens), offset)
+            + struct.pack(f"<{len(key_lens)}H", *key_lens)
+        )
+        reply = conn.recv_bytes()
+        status, count = _REPLY.unpack_from(reply)
+        if status == _ERROR:
+            raise conn.recv()
+
+        views: List[Optional[memoryview]] = []
+        for length in struct.unpack_from(f"<{count}I", reply, _REPLY.size):
+            if length == _MISSING:
+                views.append(None)
+            else:
+                views.append(values[offset : offset + length].toreadonly())
+                offset += length
+        return views
+
+    def get_view(self, kvs: str, key: _Key) -> Optional[memoryview]:
+        """
+        Get a value as a view of the shared memory segment, without a copy.
+
+        Args:
+            kvs: KVS name.
+            key: Key to get.
+
+        Returns:
+            memoryview: Read-only view of the value, valid until the next
+            request made with this client, or None if the key does not exist.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self._lock:
+            return self._get(kvs, key)
+
+    def get(self, kvs: str, key: _Key) -> Optional[bytes]:
+        """
+        Get a value.
+
+        Args:
+            kvs: KVS name.
+            key: Key to get.
+
+        Returns:
+            bytes: Value, or None if the key does not exist.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self._lock:
+            view = self._get(kvs, key)
+            return view.tobytes() if view is not None else None
+
+    def get_many_views(
+        self, kvs: str, keys: Iterable[_Key]
+    ) -> List[Optional[memoryview]]:
+        """
+        Get many values with one round trip, as views of the shared memory
+        segment, without a copy.
+
+        Args:
+            kvs: KVS name.
+            keys: Keys to get.
+
+        Returns:
+            List of read-only views of the values, valid until the next
+            request made with this client, with None for keys which do not
+            exist.
+
+        Raises:
+            ValueError: The keys and values do not fit in the shared memory
+                segment together. Use ``get_many()`` or a larger segment.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        key_list = [_to_key(key) for key in keys]
+        with self._lock:
+            views = self._get_batch(kvs, key_list)
+        if len(views) < len(key_list):
+            for view in views:
+                if view is not None:
+                    view.release()
+            raise ValueError("Values do not fit in the shared memory segment")
+        return views
+
+    def get_many(self, kvs: str, keys: Iterable[_Key]) -> List[Optional[bytes]]:
+        """
+        Get many values, with as few round trips as the size of the shared
+        memory segment allows.
+
+        Args:
+            kvs: KVS name.
+            keys: Keys to get.
+
+        Returns:
+            List of values, with None for keys which do not exist.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        key_list = [_to_key(key) for key in keys]
+        result: List[Optional[bytes]] = []
+        with self._lock:
+            while len(result) < len(key_list):
+                views = self._get_batch(kvs, key_list[len(result) :])
+                if not views:
+                    # The first value needs the whole value area
+                    views = [self._get(kvs, key_list[len(result)])]
+                for view in views:
+                    if view is None:
+                        result.append(None)
+                    else:
+                        result.append(view.tobytes())
+                        view.release()
+        return result
+
+    def put(self, kvs: str, key: _Key, value: Optional[_Key]) -> None:
+        """
+        Put a key-value pair. The value is copied once, into the shared
+        memory segment, and HSE reads it from there.
+
+        Args:
+            kvs: KVS name.
+            key: Key to put.
+            value: Value as str or a bytes-like object.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self._lock:
+            self._request(_PUT, kvs, key, value if value is not None else b"")
+
+    def delete(self, kvs: str, key: _Key) -> None:
+        """
+        Delete a key.
+
+        Args:
+            kvs: KVS name.
+            key: Key to delete.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self._lock:
+            self._request(_DELETE, kvs, key)
+
+    def prefix_delete(self, kvs: str, pfx: _Key) -> None:
+        """
+        Delete all keys starting with a prefix.
+
+        Args:
+            kvs: KVS name.
+            pfx: Prefix of the keys to delete.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        with self._lock:
+            self._request(_PREFIX_DELETE, kvs, pfx)
@@ -0,0 +1,206 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Paging forward and backward through the keys of a KVS.
+
+A page ends with opaque continuation tokens for the pages before and after
+it. A token holds the direction and the key at the boundary of the page it
+came from, so resuming from it takes a single ``KvsCursor.seek()`` instead of
+reading and discarding the entries of every earlier page. Fetching any page
+therefore costs the same, however deep into the listing it is.
+
+Tokens are URL-safe strings which can be handed to clients as they are. They
+are not signed, so a client can forge one, but a token can only ever resume
+within the prefix of the listing which validates it.
+
+``Paginator`` keeps a forward and a reverse cursor open between pages, and
+updates their view before each page. ``page()`` is a shortcut for stateless
+callers such as request handlers, creating the cursors it needs each time.
+
+Example::
+
+    listing = page(kvs, prefix=b"users/", limit=50)
+    ...
+    listing = page(kvs, listing.next, prefix=b"users/", limit=50)
+"""
+
+import base64
+from collections import namedtuple
+from itertools import islice
+from typing import Any, List, Optional, Tuple, Union
+
+from hse3 import hse
+
+__all__ = ["Page", "Paginator", "page"]
+
+_VERSION = 1
+_FORWARD = ord("F")
+_BACKWARD = ord("B")
+
+Page = namedtuple("Page", ["items", "next", "prev"])
+Page.__doc__ = """
+Page of a listing.
+
+Attributes:
+    items: List of ``(key, value)`` pairs in key order.
+    next: Token for the following page, or None if this is the last page.
+    prev: Token for the preceding page, or None if this is the first page.
+"""
+
+
+def _encode(direction: int, key: bytes) -> str:
+    token = base64.urlsafe_b64encode(bytes((_VERSION, direction)) + key)
+    return token.rstrip(b"=").decode()
+
+
+def _decode(token: str) -> Tuple[int, bytes]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except ValueError as e:
+        raise ValueError("Invalid pagination token") from e
+    if len(raw) < 2 or raw[0] != _VERSION or raw[1] not in (_FORWARD, _BACKWARD):
+        raise ValueError("Invalid pagination token")
+    return raw[1], raw[2:]
+
+
+class Paginator:
+    """
+    Pages through the keys of a KVS starting with a prefix.
+
+    Values are decoded with the KVS codec if it has one, as with
+    ``KvsCursor.items()``.
+
+    Args:
+        kvs: KVS to list.
+        prefix: Only list keys starting with this prefix.
+        limit: Maximum number of entries per page.
+        txn: Transaction context. Without one, the cursors' view is updated
+            before each page.
+
+    Raises:
+        HseException: Underlying C function returned a non-zero value.
+    """
+
+    def __init__(
+        self,
+        kvs: hse.Kvs,
+        prefix: Optional[Union[str, bytes]] = None,
+        limit: int = 100,
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> None:
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+        self.kvs = kvs
+        self.prefix = prefix.encode() if isinstance(prefix, str) else prefix or b""
+        self.limit = limit
+        self.txn = txn
+        self._cursors: List[Optional[hse.KvsCursor]] = [None, None]
+
+    def __enter__(self) -> "Paginator":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Destroy the cursors. Safe to call more than once.
+        """
+        for i, cursor in enumerate(self._cursors):
+            if cursor is not None:
+                cursor.destroy()
+                self._cursors[i] = None
+
+    def _cursor(self, reverse: bool) -> hse.KvsCursor:
+        cursor = self._cursors[reverse]
+        if cursor is None:
+            cursor = self.kvs.cursor(
+                self.prefix or None,
+                txn=self.txn,
+                flags=hse.CursorCreateFlag.REV if reverse else None,
+            )
+            self._cursors[reverse] = cursor
+        elif self.txn is None:
+            cursor.update_view()
+        return cursor
+
+    def _read(self, cursor: hse.KvsCursor, skip: Optional[bytes]) -> List[Any]:
+        # One more entry than a page tells whether there is another page
+        items = list(islice(cursor.items(), self.limit + 2))
+        if items and items[0][0] == skip:
+            del items[0]
+        return items[: self.limit + 1]
+
+    def page(self, token: Optional[str] = None) -> Page:
+        """
+        Fetch a page.
+
+        Args:
+            token: ``Page.next`` or ``Page.prev`` of an earlier page. Fetch
+                the first page if not given.
+
+        Returns:
+            Page: Entries and the tokens for the adjacent pages.
+
+        Raises:
+            ValueError: The token is invalid or belongs to another prefix.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        direction, boundary = _FORWARD, None
+        if token is not None:
+            direction, boundary = _decode(token)
+            if not boundary.startswith(self.prefix):
+                raise ValueError("Pagination token does not belong to this listing")
+
+        reverse = direction == _BACKWARD
+        cursor = self._cursor(reverse)
+        # Resume at the boundary, which is part of the previous page. The
+        # first page starts at the prefix, or at the smallest possible key.
+        cursor.seek(boundary if boundary is not None else self.prefix or b"\x00")
+        items: List[Tuple[bytes, Any]] = self._read(cursor, boundary)
+
+        more = len(items) > self.limit
+        del items[self.limit :]
+        if reverse:
+            items.reverse()
+        if not items:
+            return Page(items, None, None)
+
+        first, last = _encode(_BACKWARD, items[0][0]), _encode(_FORWARD, items[-1][0])
+        if reverse:
+            return Page(items, last, first if more else None)
+        return Page(
+            items, last if more else None, first if boundary is not None else None
+        )
+
+
+def page(
+    kvs: hse.Kvs,
+    token: Optional[str] = None,
+    prefix: Optional[Union[str, bytes]] = None,
+    limit: int = 100,
+    txn: Optional[hse.KvdbTransaction] = None,
+) -> Page:
+    """
+    Fetch a page of a listing with cursors created for the call.
+
+    Args:
+        kvs: KVS to list.
+        token: ``Page.next`` or ``Page.prev`` of an earlier page. Fetch the
+            first page if not given.
+        prefix: Only list keys starting with this prefix.
+        limit: Maximum number of entries per page.
+        txn: Transaction context.
+
+    Returns:
+        Page: Entries and the tokens for the adjacent pages.
+
+    Raises:
+        ValueError: The token is invalid or belongs to another prefix.
+        HseException: Underlying C function returned a non-zero value.
+    """
+    with Paginator(kvs, prefix, limit, txn) as paginator:
+        return paginator.page(token)
@@ -0,0 +1,200 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Tailing readers following new keys as they are written to a KVS.
+
+Creating a cursor is expensive, so polling a KVS for new data by creating a
+cursor per poll does not scale to many readers. ``Tail`` keeps one cursor open
+for its whole life and refreshes it with ``KvsCursor.update_view()``, then
+seeks just past the last key it returned and reads only what is new.
+
+A tail yields keys in increasing order and never goes back, so it suits KVSs
+whose keys grow as data is written, such as logs or change-data-capture
+streams keyed by a sequence number or timestamp (see ``hse3.keys``). Writes
+to keys at or before the last key returned are not seen.
+
+The view is updated on a fixed cadence, and also as soon as ``Kvs.writes``
+shows a write made in this process through the tailed ``Kvs`` object.
+
+Example::
+
+    with Tail(kvs, filt=b"events/", interval=0.5) as tail:
+        for key, value in tail.follow():
+            handle(key, value)
+"""
+
+import time
+from typing import Any, Iterator, List, Optional, SupportsBytes, Tuple, Union
+
+from hse3 import hse
+
+__all__ = ["Tail"]
+
+# Granularity of the wait for local writes between view updates
+_WRITE_POLL = 0.005
+
+# Most entries follow() reads per poll, so that a large backlog is not held
+# in memory at once
+_FOLLOW_BATCH = 1024
+
+
+def _to_bytes(obj: Union[str, bytes, SupportsBytes]) -> bytes:
+    if isinstance(obj, str):
+        return obj.encode()
+    return bytes(obj)
+
+
+class Tail:
+    """
+    Iterator over the new entries of a KVS.
+
+    The cursor is created without a transaction, since transaction-bound
+    cursors cannot update their view. Values are decoded with the KVS codec
+    if it has one, as with ``KvsCursor.items()``.
+
+    Args:
+        kvs: KVS to follow.
+        filt: Only follow keys starting with this prefix.
+        after: Only return keys greater than this key. Without it, entries
+            already in the KVS are returned first.
+        interval: Maximum time in seconds between view updates while no
+            local writes are seen.
+
+    Raises:
+        HseException: Underlying C function returned a non-zero value.
+    """
+
+    def __init__(
+        self,
+        kvs: hse.Kvs,
+        filt: Optional[Union[str, bytes]] = None,
+        after: Optional[Union[str, bytes, SupportsBytes]] = None,
+        interval: float = 1.0,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+
+        self.kvs = kvs
+        self.interval = interval
+        self.last_key: Optional[bytes] = _to_bytes(after) if after is not None else None
+        self._cursor: Optional[hse.KvsCursor] = kvs.cursor(filt)
+        self._writes = kvs.writes
+        self._updated = time.monotonic()
+
+    def __enter__(self) -> "Tail":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[bytes, Any]]:
+        return self.follow()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the tail has been closed.
+        """
+        return self._cursor is None
+
+    def close(self) -> None:
+        """
+        Destroy the cursor. Safe to call more than once.
+        """
+        if self._cursor is not None:
+            self._cursor.destroy()
+            self._cursor = None
+
+    def poll(self, limit: Optional[int] = None) -> List[Tuple[bytes, Any]]:
+        """
+        Return the entries written after the last key returned so far.
+
+        The cursor view is updated first, so the result reflects all writes
+        committed before the call.
+
+        Args:
+            limit: Return at most this many entries. The next poll continues
+                after the last one returned. Without a limit, the first poll
+                of a large KVS returns all of it at once.
+
+        Returns:
+            List of ``(key, value)`` pairs in key order, possibly empty.
+
+        Raises:
+            ValueError: The tail is closed.
+            HseException: Underlying C function returned a non-zero value.
+        """
+        cursor = self._cursor
+        if cursor is None:
+            raise ValueError("Tail is closed")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+
+        self._writes = self.kvs.writes
+        cursor.update_view()
+        self._updated = time.monotonic()
+
+        if self.last_key is not None:
+            # Seek to last_key itself and skip it, since the smallest greater
+            # key, last_key + b"\x00", is too long for a key of maximum length
+            if cursor.seek(self.last_key) == self.last_key:
+                cursor.read()
+
+        entries = []
+        for key, value in cursor.items():
+            assert key is not None
+            entries.append((key, value))
+            if len(entries) == limit:
+                break
+        if entries:
+            self.last_key = entries[-1][0]
+
+        return entries
+
+    def _wait(self, until: Optional[float]) -> None:
+        deadline = self._updated + self.interval
+        if until is not None:
+            deadline = min(deadline, until)
+        while self.kvs.writes == self._writes:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, _WRITE_POLL))
+
+    def follow(
+        self, idle_timeout: Optional[float] = None
+    ) -> Iterator[Tuple[bytes, Any]]:
+        """
+        Yield new entries as they appear.
+
+        Between polls that find nothing, waits until ``interval`` has passed
+        since the last view update or a local write is seen through the
+        tailed ``Kvs``, whichever comes first.
+
+        Args:
+            idle_timeout: Stop after this many seconds without new entries.
+                Follow until the tail is closed if not given.
+
+        Yields:
+            ``(key, value)`` pairs in key order.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        until = None
+        while self._cursor is not None:
+            entries = self.poll(limit=_FOLLOW_BATCH)
+            if entries:
+                yield from entries
+                until = None
+                continue
+
+            now = time.monotonic()
+            if idle_timeout is not None:
+                if until is None:
+                    until = now + idle_timeout
+                elif now >= until:
+                    return
+            self._wait(until)
@@ -0,0 +1,490 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Moving a KVS between media classes while it stays in use.
+
+The media class a KVS is stored on is chosen by its ``mclass.policy``
+parameter, and data already written stays where it is. Moving a hot KVS to
+the staging media class therefore means copying it into a new KVS opened with
+a staging policy. This module does that online:
+
+* ``HeatTracker`` is a hook for ``hse.add_hook()`` counting the writes made
+  to each KVS, plus the reads reported to it, decayed over time, to find the
+  KVSs worth moving.
+* ``TieredKvs`` is the handle readers and writers use instead of an
+  ``hse.Kvs``. It forwards to the current KVS and can be switched to another.
+* ``Migration`` creates the target KVS, copies the source into it with
+  batched cursor reads and puts, then copies again the keys written to the
+  source in the meantime. It finally holds writers back briefly to copy the
+  last of them and switch the handle over.
+
+Example::
+
+    tracker = HeatTracker()
+    with tracker:
+        table = TieredKvs(kvdb.kvs_open("table"), tracker=tracker)
+        serve(table)
+        ...
+        if tracker.hottest()[0] == "table":
+            source = Migration(kvdb, table, "table-staging").run()
+            source.close()
+            kvdb.kvs_drop("table")
+
+Only the writes made through the ``hse.Kvs`` handle the ``TieredKvs``
+forwards to are seen by the migration, so other handles to the same KVS must
+not be written while it runs. Writes made in a transaction are only seen by
+the migration when the transaction commits, so transactions writing to the
+KVS must not be open while the handle is switched.
+"""
+
+import math
+import threading
+import time
+import weakref
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    SupportsBytes,
+    Tuple,
+    Union,
+)
+
+from hse3 import hse
+
+__all__ = ["POLICIES", "HeatTracker", "Migration", "TieredKvs"]
+
+POLICIES = {
+    hse.Mclass.CAPACITY: "capacity_only",
+    hse.Mclass.STAGING: "staging_only",
+    hse.Mclass.PMEM: "pmem_only",
+}
+"""
+Value of the ``mclass.policy`` KVS parameter keeping a KVS on each media
+class.
+"""
+
+_WRITES = (hse.ChangeOp.PUT, hse.ChangeOp.DELETE, hse.ChangeOp.PREFIX_DELETE)
+
+
+class HeatTracker:
+    """
+    Hook counting the operations on each KVS, with exponential decay.
+
+    Writes made through the bindings are counted once the tracker is
+    registered. Reads are not seen by hooks, and are counted when reported
+    with ``read()``, which ``TieredKvs`` does.
+
+    Args:
+        half_life: Seconds after which an operation counts half as much.
+        clock: Function returning the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        half_life: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+
+        self.half_life = half_life
+        self.clock = clock
+        self._heat: Dict[str, float] = {}
+        self._names: "weakref.WeakKeyDictionary[hse.Kvs, str]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._registered = False
+
+    def __call__(self, events: List[hse.ChangeEvent]) -> None:
+        for event in events:
+            if event.op in _WRITES:
+                self._add(self._name(event.kvs), 1)
+
+    def _name(self, kvs: hse.Kvs) -> str:
+        # Kvs.name asks HSE every time, and fails once the handle is closed
+        name = self._names.get(kvs)
+        if name is None:
+            name = self._names[kvs] = kvs.name
+        return name
+
+    def __enter__(self) -> "HeatTracker":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _decay(self) -> None:
+        now = self.clock()
+        factor = math.pow(0.5, (now - self._updated) / self.half_life)
+        self._updated = now
+        if factor < 1:
+            for name in self._heat:
+                self._heat[name] *= factor
+
+    def _add(self, name: str, count: int) -> None:
+        with self._lock:
+            self._decay()
+            self._heat[name] = self._heat.get(name, 0.0) + count
+
+    def start(self) -> "HeatTracker":
+        """
+        Register the tracker as a hook.
+
+        Returns:
+            HeatTracker: The tracker itself.
+        """
+        if not self._registered:
+            hse.add_hook(self)
+            self._registered = True
+        return self
+
+    def close(self) -> None:
+        """
+        Unregister the tracker. Safe to call more than once.
+        """
+        if self._registered:
+            hse.remove_hook(self)
+            self._registered = False
+
+    def read(self, kvs_name: str, count: int = 1) -> None:
+        """
+        Count reads of a KVS.
+
+        Args:
+            kvs_name: Name of the KVS read.
+            count: Number of reads.
+        """
+        self._add(kvs_name, count)
+
+    def heat(self) -> Dict[str, float]:
+        """
+        Decayed operation count of each KVS seen.
+
+        Returns:
+            Dict[str, float]: Heat of each KVS by name.
+        """
+        with self._lock:
+            self._decay()
+            return dict(self._heat)
+
+    def hottest(self, n: int = 1) -> List[str]:
+        """
+        Names of the hottest KVSs, hottest first.
+
+        Args:
+            n: Maximum number of names.
+
+        Returns:
+            List[str]: Names of at most ``n`` KVSs.
+        """
+        heat = self.heat()
+        return sorted(heat, key=heat.__getitem__, reverse=True)[:n]
+
+
+class TieredKvs:
+    """
+    Handle to a KVS which a ``Migration`` can switch to another KVS.
+
+    Attributes not defined here are those of the current ``hse.Kvs``, so the
+    handle can be used in its place. Writers going through ``put()``,
+    ``delete()`` and ``prefix_delete()`` are held back while the handle is
+    switched; writes made through other methods must be stopped by the
+    application during a migration.
+
+    Args:
+        kvs: KVS to start with.
+        tracker: Tracker to report ``get()`` calls to.
+    """
+
+    def __init__(self, kvs: hse.Kvs, tracker: Optional[HeatTracker] = None) -> None:
+        self.tracker = tracker
+        self._kvs = kvs
+        self._name = kvs.name
+        self._cond = threading.Condition()
+        self._paused = False
+        self._writers = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._kvs, name)
+
+    @property
+    def kvs(self) -> hse.Kvs:
+        """
+        KVS the handle currently forwards to.
+        """
+        return self._kvs
+
+    def _enter(self) -> hse.Kvs:
+        with self._cond:
+            while self._paused:
+                self._cond.wait()
+            self._writers += 1
+            return self._kvs
+
+    def _exit(self) -> None:
+        with self._cond:
+            self._writers -= 1
+            if self._writers == 0:
+                self._cond.notify_all()
+
+    def _pause(self) -> None:
+        with self._cond:
+            self._paused = True
+            while self._writers:
+                self._cond.wait()
+
+    def _resume(self, kvs: hse.Kvs) -> None:
+        with self._cond:
+            self._kvs = kvs
+            self._name = kvs.name
+            self._paused = False
+            self._cond.notify_all()
+
+    def get(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> Tuple[Optional[bytes], int]:
+        """
+        Get the value of a key from the current KVS, like ``hse.Kvs.get()``.
+
+        Returns:
+            Value, or None if the key is not found, and its length.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        kvs = self._kvs
+        if self.tracker is not None:
+            self.tracker.read(self._name)
+        return kvs.get(key, txn=txn)
+
+    def put(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        value: Optional[Union[str, bytes, SupportsBytes]],
+        txn: Optional[hse.KvdbTransaction] = None,
+        flags: Optional[hse.KvsPutFlags] = None,
+    ) -> None:
+        """
+        Put a key into the current KVS.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        kvs = self._enter()
+        try:
+            kvs.put(key, value, txn=txn, flags=flags)
+        finally:
+            self._exit()
+
+    def delete(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        txn: Optional[hse.KvdbTransaction] = None,
+    ) -> None:
+        """
+        Delete a key from the current KVS.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        kvs = self._enter()
+        try:
+            kvs.delete(key, txn=txn)
+        finally:
+            self._exit()
+
+    def prefix_delete(
+        self, pfx: Union[str, bytes], txn: Optional[hse.KvdbTransaction] = None
+    ) -> None:
+        """
+        Delete the keys matching a prefix from the current KVS.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        kvs = self._enter()
+        try:
+            kvs.prefix_delete(pfx, txn=txn)
+        finally:
+            self._exit()
+
+
+class Migration:
+    """
+    Online copy of a KVS into a new KVS on another media class.
+
+    Args:
+        kvdb: KVDB of the KVSs.
+        tiered: Handle to the KVS to move, switched to the new KVS.
+        target: Name of the KVS to create.
+        mclass: Media class to keep the new KVS on.
+        params: Further runtime parameters of the new KVS.
+        batch: Keys copied or replayed per batch. Writers are held back for
+            the switch once fewer writes than this are left to replay, so
+            the source must be written more slowly than it is replayed.
+    """
+
+    def __init__(
+        self,
+        kvdb: hse.Kvdb,
+        tiered: TieredKvs,
+        target: str,
+        mclass: hse.Mclass = hse.Mclass.STAGING,
+        params: Sequence[str] = (),
+        batch: int = 1024,
+    ) -> None:
+        if batch < 1:
+            raise ValueError("batch must be positive")
+
+        self.kvdb = kvdb
+        self.tiered = tiered
+        self.target = target
+        self.mclass = mclass
+        self.params = list(params)
+        self.batch = batch
+        self.copied = 0
+        self.replayed = 0
+        self._source = tiered.kvs
+        self._events: Deque[hse.ChangeEvent] = deque()
+
+    def __call__(self, events: List[hse.ChangeEvent]) -> None:
+        source = self._source
+        self._events.extend(e for e in events if e.op in _WRITES and e.kvs is source)
+
+    def _open(self, source: hse.Kvs) -> hse.Kvs:
+        if not self.kvdb.mclass_is_configured(self.mclass):
+            raise ValueError(f"Media class {self.mclass} is not configured")
+
+        # Keep the layout and the transaction mode of the source
+        self.kvdb.kvs_create(
+            self.target, f"prefix.length={source.param('prefix.length')}"
+        )
+        transactions = source.param("transactions.enabled")
+        return self.kvdb.kvs_open(
+            self.target,
+            f"mclass.policy={POLICIES[self.mclass]}",
+            f"transactions.enabled={transactions}",
+            *self.params,
+            codec=source.codec,
+        )
+
+    def _write(self, target: hse.Kvs, apply: Callable[[Any], None]) -> None:
+        if target.param("transactions.enabled") == "true":
+            with self.kvdb.transaction() as txn:
+                apply(txn)
+        else:
+            apply(None)
+
+    def _copy(self, source: hse.Kvs, target: hse.Kvs) -> None:
+        with source.cursor() as cursor:
+            while True:
+                pairs = []
+                while len(pairs) < self.batch:
+                    key, value = cursor.read()
+                    if cursor.eof:
+                        break
+                    pairs.append((key, value))
+                if not pairs:
+                    return
+
+                def apply(txn: Optional[hse.KvdbTransaction]) -> None:
+                    for key, value in pairs:
+                        target.put(key, value, txn=txn)
+
+                self._write(target, apply)
+                self.copied += len(pairs)
+
+    def _replay(self, source: hse.Kvs, target: hse.Kvs, limit: float) -> None:
+        events = self._events
+        while events and limit > 0:
+            # Events appended concurrently are left for the next batch
+            batch = [events.popleft() for _ in range(min(len(events), self.batch))]
+
+            # Events are recorded after their write returns, so writes to the
+            # same key may be recorded out of order. The keys written are
+            # therefore copied with their current value in the source, which
+            # is read after the event of the latest write was recorded.
+            keys: Dict[bytes, None] = {}
+            prefixes: Dict[bytes, None] = {}
+            for event in batch:
+                if event.op == hse.ChangeOp.PREFIX_DELETE:
+                    prefixes[event.key] = None
+                else:
+                    keys[event.key] = None
+
+            def apply(txn: Optional[hse.KvdbTransaction]) -> None:
+                for pfx in prefixes:
+                    target.prefix_delete(pfx, txn=txn)
+                    # Copied raw, like _copy(), so that values are not decoded
+                    # and keys under the codec's reserved prefix are kept
+                    with source.cursor(pfx) as cursor:
+                        while True:
+                            key, value = cursor.read()
+                            if cursor.eof:
+                                break
+                            target.put(key, value, txn=txn)
+                for key in keys:
+                    value = source.get(key)[0]
+                    if value is None:
+                        target.delete(key, txn=txn)
+                    else:
+                        target.put(key, value, txn=txn)
+
+            self._write(target, apply)
+            self.replayed += len(batch)
+            limit -= len(batch)
+
+    def run(self) -> hse.Kvs:
+        """
+        Create the target KVS, copy and catch up, then switch the handle.
+
+        Returns:
+            hse.Kvs: The source KVS, which the caller closes and drops once
+            readers no longer use it.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+            ValueError: The media class is not configured.
+        """
+        source = self._source
+        target = self._open(source)
+
+        # Registered before the cursor is created, so that every write the
+        # cursor misses is replayed. Writes the cursor also sees are replayed
+        # after its copy, so they are harmless.
+        hse.add_hook(self)
+        try:
+            self._copy(source, target)
+
+            # Catch up until what is left can be replayed with writers held
+            while len(self._events) >= self.batch:
+                self._replay(source, target, len(self._events))
+
+            self.tiered._pause()
+            try:
+                self._replay(source, target, math.inf)
+            except BaseException:
+                self.tiered._resume(source)
+                raise
+            self.tiered._resume(target)
+        except BaseException:
+            target.close()
+            self.kvdb.kvs_drop(self.target)
+            raise
+        finally:
+            hse.remove_hook(self)
+            self._events.clear()
+
+        return source
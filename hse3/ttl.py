@@ -0,0 +1,344 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Keys which expire, stored in time buckets so that expiry is a prefix delete.
+
+HSE has no per-key time-to-live. Expiring keys one by one means reading every
+key to find the expired ones and writing a tombstone for each. ``TtlStore``
+instead files each entry under the prefix of the time bucket its expiry falls
+in, so that a whole bucket of entries expires with a single
+``Kvs.prefix_delete()``. A small locator entry per key records the bucket the
+key was last written to.
+
+Layout of the KVS::
+
+    T <bucket> <key>   expiry time, value
+    L <key>            bucket
+
+Buckets are numbered by the end of their time span, in milliseconds divided
+by the bucket width, as 8 big-endian bytes. Entries are removed at most one
+bucket width after they expire, and reads check the expiry time of each
+entry, so an expired entry is never returned even before its bucket is
+deleted. HSE only deletes a prefix as long as the ``prefix.length`` of the
+KVS, so the KVS must be created with ``prefix.length`` set to
+``PREFIX_LENGTH``.
+
+``TtlStore.expire()`` deletes the buckets which have expired, and
+``TtlStore.vacuum()`` deletes the locators left pointing at them. A
+``Sweeper`` runs both from a background thread.
+
+Example::
+
+    store = TtlStore(kvs, bucket=60)
+    with Sweeper(store):
+        store.put(b"session/1", token, ttl=1800)
+        ...
+        token = store.get(b"session/1")
+
+A KVS holds the entries of a single ``TtlStore``. Transactions are not
+supported, so the KVS must be opened with transactions disabled.
+"""
+
+import struct
+import threading
+import time
+from typing import Callable, Optional, SupportsBytes, Union
+
+from hse3 import hse
+
+__all__ = ["PREFIX_LENGTH", "Sweeper", "TtlStore"]
+
+_DATA = b"T"
+_LOCATOR = b"L"
+_U64 = struct.Struct(">Q")
+
+PREFIX_LENGTH = len(_DATA) + _U64.size
+
+
+def _to_bytes(obj: Union[str, bytes, SupportsBytes]) -> bytes:
+    if isinstance(obj, str):
+        return obj.encode()
+    return bytes(obj)
+
+
+class TtlStore:
+    """
+    Entries of a KVS which expire after a time-to-live.
+
+    Args:
+        kvs: KVS holding the entries.
+        bucket: Width of the time buckets in seconds. Expired entries are
+            deleted at most this long after they expire.
+        clock: Function returning the current time in seconds since the
+            epoch.
+
+    Raises:
+        HseException: Underlying C function returned a non-zero value.
+        ValueError: The prefix length of the KVS is not ``PREFIX_LENGTH``.
+    """
+
+    def __init__(
+        self,
+        kvs: hse.Kvs,
+        bucket: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if bucket < 0.001:
+            raise ValueError("bucket must be at least a millisecond")
+        if int(kvs.param("prefix.length")) != PREFIX_LENGTH:
+            raise ValueError(f"KVS must have a prefix.length of {PREFIX_LENGTH}")
+
+        self.kvs = kvs
+        self.bucket = bucket
+        self.clock = clock
+        self._width = int(bucket * 1000)
+        # Serializes locator updates, so vacuum() never deletes a locator a
+        # concurrent put() has just written
+        self._lock = threading.Lock()
+
+    def _now(self, now: Optional[float] = None) -> int:
+        return int((self.clock() if now is None else now) * 1000)
+
+    def _bucket(self, key: bytes) -> Optional[bytes]:
+        return self.kvs.get(_LOCATOR + key)[0]
+
+    def put(
+        self,
+        key: Union[str, bytes, SupportsBytes],
+        value: Union[str, bytes, SupportsBytes],
+        ttl: float,
+    ) -> None:
+        """
+        Put an entry which expires after ``ttl`` seconds.
+
+        Putting an existing key replaces its value and its expiry time.
+
+        Args:
+            key: Key to put.
+            value: Value to put.
+            ttl: Seconds until the entry expires.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        key = _to_bytes(key)
+        expires = self._now() + int(ttl * 1000)
+        # Round up, so that a bucket only expires once all its entries have
+        bucket = _U64.pack(-(-expires // self._width))
+
+        with self._lock:
+            old = self._bucket(key)
+            self.kvs.put(_DATA + bucket + key, _U64.pack(expires) + _to_bytes(value))
+            if old != bucket:
+                self.kvs.put(_LOCATOR + key, bucket)
+                if old is not None:
+                    self.kvs.delete(_DATA + old + key)
+
+    def _entry(self, key: bytes) -> Optional[bytes]:
+        bucket = self._bucket(key)
+        if bucket is None:
+            return None
+
+        entry = self.kvs.get(_DATA + bucket + key)[0]
+        if entry is None or _U64.unpack_from(entry)[0] <= self._now():
+            return None
+        return entry
+
+    def get(self, key: Union[str, bytes, SupportsBytes]) -> Optional[bytes]:
+        """
+        Get the value of an entry.
+
+        Args:
+            key: Key to get.
+
+        Returns:
+            Value, or None if there is no entry or it has expired.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        entry = self._entry(_to_bytes(key))
+        return entry[_U64.size :] if entry is not None else None
+
+    def ttl(self, key: Union[str, bytes, SupportsBytes]) -> Optional[float]:
+        """
+        Get the time left before an entry expires.
+
+        Args:
+            key: Key to get.
+
+        Returns:
+            Seconds left, or None if there is no entry or it has expired.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        entry = self._entry(_to_bytes(key))
+        if entry is None:
+            return None
+        return (_U64.unpack_from(entry)[0] - self._now()) / 1000
+
+    def delete(self, key: Union[str, bytes, SupportsBytes]) -> None:
+        """
+        Delete an entry before it expires. Deleting a missing key is not an
+        error.
+
+        Args:
+            key: Key to delete.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        key = _to_bytes(key)
+        with self._lock:
+            bucket = self._bucket(key)
+            if bucket is not None:
+                self.kvs.delete(_DATA + bucket + key)
+                self.kvs.delete(_LOCATOR + key)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Delete every bucket whose entries have all expired, each with one
+        prefix delete.
+
+        Args:
+            now: Time to expire entries at instead of the clock.
+
+        Returns:
+            int: Number of buckets deleted.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        now_ms = self._now(now)
+        deleted = 0
+        with self.kvs.cursor(_DATA) as cursor:
+            key = cursor.seek(_DATA)
+            while key is not None:
+                bucket = _U64.unpack_from(key, len(_DATA))[0]
+                if bucket * self._width > now_ms:
+                    break
+                self.kvs.prefix_delete(key[:PREFIX_LENGTH])
+                deleted += 1
+                # Skip the rest of the bucket, which the view still holds
+                key = cursor.seek(_DATA + _U64.pack(bucket + 1))
+        return deleted
+
+    def vacuum(self, now: Optional[float] = None) -> int:
+        """
+        Delete the locators of keys whose bucket has expired.
+
+        Locators are small, but each takes a delete, so this is best run
+        less often than ``expire()``.
+
+        Args:
+            now: Time to expire entries at instead of the clock.
+
+        Returns:
+            int: Number of locators deleted.
+
+        Raises:
+            HseException: Underlying C function returned a non-zero value.
+        """
+        limit = self._now(now) // self._width
+        deleted = 0
+        with self.kvs.cursor(_LOCATOR) as cursor:
+            while True:
+                locator, bucket = cursor.read()
+                if cursor.eof:
+                    break
+                assert locator is not None and bucket is not None
+                if _U64.unpack(bucket)[0] > limit:
+                    continue
+                with self._lock:
+                    # The key may have been put again since the cursor view
+                    bucket = self.kvs.get(locator)[0]
+                    if bucket is not None and _U64.unpack(bucket)[0] <= limit:
+                        self.kvs.delete(locator)
+                        deleted += 1
+        return deleted
+
+
+class Sweeper:
+    """
+    Background thread expiring the buckets of a ``TtlStore``.
+
+    An error stops the thread, and is raised again by ``stop()``.
+
+    Args:
+        store: Store to sweep.
+        interval: Seconds between sweeps. Defaults to the bucket width.
+        vacuum_every: Also vacuum locators every this many sweeps.
+    """
+
+    def __init__(
+        self,
+        store: TtlStore,
+        interval: Optional[float] = None,
+        vacuum_every: int = 60,
+    ) -> None:
+        if vacuum_every < 1:
+            raise ValueError("vacuum_every must be positive")
+
+        self.store = store
+        self.interval = store.bucket if interval is None else interval
+        self.vacuum_every = vacuum_every
+        self.sweeps = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "Sweeper":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Start the thread.
+
+        Raises:
+            RuntimeError: The sweeper is already running.
+        """
+        if self._thread is not None:
+            raise RuntimeError("Sweeper is already running")
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="hse3-ttl-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the thread and wait for it. Safe to call more than once.
+
+        Raises:
+            HseException: The last sweep failed.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.store.expire()
+                self.sweeps += 1
+                if self.sweeps % self.vacuum_every == 0:
+                    self.store.vacuum()
+            except BaseException as e:
+                self._error = e
+                return
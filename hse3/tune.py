@@ -0,0 +1,471 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Searching runtime parameters for the configuration which suits a workload.
+
+A ``Workload`` describes a mix of puts, gets and short scans over a key space.
+Its operations are generated from a seed, so every configuration of a sweep,
+and every sweep with the same seed, runs exactly the same operations. Each
+configuration runs on a KVDB created for it in a temporary home, which is
+dropped afterwards, and yields a ``Result`` with the throughput, the latency
+percentiles and the space used by each media class after a final sync.
+
+Configurations are lists of KVDB and KVS runtime parameters, as passed to
+``Kvdb.open()`` and ``Kvdb.kvs_open()``. ``grid()`` tries every combination of
+the given values and ``sample()`` a seeded random subset of them.
+
+From the command line, with values separated by commas::
+
+    python3 -m hse3.tune --ops 200000 --reads 0.8 \\
+        --kvdb-param durability.interval_ms=10,100,1000 \\
+        --kvs-param compression.value.algorithm=none,lz4
+
+HSE must be initialized before calling ``sweep()``. The command line tool
+initializes it itself.
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from hse3 import hse
+
+__all__ = ["Config", "Result", "Workload", "best", "grid", "main", "sample", "sweep"]
+
+_OBJECTIVES = ("throughput", "p99", "space")
+_DISTRIBUTIONS = ("uniform", "zipf", "sequential")
+
+# Ordered as the operation mix is drawn, see _operations()
+_GET, _SCAN, _PUT = range(3)
+
+
+class Workload(NamedTuple):
+    """
+    Operations run against each configuration.
+
+    Attributes:
+        ops: Number of measured operations.
+        keys: Size of the key space. Every key is loaded before measuring.
+        key_size: Key length in bytes.
+        value_size: Value length in bytes.
+        reads: Fraction of operations which are gets.
+        scans: Fraction of operations which are scans. The remaining
+            operations are puts.
+        scan_length: Entries read by each scan.
+        distribution: How keys are picked: ``"uniform"``, ``"zipf"`` or
+            ``"sequential"``.
+        seed: Seed of the operations and the value contents.
+    """
+
+    ops: int = 100000
+    keys: int = 100000
+    key_size: int = 16
+    value_size: int = 100
+    reads: float = 0.5
+    scans: float = 0.0
+    scan_length: int = 10
+    distribution: str = "uniform"
+    seed: int = 0
+
+
+class Config(NamedTuple):
+    """
+    Runtime parameters of one configuration.
+
+    Attributes:
+        kvdb: KVDB runtime parameters of the form ``key=value``.
+        kvs: KVS runtime parameters of the form ``key=value``.
+    """
+
+    kvdb: Tuple[str, ...] = ()
+    kvs: Tuple[str, ...] = ()
+
+
+class Result(NamedTuple):
+    """
+    Measurements of one configuration.
+
+    Attributes:
+        config: Configuration measured.
+        throughput: Operations per second.
+        p50: Median operation latency in seconds.
+        p99: 99th percentile operation latency in seconds.
+        p999: 99.9th percentile operation latency in seconds.
+        used_bytes: Bytes used in all configured media classes.
+        allocated_bytes: Bytes allocated in all configured media classes.
+    """
+
+    config: Config
+    throughput: float
+    p50: float
+    p99: float
+    p999: float
+    used_bytes: int
+    allocated_bytes: int
+
+
+def _space(values: Dict[str, Sequence[str]]) -> List[List[str]]:
+    return [[f"{k}={v}" for v in vs] for k, vs in values.items()]
+
+
+def grid(
+    kvdb: Optional[Dict[str, Sequence[str]]] = None,
+    kvs: Optional[Dict[str, Sequence[str]]] = None,
+) -> List[Config]:
+    """
+    Every combination of parameter values.
+
+    Args:
+        kvdb: Values to try for each KVDB runtime parameter.
+        kvs: Values to try for each KVS runtime parameter.
+
+    Returns:
+        List[Config]: Configurations in a stable order.
+    """
+    kvdb_space, kvs_space = _space(kvdb or {}), _space(kvs or {})
+    return [
+        Config(tuple(c[: len(kvdb_space)]), tuple(c[len(kvdb_space) :]))
+        for c in itertools.product(*kvdb_space, *kvs_space)
+    ]
+
+
+def sample(
+    trials: int,
+    kvdb: Optional[Dict[str, Sequence[str]]] = None,
+    kvs: Optional[Dict[str, Sequence[str]]] = None,
+    seed: int = 0,
+) -> List[Config]:
+    """
+    Random combinations of parameter values, without repetition.
+
+    The combinations are drawn by index, so large grids are never built.
+
+    Args:
+        trials: Number of configurations. All combinations are returned if
+            there are no more than this.
+        kvdb: Values to try for each KVDB runtime parameter.
+        kvs: Values to try for each KVS runtime parameter.
+        seed: Seed of the draw.
+
+    Returns:
+        List[Config]: Configurations in the order drawn.
+    """
+    kvdb_space, kvs_space = _space(kvdb or {}), _space(kvs or {})
+    space = kvdb_space + kvs_space
+    total = 1
+    for values in space:
+        total *= len(values)
+
+    configs = []
+    for index in random.Random(seed).sample(range(total), min(trials, total)):
+        params = []
+        for values in reversed(space):
+            index, i = divmod(index, len(values))
+            params.append(values[i])
+        params.reverse()
+        configs.append(
+            Config(tuple(params[: len(kvdb_space)]), tuple(params[len(kvdb_space) :]))
+        )
+    return configs
+
+
+def _operations(workload: Workload) -> Tuple[List[int], List[int]]:
+    rng = random.Random(workload.seed)
+
+    if workload.distribution == "uniform":
+        keys = [rng.randrange(workload.keys) for _ in range(workload.ops)]
+    elif workload.distribution == "zipf":
+        weights = itertools.accumulate(1 / (i + 1) for i in range(workload.keys))
+        cum_weights = list(weights)
+        keys = rng.choices(
+            range(workload.keys), cum_weights=cum_weights, k=workload.ops
+        )
+    else:
+        keys = [i % workload.keys for i in range(workload.ops)]
+
+    thresholds = [workload.reads, workload.reads + workload.scans]
+    ops = [bisect.bisect(thresholds, rng.random()) for _ in range(workload.ops)]
+
+    return ops, keys
+
+
+def _percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+def _run(
+    workload: Workload,
+    config: Config,
+    home: str,
+    cparams: Sequence[str],
+    ops: List[int],
+    keys: List[int],
+) -> Result:
+    width = workload.key_size
+    rng = random.Random(workload.seed)
+    value = bytes(rng.getrandbits(8) for _ in range(workload.value_size))
+
+    hse.Kvdb.create(home, *cparams)
+    try:
+        kvdb = hse.Kvdb.open(home, *config.kvdb)
+        try:
+            kvdb.kvs_create("tune")
+            kvs = kvdb.kvs_open("tune", *config.kvs)
+            try:
+                encoded = [b"%0*d" % (width, i) for i in range(workload.keys)]
+                for key in encoded:
+                    kvs.put(key, value)
+                kvdb.sync()
+
+                latencies = [0.0] * len(ops)
+                clock = time.perf_counter
+                start = clock()
+                for i, (op, k) in enumerate(zip(ops, keys)):
+                    key = encoded[k]
+                    t = clock()
+                    if op == _PUT:
+                        kvs.put(key, value)
+                    elif op == _GET:
+                        kvs.get(key)
+                    else:
+                        with kvs.cursor() as cursor:
+                            cursor.seek(key)
+                            for _ in range(workload.scan_length):
+                                cursor.read()
+                                if cursor.eof:
+                                    break
+                    latencies[i] = clock() - t
+                elapsed = clock() - start
+
+                kvdb.sync()
+                used = allocated = 0
+                for mclass in hse.Mclass:
+                    if kvdb.mclass_is_configured(mclass):
+                        info = kvdb.mclass_info(mclass)
+                        used += info.used_bytes
+                        allocated += info.allocated_bytes
+            finally:
+                kvs.close()
+        finally:
+            kvdb.close()
+    finally:
+        hse.Kvdb.drop(home)
+
+    latencies.sort()
+    return Result(
+        config,
+        len(ops) / elapsed if elapsed > 0 else float("inf"),
+        _percentile(latencies, 0.5),
+        _percentile(latencies, 0.99),
+        _percentile(latencies, 0.999),
+        used,
+        allocated,
+    )
+
+
+def sweep(
+    workload: Workload,
+    configs: Iterable[Config],
+    cparams: Sequence[str] = (),
+    repeat: int = 1,
+    directory: Optional[str] = None,
+) -> Iterator[Result]:
+    """
+    Run a workload against each configuration, one after the other.
+
+    Args:
+        workload: Operations to run.
+        configs: Configurations to measure, such as from ``grid()``.
+        cparams: KVDB create-time parameters, such as storage paths.
+        repeat: Runs per configuration. The run with the median throughput
+            is kept.
+        directory: Directory to create the temporary KVDB homes in.
+
+    Returns:
+        Iterator[Result]: Measurements in the order of ``configs``, each
+        yielded once its configuration has run.
+
+    Raises:
+        ValueError: The workload is invalid.
+        HseException: Underlying C function returned a non-zero value, for
+            instance because of an unknown parameter.
+    """
+    if workload.ops < 1 or workload.keys < 1 or repeat < 1:
+        raise ValueError("ops, keys and repeat must be positive")
+    if not 0 <= workload.reads + workload.scans <= 1:
+        raise ValueError("reads and scans must add up to at most 1")
+    if len(b"%d" % (workload.keys - 1)) > workload.key_size:
+        raise ValueError("key_size is too small for the key space")
+    if workload.distribution not in _DISTRIBUTIONS:
+        raise ValueError(f"Unknown key distribution {workload.distribution!r}")
+
+    return _sweep(workload, configs, cparams, repeat, directory)
+
+
+def _sweep(
+    workload: Workload,
+    configs: Iterable[Config],
+    cparams: Sequence[str],
+    repeat: int,
+    directory: Optional[str],
+) -> Iterator[Result]:
+    ops, keys = _operations(workload)
+
+    for config in configs:
+        runs = []
+        for _ in range(repeat):
+            home = tempfile.mkdtemp(prefix="hse-tune-", dir=directory)
+            try:
+                runs.append(_run(workload, config, home, cparams, ops, keys))
+            finally:
+                shutil.rmtree(home, ignore_errors=True)
+        runs.sort(key=lambda r: r.throughput)
+        yield runs[len(runs) // 2]
+
+
+def best(results: Iterable[Result], objective: str = "throughput") -> Result:
+    """
+    Pick the best result. Ties go to the earliest result.
+
+    Args:
+        results: Results of ``sweep()``.
+        objective: ``"throughput"`` for the highest throughput, ``"p99"`` for
+            the lowest 99th percentile latency, or ``"space"`` for the fewest
+            bytes used.
+
+    Returns:
+        Result: Best result.
+
+    Raises:
+        ValueError: The objective is unknown or there are no results.
+    """
+    if objective == "throughput":
+        return max(results, key=lambda r: r.throughput)
+    if objective == "p99":
+        return min(results, key=lambda r: r.p99)
+    if objective == "space":
+        return min(results, key=lambda r: r.used_bytes)
+    raise ValueError(f"Unknown objective {objective!r}")
+
+
+def _params(specs: Optional[List[str]]) -> Dict[str, List[str]]:
+    params = {}
+    for spec in specs or ():
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE[,VALUE...]: {spec}")
+        params[name] = values.split(",")
+    return params
+
+
+def _format(result: Result) -> str:
+    params = " ".join(result.config.kvdb + tuple(f"kvs:{p}" for p in result.config.kvs))
+    return (
+        f"{result.throughput:>12.0f} ops/s"
+        f" p50 {result.p50 * 1e6:>9.1f} us"
+        f" p99 {result.p99 * 1e6:>9.1f} us"
+        f" p99.9 {result.p999 * 1e6:>9.1f} us"
+        f" used {result.used_bytes:>12} B"
+        f"  {params or '(defaults)'}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point, see ``python3 -m hse3.tune --help``.
+    """
+    defaults = Workload()
+    parser = argparse.ArgumentParser(
+        prog="python3 -m hse3.tune",
+        description="Sweep KVDB and KVS runtime parameters against a workload.",
+    )
+    parser.add_argument(
+        "--kvdb-param",
+        action="append",
+        metavar="NAME=VALUE[,VALUE...]",
+        help="KVDB runtime parameter values to try",
+    )
+    parser.add_argument(
+        "--kvs-param",
+        action="append",
+        metavar="NAME=VALUE[,VALUE...]",
+        help="KVS runtime parameter values to try",
+    )
+    parser.add_argument(
+        "--cparam", action="append", default=[], help="KVDB create-time parameter"
+    )
+    parser.add_argument("--config", help="HSE global configuration file")
+    parser.add_argument("-d", "--dir", help="directory for the temporary KVDB homes")
+    parser.add_argument(
+        "--random", type=int, metavar="N", help="try N random configurations"
+    )
+    parser.add_argument("--objective", choices=_OBJECTIVES, default="throughput")
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    parser.add_argument("-n", "--ops", type=int, default=defaults.ops)
+    parser.add_argument("--keys", type=int, default=defaults.keys)
+    parser.add_argument("--key-size", type=int, default=defaults.key_size)
+    parser.add_argument("--value-size", type=int, default=defaults.value_size)
+    parser.add_argument("--reads", type=float, default=defaults.reads)
+    parser.add_argument("--scans", type=float, default=defaults.scans)
+    parser.add_argument("--scan-length", type=int, default=defaults.scan_length)
+    parser.add_argument(
+        "--distribution",
+        choices=_DISTRIBUTIONS,
+        default=defaults.distribution,
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+
+    try:
+        kvdb_params, kvs_params = _params(args.kvdb_param), _params(args.kvs_param)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    workload = Workload(
+        args.ops,
+        args.keys,
+        args.key_size,
+        args.value_size,
+        args.reads,
+        args.scans,
+        args.scan_length,
+        args.distribution,
+        args.seed,
+    )
+    if args.random is not None:
+        configs = sample(args.random, kvdb_params, kvs_params, args.seed)
+    else:
+        configs = grid(kvdb_params, kvs_params)
+
+    hse.init(args.config, "rest.enabled=false")
+    try:
+        results = []
+        for result in sweep(workload, configs, args.cparam, args.repeat, args.dir):
+            print(_format(result), flush=True)
+            results.append(result)
+    finally:
+        hse.fini()
+
+    print(f"best {args.objective}:")
+    print(_format(best(results, args.objective)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
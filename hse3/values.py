@@ -0,0 +1,267 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+"""
+Value codecs for storing Python objects in a KVS.
+
+A codec is attached to a KVS with ``Kvdb.kvs_open(name, codec=...)`` or by
+assigning ``Kvs.codec``. ``Kvs.put_obj()`` and ``Kvs.get_obj()`` then encode and
+decode values, and ``KvsCursor.items()`` yields decoded values.
+
+The codec contract is deliberately small so that encoding and decoding avoid
+intermediate copies:
+
+- ``encode(obj)`` returns any object supporting the buffer protocol. The buffer
+  only has to remain valid until the next ``encode()`` call on the same thread,
+  which allows codecs to serialize into a reused, thread-local buffer.
+- ``decode(data)`` receives an immutable ``bytes`` object holding exactly the
+  value returned by HSE. Codecs may return objects that reference ``data``
+  instead of copying out of it.
+"""
+
+import abc
+import pickle
+import struct
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+__all__ = [
+    "Codec",
+    "BytesCodec",
+    "StrCodec",
+    "StructCodec",
+    "PickleCodec",
+    "MsgpackCodec",
+]
+
+
+class Codec(abc.ABC):
+    """
+    Base class for value codecs.
+
+    Subclasses implement the abstract ``encode()`` and ``decode()``, and
+    cannot be instantiated without both. Codecs must be safe to use from
+    multiple threads.
+
+    Codecs which keep their own metadata in the KVS set ``reserved_prefix`` to
+    the prefix of the keys holding it. Decoding cursors skip those keys.
+    """
+
+    reserved_prefix: Optional[bytes] = None
+
+    @abc.abstractmethod
+    def encode(self, obj: Any) -> Any:
+        """
+        Serialize an object into a buffer.
+
+        Args:
+            obj: Object to serialize.
+
+        Returns:
+            Object supporting the buffer protocol, valid until the next call
+            to ``encode()`` on the same thread.
+        """
+
+    @abc.abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """
+        Deserialize a value.
+
+        Args:
+            data: Exact value bytes as stored in the KVS.
+
+        Returns:
+            Deserialized object.
+        """
+
+
+class BytesCodec(Codec):
+    """
+    Identity codec storing bytes-like objects as is.
+
+    Decoding returns the value bytes without copying.
+    """
+
+    def encode(self, obj: Any) -> Any:
+        return obj
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class StrCodec(Codec):
+    """
+    Codec storing strings in a text encoding.
+
+    Args:
+        encoding: Text encoding, UTF-8 by default.
+    """
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        self.encoding = encoding
+
+    def encode(self, obj: str) -> bytes:
+        return obj.encode(self.encoding)
+
+    def decode(self, data: bytes) -> str:
+        return data.decode(self.encoding)
+
+
+class StructCodec(Codec):
+    """
+    Codec storing fixed-layout records with the struct module.
+
+    Values are packed into a reused, thread-local buffer of exactly
+    ``struct.Struct(fmt).size`` bytes.
+
+    Args:
+        fmt: struct format string, for example ``"<qd"``.
+
+    Example::
+
+        kvs.codec = StructCodec("<qd")
+        kvs.put_obj(b"sensor", (17, 21.5))
+        kvs.get_obj(b"sensor")  # (17, 21.5)
+    """
+
+    def __init__(self, fmt: str) -> None:
+        self.struct = struct.Struct(fmt)
+        self._local = threading.local()
+
+    def encode(self, obj: Tuple[Any, ...]) -> bytearray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = bytearray(self.struct.size)
+        self.struct.pack_into(buf, 0, *obj)
+        return buf
+
+    def decode(self, data: bytes) -> Tuple[Any, ...]:
+        return self.struct.unpack(data)
+
+
+class PickleCodec(Codec):
+    """
+    Codec storing arbitrary objects with pickle.
+
+    With protocol 5 or higher, objects exposing ``PickleBuffer`` data, such as
+    NumPy arrays, are serialized out-of-band: their raw memory is appended
+    after the pickle stream instead of being copied into it. On decode the
+    buffers are handed back to pickle as zero-copy, read-only views of the
+    value bytes.
+
+    Values without out-of-band buffers are stored as a plain pickle stream.
+    Values with out-of-band buffers are framed as::
+
+        uint8 0, uint32 buffer count, uint64 length per buffer, pickle stream,
+        buffers
+
+    Pickle streams of protocol 2 and above begin with the PROTO opcode, 0x80,
+    so the two layouts are told apart by their first byte.
+
+    Args:
+        protocol: Pickle protocol, at least 2. Defaults to the highest protocol
+            available. Out-of-band buffers require protocol 5, which is
+            available from Python 3.8.
+    """
+
+    _HEADER = struct.Struct("<xI")
+    _LENGTH = struct.Struct("<Q")
+    _PROTO = 0x80
+
+    def __init__(self, protocol: Optional[int] = None) -> None:
+        self.protocol = pickle.HIGHEST_PROTOCOL if protocol is None else protocol
+        if self.protocol < 2:
+            raise ValueError("PickleCodec requires pickle protocol 2 or higher")
+        self.out_of_band = self.protocol >= 5
+        self._local = threading.local()
+
+    def encode(self, obj: Any) -> Any:
+        if not self.out_of_band:
+            return pickle.dumps(obj, protocol=self.protocol)
+
+        buffers: List[pickle.PickleBuffer] = []
+        stream = pickle.dumps(
+            obj, protocol=self.protocol, buffer_callback=buffers.append
+        )
+        if not buffers:
+            return stream
+
+        views = [b.raw() for b in buffers]
+
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = bytearray()
+        del buf[:]
+        buf += self._HEADER.pack(len(views))
+        for view in views:
+            buf += self._LENGTH.pack(view.nbytes)
+        buf += stream
+        for view in views:
+            buf += view
+            view.release()
+        return buf
+
+    def decode(self, data: bytes) -> Any:
+        if not data or data[0] == self._PROTO:
+            return pickle.loads(data)
+
+        view = memoryview(data)
+        (count,) = self._HEADER.unpack_from(view)
+        offset = self._HEADER.size
+        lengths = []
+        for _ in range(count):
+            lengths.append(self._LENGTH.unpack_from(view, offset)[0])
+            offset += self._LENGTH.size
+
+        end = len(view) - sum(lengths)
+        stream = view[offset:end]
+        buffers = []
+        for length in lengths:
+            buffers.append(view[end : end + length])  # noqa: E203
+            end += length
+
+        return pickle.loads(stream, buffers=buffers)
+
+
+class MsgpackCodec(Codec):
+    """
+    Codec storing objects with msgpack.
+
+    Requires the optional msgpack package. Each thread packs into its own
+    reused ``msgpack.Packer`` buffer.
+
+    Args:
+        default: Callable converting unsupported objects, passed to the packer.
+        ext_hook: Callable decoding extension types, passed to the unpacker.
+
+    Raises:
+        ImportError: msgpack is not installed.
+    """
+
+    def __init__(
+        self,
+        default: Optional[Callable[[Any], Any]] = None,
+        ext_hook: Optional[Callable[[int, bytes], Any]] = None,
+    ) -> None:
+        import msgpack
+
+        self._msgpack = msgpack
+        self._default = default
+        self._unpack_kwargs = {"raw": False}
+        if ext_hook is not None:
+            self._unpack_kwargs["ext_hook"] = ext_hook
+        self._local = threading.local()
+
+    def encode(self, obj: Any) -> Any:
+        packer = getattr(self._local, "packer", None)
+        if packer is None:
+            packer = self._local.packer = self._msgpack.Packer(
+                default=self._default, autoreset=False
+            )
+        packer.reset()
+        packer.pack(obj)
+        return packer.getbuffer()
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, **self._unpack_kwargs)
@@ -9,7 +9,7 @@ import sys
 from functools import partial
 from typing import List
 
-from hse3 import hse, limits
+from hse3 import hse, keys, limits
 
 # This example demonstrates how one could add key-value pairs where the value
 # length could be larger than the allowed maximum limits.KVS_VALUE_LEN_MAX.
@@ -23,15 +23,16 @@ from hse3 import hse, limits
 #
 # This would put the keys:
 #
-#     /tmp/foo00000000
-#     /tmp/foo00000001
-#     /tmp/foo00000002
+#     ("/tmp/foo", 0)
+#     ("/tmp/foo", 1)
+#     ("/tmp/foo", 2)
 #     ...
-#     /tmp/foo00000NNN
+#     ("/tmp/foo", NNN)
 #
-# for chunks of size limits.KVS_VALUE_LEN_MAX read from /tmp/foo. Similarly, the file
-# /tmp/bar will be split into multiple chunks starting with keys starting at
-# /tmp/bar00000000
+# encoded with CHUNK_KEY, for chunks of size limits.KVS_VALUE_LEN_MAX read from
+# /tmp/foo. Similarly, the file /tmp/bar will be split into multiple chunks
+# starting with the key ("/tmp/bar", 0). Chunk numbers are encoded as 4 byte
+# big-endian integers so that chunks are read back in numerical order.
 #
 # To extract the key-value pairs, use the option '-x' on the commandline. For
 # the example above, the commandline will look like this:
@@ -44,26 +45,28 @@ from hse3 import hse, limits
 # NOTE - the names of the files given in the extract run must exactly match
 # the file names inserted or the data will not be found.
 
+CHUNK_KEY = keys.KeyCodec(keys.Str(), keys.UInt(4))
+
 
 def extract_kv_to_files(kvs: hse.Kvs, files: List[str]) -> None:
     for file in files:
         outfile = file + ".out"
         print(f"filename: {outfile}")
         with open(outfile, "rb+") as f:
-            cursor = kvs.cursor(f"{file}|".encode())
+            cursor = kvs.cursor(CHUNK_KEY.prefix(file))
             for _, chunk in cursor.items():
                 if chunk:
                     f.write(chunk)
             cursor.destroy()
 
 
-def put_files_as_kv(kvs: hse.Kvs, keys: List[str]) -> None:
-    for key in keys:
-        with open(key, "rb") as f:
+def put_files_as_kv(kvs: hse.Kvs, files: List[str]) -> None:
+    for file in files:
+        with open(file, "rb") as f:
             for i, chunk in enumerate(
                 iter(partial(f.read, limits.KVS_VALUE_LEN_MAX), b"")
             ):
-                kvs.put(f"{key}|{i:08x}".encode(), chunk)
+                kvs.put(CHUNK_KEY.encode(file, i), chunk)
 
 
 def main():
@@ -27,6 +27,12 @@ must be called before any other HSE functions are used.
 
 This function is not thread safe and is idempotent.
 
+HSE does not survive ``fork()``. In a child process forked after HSE was
+initialized, handles inherited from the parent are made unusable, and this
+function, ``Kvdb.open()`` and ``Kvdb.create()`` raise ``RuntimeError``.
+``fini()`` does nothing in such a child. See ``hse3.multiprocess`` for
+sharing a KVDB between processes.
+
 Args:
     config: Path to a global configuration file.
     params: Parameters in key=value format.
@@ -292,6 +298,8 @@ This function is not thread safe.
 Args:
     name: KVS name.
     params: List of parameters in key=value format.
+    codec: Value codec used by ``Kvs.put_obj()``, ``Kvs.get_obj()`` and
+        cursors created from the KVS. See ``hse3.values``.
 
 Returns:
     Kvs: A KVS handle.
@@ -327,12 +335,146 @@ Args:
     key: Key to get from the KVS.
     txn: Transaction context.
     buf: Buffer into which the value associated with ``key`` will be copied.
+        If not given, the value is read into a new bytes object of the exact
+        length, so concurrent calls never share a buffer.
 
 Returns:
     tuple: Value and length of the value.
 
 Raises:
     HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.get_into": """
+Retrieve the value for a given key from the KVS into a caller's buffer.
+
+Unlike ``Kvs.get()``, no Python object is created for the value, so a buffer
+such as a view of a ``multiprocessing.shared_memory`` segment can be filled
+and handed to another process without any further copy. If the value is
+longer than the buffer, only its start is copied, and the returned length
+shows that it was truncated.
+
+This function is thread safe, but concurrent calls must not share a buffer.
+
+Args:
+    key: Key to get from the KVS.
+    buf: Writable buffer into which the value is copied.
+    txn: Transaction context.
+
+Returns:
+    int: Length of the value, or None if the key does not exist.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.writes": """
+Number of successful puts, deletes and prefix deletes made through this object.
+
+Each row of ``Kvs.put_array()`` counts as one put. Writes made in a
+transaction are counted when they are made, whether or not the transaction
+commits. The counter is local to the process, so it is a cheap hint that new
+data may be visible, used by ``hse3.tail`` to update views early.
+""",
+    "hse.Kvs.codec": """
+Value codec of the KVS, or None.
+
+The codec is used by ``Kvs.put_obj()`` and ``Kvs.get_obj()``, and is inherited
+by cursors created after it is set. See ``hse3.values`` for the codec contract
+and the built-in codecs.
+""",
+    "hse.Kvs.put_obj": """
+Encode an object with the KVS codec and put it into the KVS.
+
+The buffer returned by the codec is passed to HSE without being copied.
+Otherwise behaves like ``Kvs.put()``.
+
+This function is thread safe.
+
+Args:
+    key: Key to put into the KVS.
+    obj: Object to encode as the value.
+    txn: Transaction context.
+    flags: Flags for operation specialization.
+
+Raises:
+    ValueError: The KVS has no codec.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.get_obj": """
+Retrieve a value from the KVS and decode it with the KVS codec.
+
+The value is read into a bytes object of exactly its length, which is handed
+to the codec without further copies.
+
+This function is thread safe.
+
+Args:
+    key: Key to get from the KVS.
+    txn: Transaction context.
+    default: Object to return if the key does not exist.
+
+Returns:
+    Any: Decoded value, or ``default`` if the key does not exist.
+
+Raises:
+    ValueError: The KVS has no codec.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.put_array": """
+Put one key-value pair per row of a pair of NumPy arrays.
+
+Keys are unsigned 64-bit integers stored as 8 byte big-endian keys, so that
+cursors return them in numerical order. The same keys can be built with
+``hse3.keys.KeyCodec(hse3.keys.UInt(8))``. Each row of ``values`` is stored
+as the raw bytes of that row. All puts run in C with the GIL released once
+for the whole batch.
+
+Puts are not atomic as a batch. If an error occurs, the rows before the
+failing one have been put. Pass a transaction to make the batch atomic.
+
+Requires NumPy.
+
+This function is thread safe.
+
+Args:
+    keys: One-dimensional array of non-negative integers.
+    values: Array with one row per key, for example an ``(n, d)`` float32
+        array of vectors.
+    txn: Transaction context.
+    flags: Flags for operation specialization.
+
+Raises:
+    TypeError: ``keys`` is not a one-dimensional integer array.
+    ValueError: ``keys`` contains negative numbers, or the shapes of ``keys``
+        and ``values`` do not match.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.get_array": """
+Retrieve the values of a NumPy array of keys into a NumPy array.
+
+Keys are encoded as in ``Kvs.put_array()``. Values are copied by HSE directly
+into the rows of ``out``, with the GIL released once for the whole batch.
+Rows of missing keys are left untouched.
+
+Requires NumPy.
+
+This function is thread safe.
+
+Args:
+    keys: One-dimensional array of non-negative integers.
+    out: C-contiguous array with one row per key to copy values into.
+    dtype: Data type of the array allocated when ``out`` is not given.
+    shape: Shape of each row of the array allocated when ``out`` is not
+        given.
+    txn: Transaction context.
+
+Returns:
+    tuple: Output array and boolean array, True for each key found.
+
+Raises:
+    TypeError: ``keys`` is not a one-dimensional integer array.
+    ValueError: ``keys`` contains negative numbers, ``out`` has the wrong
+        shape, or a value does not have the size of one row of ``out``.
+    HseException: Underlying C function returned a non-zero value.
 """,
     "hse.Kvs.name": """
 Get KVS parameter.
@@ -428,7 +570,9 @@ This function is thread safe.
 
 Args:
     key: Key to put into KVS.
-    value: Value associated with ``key``.
+    value: Value associated with ``key``. A one-dimensional memoryview of
+        bytes, for example over shared memory, is passed to HSE without a
+        copy.
     txn: Transaction context.
     flags: Flags for operation specialization.
 
@@ -503,6 +647,115 @@ Returns:
 
 Raises:
     HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvdb.snapshot": """
+Create a read-only view of the KVDB at the current point in time.
+
+See ``KvdbSnapshot``.
+
+This function is thread safe.
+
+Returns:
+    KvdbSnapshot: A snapshot handle.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvdbSnapshot": """
+Read-only, point-in-time view across the KVSs of a KVDB.
+
+A snapshot is backed by a transaction which is begun when the snapshot is
+created, never written to, and aborted when the snapshot is closed. Reads
+from any transaction-enabled KVS see the data committed before the snapshot
+was created, whichever KVS they target and however long the snapshot lives.
+Cursors are created once per KVS and reused by later ``cursor()`` calls, so
+only one scan per KVS can be in progress at a time.
+
+A snapshot keeps its view, and the versions of data it references, alive
+until it is closed, so close it as soon as it is no longer needed. Using it
+as a context manager closes it on exit.
+
+All KVSs read through a snapshot must be opened with
+``transactions.enabled=true``.
+
+``get()`` and ``get_many()`` may be called from several threads at once.
+A cursor returned by ``cursor()`` is shared by every caller for that KVS, so
+it must only be used by one thread at a time.
+
+Example::
+
+    with kvdb.snapshot() as snap:
+        user = snap.get(users, b"u1")
+        orders = snap.get_many(orders_kvs, order_keys)
+        for key, value in snap.cursor(audit, b"2022-01", b"2022-02").items():
+            ...
+""",
+    "hse.KvdbSnapshot.close": """
+Release the snapshot's cursors and view.
+
+Closing an already closed snapshot does nothing.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvdbSnapshot.closed": """
+Whether the snapshot has been closed.
+""",
+    "hse.KvdbSnapshot.get": """
+Retrieve the value of a key as of the snapshot.
+
+The value is read into a bytes object of exactly its length.
+
+Args:
+    kvs: KVS to read from.
+    key: Key to get from the KVS.
+
+Returns:
+    bytes: Value, or None if the key did not exist.
+
+Raises:
+    ValueError: The snapshot is closed.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvdbSnapshot.get_many": """
+Retrieve the values of several keys as of the snapshot.
+
+Args:
+    kvs: KVS to read from.
+    keys: Keys to get from the KVS.
+
+Returns:
+    list: Values in the order of ``keys``, None for keys which did not
+    exist.
+
+Raises:
+    ValueError: The snapshot is closed.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvdbSnapshot.cursor": """
+Return the snapshot's cursor over a KVS, positioned with
+``KvsCursor.seek_range()``.
+
+The cursor is created on first use and owned by the snapshot. Each call
+repositions the same cursor, so only one scan per KVS can be in progress at
+a time: the cursor must have been read to the end, or destroyed, before the
+next call. The snapshot destroys the cursor when it is closed. If the cursor
+was destroyed earlier, for instance by leaving a ``with`` block, the next
+call creates a new one.
+
+Args:
+    kvs: KVS to read from.
+    filt_min: Lower bound of the range, or None for the first key.
+    filt_max: Upper bound of the range, or None for no bound.
+
+Returns:
+    KvsCursor: Cursor over the snapshot's view of ``kvs``.
+
+Raises:
+    ValueError: The snapshot is closed.
+    RuntimeError: The cursor returned by the previous call is neither at its
+        end nor destroyed.
+    HseException: Underlying C function returned a non-zero value.
 """,
     "hse.KvdbTransaction.abort": """
 Abort/rollback transaction.
@@ -545,6 +798,141 @@ Returns:
     "hse.CursorCreateFlag": """
 Attributes:
     REV: iterate in reverse lexicographical order
+""",
+    "hse.ChangeOp": """
+Kind of change reported to hooks.
+
+Attributes:
+    PUT: A key was put.
+    DELETE: A key was deleted.
+    PREFIX_DELETE: All keys starting with a prefix were deleted.
+    COMMIT: A transaction committed.
+    ABORT: A transaction aborted.
+""",
+    "hse.ChangeEvent": """
+A change made through the bindings, as passed to hooks.
+
+Attributes:
+    op: Kind of change.
+    kvs: KVS changed, None for COMMIT and ABORT.
+    key: Key put or deleted, or the prefix of a prefix delete.
+    value: Value put, None otherwise.
+""",
+    "hse.add_hook": """
+Register a function called with every change made through the bindings.
+
+Hooks are called in the thread making the change, with a list of
+``ChangeEvent`` in the order the changes were made, after they succeed.
+A write outside a transaction is reported on its own as soon as it returns.
+Writes in a transaction are held until ``KvdbTransaction.commit()``, then
+reported together followed by a COMMIT event, or dropped on abort, which is
+reported as a single ABORT event. Writes made in a transaction before a hook
+was registered are not reported.
+
+The list is shared by all hooks and must not be modified. Hooks should be
+fast. Since the change has already been made when a hook runs, an exception
+raised by a hook is not propagated to the caller. It is passed to
+``sys.unraisablehook``, which prints it by default, and the remaining hooks
+are still called. See ``hse3.changefeed`` for a hook buffering events for
+another thread.
+
+With no hooks registered, writes pay only a flag test.
+
+Args:
+    hook: Function taking a list of ``ChangeEvent``.
+""",
+    "hse.remove_hook": """
+Unregister a function registered with ``add_hook()``.
+
+Args:
+    hook: Function to unregister.
+
+Raises:
+    ValueError: The hook is not registered.
+""",
+    "hse.Kvs.count": """
+Count the keys starting with a prefix.
+
+The keys are walked with a cursor in C without creating Python objects, and
+without holding the GIL. Keys reserved by the KVS codec are skipped, as in
+``KvsCursor.items()``. See ``Kvs.cursor()`` for the view seen with and
+without a transaction.
+
+This function is thread safe.
+
+Args:
+    prefix: Only consider keys starting with this prefix. Consider the whole
+        KVS if not given.
+    txn: Transaction context.
+
+Returns:
+    int: Number of keys.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.size": """
+Total length of the keys starting with a prefix and of their values.
+
+The keys are walked with a cursor in C without creating Python objects, and
+without holding the GIL. Keys reserved by the KVS codec are skipped, as in
+``KvsCursor.items()``. See ``Kvs.cursor()`` for the view seen with and
+without a transaction.
+
+This function is thread safe.
+
+Args:
+    prefix: Only consider keys starting with this prefix. Consider the whole
+        KVS if not given.
+    txn: Transaction context.
+
+Returns:
+    int: Sum of the key and value lengths in bytes.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.first": """
+Smallest key starting with a prefix.
+
+The keys are walked with a cursor in C without creating Python objects, and
+without holding the GIL. Keys reserved by the KVS codec are skipped, as in
+``KvsCursor.items()``. See ``Kvs.cursor()`` for the view seen with and
+without a transaction.
+
+This function is thread safe.
+
+Args:
+    prefix: Only consider keys starting with this prefix. Consider the whole
+        KVS if not given.
+    txn: Transaction context.
+
+Returns:
+    bytes: Key, or None if no key starts with ``prefix``.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.Kvs.last": """
+Largest key starting with a prefix, found with a reverse cursor.
+
+The keys are walked with a cursor in C without creating Python objects, and
+without holding the GIL. Keys reserved by the KVS codec are skipped, as in
+``KvsCursor.items()``. See ``Kvs.cursor()`` for the view seen with and
+without a transaction.
+
+This function is thread safe.
+
+Args:
+    prefix: Only consider keys starting with this prefix. Consider the whole
+        KVS if not given.
+    txn: Transaction context.
+
+Returns:
+    bytes: Key, or None if no key starts with ``prefix``.
+
+Raises:
+    HseException: Underlying C function returned a non-zero value.
 """,
     "hse.Kvs.cursor": """
 Non-transactional cursors:
@@ -614,6 +1002,9 @@ Raises:
 Convenience function to return an iterator over key-value pairs in a cursor's
 view.
 
+If the cursor has a codec, values are decoded with it and keys starting with
+the codec's ``reserved_prefix`` are skipped.
+
 Args:
     key_buf: Buffer into which keys will be copied.
     value_buf: Buffer into which values will be copied.
@@ -623,6 +1014,39 @@ Returns:
 
 Raises:
     HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvsCursor.record_batches": """
+Read the cursor's view as Apache Arrow record batches.
+
+Each batch has a ``key`` and a ``value`` column of type ``large_binary``.
+Records are copied by C code, with the GIL released, into one offsets buffer
+and one data buffer per column. Those buffers are handed to Arrow without a
+further copy. Values are returned as stored, the cursor's codec is not
+applied. Empty values are empty binaries rather than nulls.
+
+The batches can be turned into a table with ``pyarrow.Table.from_batches()``
+and passed on to pandas or polars.
+
+Requires pyarrow.
+
+Args:
+    batch_size: Maximum number of records per batch.
+    filt_min: If given with or without ``filt_max``, the cursor is first
+        positioned with ``KvsCursor.seek_range()``.
+    filt_max: Upper bound of the range, see ``KvsCursor.seek_range()``.
+    batch_bytes: A batch ends early once its keys and values reach this size.
+
+Returns:
+    Iterator of ``pyarrow.RecordBatch``.
+
+Raises:
+    ValueError: ``batch_size`` is not positive.
+    HseException: Underlying C function returned a non-zero value.
+""",
+    "hse.KvsCursor.codec": """
+Value codec used by ``KvsCursor.items()``, or None for raw values.
+
+Defaults to the codec of the KVS at the time the cursor was created.
 """,
     "hse.KvsCursor.read": """
 Iteratively access the elements pointed to by the cursor.
@@ -781,6 +1205,141 @@ Patch version of HSE.
 """,
     "hse.KvdbCompactFlag": """
 Kvdb.compact() flags.
+""",
+    "keys": """
+Order-preserving encodings for multi-segment keys.
+
+A ``KeyCodec`` is a sequence of typed segments. Encoded keys compare
+lexicographically in the same order as the tuples they were encoded from, so
+KVS cursors return them sorted by segment value rather than by their textual
+representation.
+
+Fixed-width segments at the front of a key form a key prefix whose length is
+known up front. Create the KVS with ``prefix.length`` set to
+``KeyCodec.prefix_length()`` so that ``KeyCodec.prefix()`` can be used as a
+cursor filter or with ``Kvs.prefix_delete()``::
+
+    codec = keys.KeyCodec(keys.UInt(4), keys.Str())
+    kvdb.kvs_create("kvs", f"prefix.length={codec.prefix_length(1)}")
+    kvs.put(codec.encode(7, "name"), b"value")
+    kvs.prefix_delete(codec.prefix(7))
+""",
+    "keys.Segment": """
+Base class of key segment types. It cannot be instantiated itself.
+""",
+    "keys.Segment.width": """
+Encoded width of the segment in bytes, or None if the segment is
+variable-length.
+""",
+    "keys.UInt": """
+Unsigned integer segment, encoded big-endian in ``width`` bytes.
+
+Args:
+    width: Encoded width in bytes, between 1 and 8.
+""",
+    "keys.Int": """
+Signed integer segment, encoded big-endian in ``width`` bytes with the sign
+bit flipped so that negative values sort first.
+
+Args:
+    width: Encoded width in bytes, between 1 and 8.
+""",
+    "keys.Float": """
+Double precision floating point segment, encoded in 8 bytes.
+
+Negative values have all of their bits inverted and positive values have their
+sign bit set, which makes the IEEE 754 representation sort numerically.
+""",
+    "keys.Timestamp": """
+``datetime.datetime`` segment, encoded as a signed 8 byte count of
+microseconds since the Unix epoch.
+
+Naive datetimes are interpreted as UTC. Decoded values are timezone-aware UTC
+datetimes.
+""",
+    "keys.Bytes": """
+Byte string segment.
+
+Fixed-width segments are padded with NUL bytes, which are stripped on decode,
+so values ending in a NUL byte raise ValueError on encode. Variable-length
+segments escape NUL bytes and are terminated, which keeps shorter values sorted
+before their extensions at the cost of 2 bytes.
+
+Args:
+    width: Encoded width in bytes, or None for a variable-length segment.
+""",
+    "keys.Str": """
+UTF-8 string segment, encoded the same way as ``Bytes``.
+
+Args:
+    width: Encoded width in bytes, or None for a variable-length segment.
+""",
+    "keys.KeyCodec": """
+Encoder and decoder for keys made of a sequence of segments.
+
+Args:
+    segments: Segment types, from most to least significant.
+""",
+    "keys.KeyCodec.segments": """
+Segment types of the codec.
+""",
+    "keys.KeyCodec.encode": """
+Encode a full key.
+
+Args:
+    values: One value per segment.
+
+Returns:
+    bytes: Encoded key.
+
+Raises:
+    ValueError: Wrong number of values or key longer than
+        ``limits.KVS_KEY_LEN_MAX``.
+    OverflowError: Integer does not fit in its segment.
+""",
+    "keys.KeyCodec.prefix": """
+Encode the leading segments of a key.
+
+The result is a prefix of every key encoded with the same leading values and
+can be used as a cursor filter, as a ``KvsCursor.seek()`` target, or with
+``Kvs.prefix_delete()``.
+
+Args:
+    values: Values for the first ``len(values)`` segments.
+
+Returns:
+    bytes: Encoded key prefix.
+
+Raises:
+    ValueError: Too many values or key longer than ``limits.KVS_KEY_LEN_MAX``.
+    OverflowError: Integer does not fit in its segment.
+""",
+    "keys.KeyCodec.decode": """
+Decode a key.
+
+Args:
+    key: Key previously produced by ``KeyCodec.encode()``.
+
+Returns:
+    tuple: One value per segment.
+
+Raises:
+    ValueError: Key is truncated or malformed.
+""",
+    "keys.KeyCodec.prefix_length": """
+Length in bytes of the key prefix made of the first ``count`` segments.
+
+Use the result as the ``prefix.length`` parameter when creating the KVS.
+
+Args:
+    count: Number of leading segments in the key prefix.
+
+Returns:
+    int: Key prefix length.
+
+Raises:
+    ValueError: A segment is variable-length or the prefix is longer than
+        ``limits.KVS_PFX_LEN_MAX``.
 """,
 }
 
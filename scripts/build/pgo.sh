@@ -0,0 +1,79 @@
+#!/bin/sh
+
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+# Build the extension modules with profile-guided optimization, and with LTO
+# across the modules and the statically linked HSE library:
+#
+#   1. configure a release build with -Db_lto=true -Dpgo=generate
+#   2. run benchmarks/bench_hotpaths.py on a temporary KVDB to collect profiles
+#   3. rebuild the same directory with -Dpgo=use
+#
+# With --compare, a plain release build is benchmarked too, to show the gain.
+# Remaining arguments are passed to "meson setup".
+#
+# Usage: pgo.sh [--compare] [BUILD_DIR] [MESON_SETUP_ARGS...]
+#
+# Environment:
+#   PYTHON        Python interpreter to train with (python3)
+#   TRAINING_OPS  Operations per training measurement (200000)
+
+set -eu
+
+source_root=$(realpath "$(dirname "$(dirname "$(dirname "$0")")")")
+python=${PYTHON:-python3}
+ops=${TRAINING_OPS:-200000}
+
+compare=false
+if [ "${1:-}" = "--compare" ]; then
+    compare=true
+    shift
+fi
+build_dir=$(realpath -m "${1:-build-pgo}")
+if [ $# -gt 0 ]; then
+    shift
+fi
+
+setup() {
+    dir=$1
+    shift
+    if [ -d "$dir/meson-private" ]; then
+        meson setup --reconfigure "$dir" "$source_root" "$@"
+    else
+        meson setup "$dir" "$source_root" "$@"
+    fi
+}
+
+hotpaths() {
+    PYTHONPATH="$1" "$python" "$source_root/benchmarks/bench_hotpaths.py" \
+        --ops "$ops"
+}
+
+setup "$build_dir" --buildtype=release -Db_lto=true -Dpgo=generate \
+    -Dtests=false "$@"
+meson compile -C "$build_dir"
+
+echo "Training on $build_dir"
+find "$build_dir" \( -name '*.gcda' -o -name '*.profraw' \) -delete
+LLVM_PROFILE_FILE="$build_dir/pgo-%p.profraw" hotpaths "$build_dir" > /dev/null
+# Clang writes raw profiles which must be merged before they can be used
+if ls "$build_dir"/*.profraw > /dev/null 2>&1; then
+    llvm-profdata merge --output="$build_dir/default.profdata" \
+        "$build_dir"/*.profraw
+fi
+
+meson configure "$build_dir" -Dpgo=use
+meson compile -C "$build_dir"
+
+if [ "$compare" = true ]; then
+    baseline_dir="$build_dir-baseline"
+    setup "$baseline_dir" --buildtype=release -Dtests=false "$@"
+    meson compile -C "$baseline_dir"
+
+    echo "Release build:"
+    hotpaths "$baseline_dir"
+    echo "PGO and LTO build:"
+    hotpaths "$build_dir"
+fi
@@ -8,9 +8,11 @@ import argparse
 import pathlib
 import re
 import sys
+from typing import Dict
 
 IFDEF_RE = re.compile(r"#\W+ifdef\W+HSE_PYTHON_EXPERIMENTAL")
 ENDIF_RE = re.compile(r"#\W+endif")
+CYTHON_IF_RE = re.compile(r"(\s*)IF HSE_PYTHON_EXPERIMENTAL == 1:\s*$")
 
 
 def preprocess(file: pathlib.Path, output: pathlib.Path, experimental: bool = False):
@@ -28,6 +30,41 @@ def preprocess(file: pathlib.Path, output: pathlib.Path, experimental: bool = Fa
                 out.write(line)
 
 
+def preprocess_pxd(
+    file: pathlib.Path,
+    output: pathlib.Path,
+    defines: Dict[str, str],
+    experimental: bool = False,
+):
+    """
+    Resolve the compile-time conditionals and constants of a pxd, so that
+    extensions cimporting the installed file compile without the compile-time
+    environment of the bindings.
+    """
+    lines = file.read_text().splitlines(keepends=True)
+    with open(output, "w", encoding="utf-8") as out:
+        indent = None
+        for line in lines:
+            if indent is not None:
+                if not line.strip():
+                    out.write(line)
+                    continue
+                if len(line) - len(line.lstrip()) > indent:
+                    if experimental:
+                        out.write(line[4:])
+                    continue
+                indent = None
+
+            match = CYTHON_IF_RE.match(line)
+            if match:
+                indent = len(match.group(1))
+                continue
+
+            for name, value in defines.items():
+                line = re.sub(rf"\b{name}\b", value, line)
+            out.write(line)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Insert docstrings into input files")
     parser.add_argument(
@@ -44,10 +81,22 @@ if __name__ == "__main__":
     parser.add_argument(
         "--experimental", action="store_true", help="Enable experimental"
     )
+    parser.add_argument(
+        "-D",
+        "--define",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Compile-time constant to substitute in pxd files",
+    )
     ns = parser.parse_args(sys.argv[1:])
 
     file = ns.file[0]
     output = ns.output[0]
     experimental = ns.experimental
 
-    preprocess(file, output, experimental)
+    if file.suffix == ".pxd":
+        defines = dict(d.split("=", 1) for d in ns.define)
+        preprocess_pxd(file, output, defines, experimental)
+    else:
+        preprocess(file, output, experimental)
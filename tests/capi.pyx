@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+# Extension using the C API of hse3.hse as another project would, from the
+# installed pxd
+
+from hse3.hse cimport Kvdb, KvdbTransaction, Kvs, KvsCursor
+
+
+def put(Kvs kvs, const unsigned char[:] key, const unsigned char[:] value, KvdbTransaction txn=None):
+    kvs.put_c(&key[0], key.shape[0], &value[0] if value.shape[0] > 0 else NULL,
+        value.shape[0], txn)
+
+
+def get(Kvs kvs, const unsigned char[:] key, unsigned char[:] buf, KvdbTransaction txn=None):
+    cdef size_t value_len = 0
+    if not kvs.get_c(&key[0], key.shape[0], &buf[0], buf.shape[0], &value_len, txn):
+        return None
+    return value_len
+
+
+def delete(Kvs kvs, const unsigned char[:] key, KvdbTransaction txn=None):
+    kvs.delete_c(&key[0], key.shape[0], txn)
+
+
+def seek(KvsCursor cursor, const unsigned char[:] key):
+    cdef const void *found = NULL
+    cdef size_t found_len = 0
+    cursor.seek_c(&key[0], key.shape[0], &found, &found_len)
+    return (<const char *>found)[:found_len] if found else None
+
+
+def items(KvsCursor cursor):
+    cdef const void *key = NULL
+    cdef const void *value = NULL
+    cdef size_t key_len = 0
+    cdef size_t value_len = 0
+
+    result = []
+    while cursor.read_c(&key, &key_len, &value, &value_len):
+        result.append(((<const char *>key)[:key_len], (<const char *>value)[:value_len]))
+    return result
+
+
+def handles(Kvdb kvdb, Kvs kvs, KvdbTransaction txn, KvsCursor cursor):
+    return (
+        kvdb.handle_c() != NULL,
+        kvs.handle_c() != NULL,
+        txn.handle_c() != NULL,
+        cursor.handle_c() != NULL,
+    )
@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import unittest
+
+import capi
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, limits
+
+
+class CApiTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+        cls.txn_kvs = kvs_fixture(
+            cls.kvdb, "txn-kvs", rparams=("transactions.enabled=true",)
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+        cls.txn_kvs.close()
+        cls.kvdb.kvs_drop("txn-kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def tearDown(self) -> None:
+        self.kvs.prefix_delete("key")
+        return super().tearDown()
+
+    def test_put_get_delete(self):
+        capi.put(self.kvs, b"key1", b"value1")
+        capi.put(self.kvs, b"key2", b"")
+        self.assertTupleEqual(self.kvs.get("key1"), (b"value1", 6))
+
+        buf = bytearray(4)
+        self.assertEqual(capi.get(self.kvs, b"key1", buf), 6)
+        self.assertEqual(buf, b"valu")
+        self.assertEqual(capi.get(self.kvs, b"key2", buf), 0)
+        self.assertIsNone(capi.get(self.kvs, b"key3", buf))
+
+        capi.delete(self.kvs, b"key1")
+        self.assertIsNone(self.kvs.get("key1")[0])
+
+    def test_transaction(self):
+        with self.kvdb.transaction() as txn:
+            capi.put(self.txn_kvs, b"key1", b"value1", txn)
+            self.assertEqual(capi.get(self.txn_kvs, b"key1", bytearray(8), txn), 6)
+            capi.delete(self.txn_kvs, b"key1", txn)
+            self.assertIsNone(capi.get(self.txn_kvs, b"key1", bytearray(8), txn))
+
+    def test_cursor(self):
+        for i in range(3):
+            self.kvs.put(f"key{i}", f"value{i}")
+
+        with self.kvs.cursor("key") as cursor:
+            self.assertListEqual(
+                capi.items(cursor),
+                [(b"key0", b"value0"), (b"key1", b"value1"), (b"key2", b"value2")],
+            )
+            self.assertTrue(cursor.eof)
+
+            self.assertEqual(capi.seek(cursor, b"key1"), b"key1")
+            self.assertFalse(cursor.eof)
+            self.assertListEqual(
+                capi.items(cursor), [(b"key1", b"value1"), (b"key2", b"value2")]
+            )
+
+    def test_handles(self):
+        with self.kvs.cursor() as cursor:
+            txn = self.kvdb.transaction()
+            self.assertTupleEqual(
+                capi.handles(self.kvdb, self.kvs, txn, cursor), (True,) * 4
+            )
+
+    def test_hooks(self):
+        calls = []
+        hse.add_hook(calls.append)
+        try:
+            capi.put(self.kvs, b"key1", b"value1")
+            capi.delete(self.kvs, b"key1")
+        finally:
+            hse.remove_hook(calls.append)
+
+        self.assertListEqual(
+            calls,
+            [
+                [hse.ChangeEvent(hse.ChangeOp.PUT, self.kvs, b"key1", b"value1")],
+                [hse.ChangeEvent(hse.ChangeOp.DELETE, self.kvs, b"key1", None)],
+            ],
+        )
+
+    def test_errors(self):
+        with self.assertRaises(hse.HseException):
+            capi.put(self.kvs, b"k" * (limits.KVS_KEY_LEN_MAX + 1), b"value")
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
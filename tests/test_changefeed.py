@@ -0,0 +1,173 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import asyncio
+import sys
+import threading
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import changefeed, hse
+
+RPARAMS = ("transactions.enabled=true",)
+
+
+class ChangeFeedTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+        cls.txn_kvs = kvs_fixture(cls.kvdb, "txn-kvs", rparams=RPARAMS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for kvs in (cls.kvs, cls.txn_kvs):
+            name = kvs.name
+            kvs.close()
+            cls.kvdb.kvs_drop(name)
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.feed = changefeed.ChangeFeed().start()
+
+    def tearDown(self) -> None:
+        self.feed.close()
+        self.kvs.prefix_delete("key")
+        with self.kvdb.transaction() as txn:
+            self.txn_kvs.prefix_delete("key", txn=txn)
+        return super().tearDown()
+
+    def test_hooks(self):
+        calls = []
+        hse.add_hook(calls.append)
+        self.kvs.put("key1", "value1")
+        hse.remove_hook(calls.append)
+        self.kvs.put("key2", "value2")
+
+        self.assertListEqual(
+            calls, [[hse.ChangeEvent(hse.ChangeOp.PUT, self.kvs, b"key1", b"value1")]]
+        )
+        with self.assertRaises(ValueError):
+            hse.remove_hook(calls.append)
+
+    @unittest.skipIf(sys.version_info < (3, 8), "requires sys.unraisablehook")
+    def test_hook_error(self):
+        def failing(events) -> None:
+            raise RuntimeError("hook failed")
+
+        calls = []
+        unraisable = []
+        default, sys.unraisablehook = sys.unraisablehook, unraisable.append
+        hse.add_hook(failing)
+        hse.add_hook(calls.append)
+        try:
+            # The writes succeeded, so they do not raise
+            self.kvs.put("key1", "value1")
+            with self.kvdb.transaction() as txn:
+                self.txn_kvs.put("key1", "value1", txn=txn)
+        finally:
+            hse.remove_hook(failing)
+            hse.remove_hook(calls.append)
+            sys.unraisablehook = default
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(unraisable), 2)
+        self.assertIsInstance(unraisable[0].exc_value, RuntimeError)
+        self.assertIs(unraisable[0].object, failing)
+        with self.kvdb.transaction() as txn:
+            self.assertEqual(self.txn_kvs.get("key1", txn=txn)[0], b"value1")
+
+    def test_non_transactional(self):
+        self.kvs.put("key1", "value1")
+        self.kvs.delete("key1")
+        self.kvs.prefix_delete("key")
+
+        self.assertListEqual(
+            [(e.op, e.kvs, e.key, e.value) for e in self.feed.drain()],
+            [
+                (hse.ChangeOp.PUT, self.kvs, b"key1", b"value1"),
+                (hse.ChangeOp.DELETE, self.kvs, b"key1", None),
+                (hse.ChangeOp.PREFIX_DELETE, self.kvs, b"key", None),
+            ],
+        )
+
+    def test_transactions(self):
+        with self.kvdb.transaction() as txn:
+            self.txn_kvs.put("key1", "value1", txn=txn)
+            self.txn_kvs.put("key2", None, txn=txn)
+            self.assertEqual(len(self.feed), 0)
+
+        with self.kvdb.transaction() as txn:
+            self.txn_kvs.delete("key1", txn=txn)
+            txn.abort()
+
+        self.assertListEqual(
+            self.feed.get(timeout=0),
+            [
+                hse.ChangeEvent(hse.ChangeOp.PUT, self.txn_kvs, b"key1", b"value1"),
+                hse.ChangeEvent(hse.ChangeOp.PUT, self.txn_kvs, b"key2", None),
+                hse.ChangeEvent(hse.ChangeOp.COMMIT, None, None, None),
+            ],
+        )
+        self.assertListEqual(
+            self.feed.get(timeout=0),
+            [hse.ChangeEvent(hse.ChangeOp.ABORT, None, None, None)],
+        )
+        self.assertIsNone(self.feed.get(timeout=0))
+
+    def test_overflow(self):
+        feed = changefeed.ChangeFeed(capacity=2)
+        with feed:
+            for i in range(5):
+                self.kvs.put(f"key{i}", None)
+        self.assertEqual(feed.dropped, 3)
+        self.assertListEqual([e.key for e in feed.drain()], [b"key3", b"key4"])
+
+    def test_consumer_thread(self):
+        received = []
+
+        def consume():
+            for event in self.feed:
+                received.append(event.key)
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        for i in range(100):
+            self.kvs.put(f"key{i:03}", None)
+        self.feed.close()
+        thread.join()
+
+        self.assertListEqual(received, [f"key{i:03}".encode() for i in range(100)])
+
+    def test_async(self):
+        async def consume():
+            return [event.key async for event in self.feed]
+
+        async def main():
+            task = asyncio.ensure_future(consume())
+            for i in range(10):
+                self.kvs.put(f"key{i}", None)
+                await asyncio.sleep(0)
+            self.feed.close()
+            return await task
+
+        loop = asyncio.new_event_loop()
+        try:
+            received = loop.run_until_complete(main())
+        finally:
+            loop.close()
+
+        self.assertListEqual(received, [f"key{i}".encode() for i in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
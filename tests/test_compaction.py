@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import datetime
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture
+
+from hse3 import hse
+from hse3.compaction import CompactionScheduler, Window
+
+
+class WindowTests(unittest.TestCase):
+    def test_contains(self):
+        night = Window.parse("22:00-06:00")
+        day = Window.parse("09:30 - 17:00")
+
+        for moment, in_night, in_day in (
+            (datetime.time(23, 0), True, False),
+            (datetime.time(3, 0), True, False),
+            (datetime.time(6, 0), False, False),
+            (datetime.time(9, 30), False, True),
+            (datetime.time(17, 0), False, False),
+        ):
+            with self.subTest(moment=moment):
+                self.assertEqual(moment in night, in_night)
+                self.assertEqual(moment in day, in_day)
+        self.assertIn(datetime.datetime(2022, 1, 1, 23), night)
+
+        for window in ("22:00", "25:00-01:00"):
+            with self.assertRaises(ValueError):
+                Window.parse(window)
+
+
+@unittest.skipUnless(ARGS.experimental, "KVDB compaction is experimental")
+class CompactionSchedulerTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.now = datetime.datetime(2022, 1, 1, 2, 0)
+        self.latency = 0.001
+        self.actions = []
+        self.scheduler = CompactionScheduler(
+            self.kvdb,
+            windows=[Window.parse("01:00-05:00")],
+            latency=lambda: self.latency,
+            max_latency=0.01,
+            min_samp=0,
+            on_action=lambda action, status: self.actions.append(action),
+            clock=lambda: self.now,
+        )
+
+    def tearDown(self) -> None:
+        if self.kvdb.compact_status.active:
+            self.kvdb.compact(flags=hse.KvdbCompactFlag.CANCEL)
+        return super().tearDown()
+
+    def test_window(self):
+        self.now = self.now.replace(hour=6)
+        self.assertIsNone(self.scheduler.poll())
+
+        self.now = self.now.replace(hour=2)
+        self.assertEqual(self.scheduler.poll(), "started")
+        self.assertTrue(self.kvdb.compact_status.active)
+        self.assertIsNone(self.scheduler.poll())
+
+        self.now = self.now.replace(hour=5)
+        self.assertEqual(self.scheduler.poll(), "canceled")
+        self.assertFalse(self.kvdb.compact_status.active)
+
+        metrics = self.scheduler.metrics
+        self.assertEqual((metrics.polls, metrics.started, metrics.canceled), (4, 1, 1))
+        self.assertFalse(metrics.active)
+        self.assertListEqual(self.actions, ["started", "canceled"])
+
+    def test_latency(self):
+        self.latency = 0.1
+        self.assertIsNone(self.scheduler.poll())
+        self.assertEqual(self.scheduler.metrics.deferred_latency, 1)
+
+        self.latency = 0.001
+        self.assertEqual(self.scheduler.poll(), "started")
+        self.latency = 0.1
+        self.assertEqual(self.scheduler.poll(), "canceled")
+
+    def test_external(self):
+        # Compactions the scheduler did not start are left alone
+        self.kvdb.compact()
+        self.now = self.now.replace(hour=12)
+        self.assertIsNone(self.scheduler.poll())
+        self.assertTrue(self.kvdb.compact_status.active)
+
+    def test_thread(self):
+        scheduler = CompactionScheduler(self.kvdb, min_samp=0, interval=60)
+        with scheduler:
+            pass
+        self.assertEqual(scheduler.metrics.started, 1)
+        self.assertEqual(scheduler.metrics.canceled, 1)
+        self.assertFalse(self.kvdb.compact_status.active)
+
+        with self.assertRaises(ValueError):
+            CompactionScheduler(self.kvdb, interval=0)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
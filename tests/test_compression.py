@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import json
+import random
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import compression, hse
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def record(rng: random.Random) -> bytes:
+    return json.dumps(
+        {
+            "id": rng.randrange(1 << 32),
+            "status": rng.choice(["active", "inactive", "pending"]),
+            "region": rng.choice(["us-east-1", "us-west-2", "eu-central-1"]),
+            "tags": ["sensor", "temperature", "humidity"],
+            "reading": round(rng.uniform(-40, 40), 2),
+        }
+    ).encode()
+
+
+@unittest.skipIf(zstandard is None, "requires zstandard")
+class ZstdDictCodecTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.codec = compression.ZstdDictCodec(self.kvs)
+        self.kvs.codec = self.codec
+        rng = random.Random(0)
+        self.records = [record(rng) for _ in range(500)]
+        for i, r in enumerate(self.records):
+            self.kvs.put_obj(f"key{i:03}", r)
+
+    def tearDown(self) -> None:
+        self.kvs.codec = None
+        self.kvs.prefix_delete("key")
+        self.kvs.prefix_delete(compression.DICTIONARY_PREFIX)
+        return super().tearDown()
+
+    def stored_size(self) -> int:
+        with self.kvs.cursor("key") as cursor:
+            cursor.codec = None
+            return sum(len(v) for _, v in cursor.items())
+
+    def test_train(self):
+        self.assertEqual(self.codec.version, 0)
+        before = self.stored_size()
+
+        self.assertEqual(self.codec.train(dict_size=4096, seed=0), 1)
+        self.assertEqual(self.codec.recompress(), len(self.records))
+        self.assertEqual(self.codec.recompress(), 0)
+        self.assertLess(self.stored_size() * 2, before)
+
+        for i, r in enumerate(self.records):
+            self.assertEqual(self.kvs.get_obj(f"key{i:03}"), r)
+
+        with self.kvs.cursor() as cursor:
+            self.assertListEqual([v for _, v in cursor.items()], self.records)
+
+        # The dictionaries are hidden from the aggregates too
+        self.assertEqual(self.kvs.count(), len(self.records))
+        self.assertEqual(self.kvs.last(), f"key{len(self.records) - 1:03}".encode())
+
+    def test_versions(self):
+        self.codec.train(dict_size=4096, seed=0)
+        self.kvs.put_obj("key000", self.records[0])
+        self.codec.train(dict_size=4096, seed=1)
+        self.kvs.put_obj("key001", self.records[1])
+
+        value, _ = self.kvs.get("key000")
+        self.assertEqual(value[:2], b"\x01\x00")
+        value, _ = self.kvs.get("key001")
+        self.assertEqual(value[:2], b"\x02\x00")
+
+        # A fresh codec finds both dictionaries in the KVS
+        codec = compression.ZstdDictCodec(self.kvs)
+        self.assertEqual(codec.version, 2)
+        self.assertEqual(codec.decode(self.kvs.get("key000")[0]), self.records[0])
+        self.assertEqual(codec.decode(self.kvs.get("key001")[0]), self.records[1])
+
+    def test_no_samples(self):
+        self.kvs.prefix_delete("key")
+        with self.assertRaises(ValueError):
+            self.codec.train()
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
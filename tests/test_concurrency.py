@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import gc
+import threading
+import tracemalloc
+import unittest
+from typing import Callable, List
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse
+
+RPARAMS = ("transactions.enabled=true",)
+ROUNDS = 20
+
+
+def run_threads(count: int, fn: Callable[[int], None]) -> List[BaseException]:
+    errors: List[BaseException] = []
+    barrier = threading.Barrier(count)
+
+    def target(t: int) -> None:
+        try:
+            barrier.wait()
+            fn(t)
+        except BaseException as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(t,)) for t in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+class ConcurrencyTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+        cls.txn_kvs = kvs_fixture(cls.kvdb, "txn-kvs", rparams=RPARAMS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for kvs in (cls.kvs, cls.txn_kvs):
+            name = kvs.name
+            kvs.close()
+            cls.kvdb.kvs_drop(name)
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def tearDown(self) -> None:
+        self.kvs.prefix_delete("key")
+        with self.kvdb.transaction() as txn:
+            self.txn_kvs.prefix_delete("key", txn=txn)
+        return super().tearDown()
+
+    def work(self, t: int, rounds: int = ROUNDS) -> None:
+        prefix = f"key{t:02}-".encode()
+        buf = bytearray(64)
+        txn = self.kvdb.transaction()
+
+        for i in range(rounds):
+            key = prefix + b"%04d" % i
+            self.kvs.put(key, key)
+            value, _ = self.kvs.get(key, buf=buf)
+            assert value == key, (key, value)
+
+            with self.kvs.cursor(prefix) as cursor:
+                count = sum(1 for _ in cursor.items())
+            assert count == i + 1, (prefix, count)
+
+            txn.begin()
+            self.txn_kvs.put(key, key, txn=txn)
+            if i % 4 == 3:
+                txn.abort()
+            else:
+                txn.commit()
+
+            # Transactions and cursors dropped without cleanup are freed by
+            # __dealloc__, possibly while other threads are inside HSE
+            self.kvs.cursor(prefix).read()
+            self.kvdb.transaction().begin()
+
+    def check(self, threads: int) -> None:
+        for t in range(threads):
+            prefix = f"key{t:02}-"
+            with self.kvs.cursor(prefix) as cursor:
+                self.assertEqual(sum(1 for _ in cursor.items()), ROUNDS)
+            with self.kvdb.transaction() as txn:
+                with self.txn_kvs.cursor(prefix, txn=txn) as cursor:
+                    self.assertEqual(
+                        sum(1 for _ in cursor.items()), ROUNDS - ROUNDS // 4
+                    )
+
+    def test_mixed(self):
+        # Kept small for sanitizer runs; benchmarks/bench_concurrency.py
+        # measures scaling with more threads
+        for threads in (1, 4, 16):
+            with self.subTest(threads=threads):
+                self.assertListEqual(run_threads(threads, self.work), [])
+                self.check(threads)
+                self.tearDown()
+
+    def test_default_buffer(self):
+        for t in range(16):
+            self.kvs.put(f"key{t:02}", bytes([t]) * (t * 1000))
+
+        def get(t: int) -> None:
+            expected = bytes([t]) * (t * 1000)
+            for _ in range(ROUNDS):
+                value, length = self.kvs.get(f"key{t:02}")
+                assert (value or b"") == expected and length == len(expected), t
+
+        self.assertListEqual(run_threads(16, get), [])
+
+    def test_concurrent_release(self):
+        kvs = kvs_fixture(self.kvdb, "release")
+        cursor = kvs.cursor()
+        snapshot = self.kvdb.snapshot()
+        phase = threading.Barrier(16)
+
+        # The phases follow the order the handles depend on each other, so
+        # that every thread races the others on one handle at a time
+        def release(t: int) -> None:
+            cursor.destroy()
+            phase.wait()
+            snapshot.close()
+            phase.wait()
+            kvs.close()
+
+        # Every handle is released exactly once however the threads interleave
+        self.assertListEqual(run_threads(16, release), [])
+        self.assertTrue(snapshot.closed)
+        self.kvdb.kvs_drop("release")
+
+    def test_leaks(self):
+        # Warm up caches such as interned enums
+        self.assertListEqual(run_threads(8, self.work), [])
+        self.tearDown()
+        gc.collect()
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(2):
+                self.assertListEqual(run_threads(8, lambda t: self.work(t, 50)), [])
+                self.tearDown()
+            gc.collect()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        # 800 iterations of every call, so leaking even one small object per
+        # call shows as far more than this
+        self.assertLess(after - before, 32 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import threading
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import counters, hse
+
+
+class CountersTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs", rparams=("transactions.enabled=true",))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.counters = counters.Counters(
+            self.kvdb, self.kvs, prefix=b"key", min_shards=4
+        )
+
+    def tearDown(self) -> None:
+        with self.kvdb.transaction() as txn:
+            self.kvs.prefix_delete(b"key", txn=txn)
+        return super().tearDown()
+
+    def test_increment(self):
+        self.assertEqual(self.counters.value("a"), 0)
+
+        for _ in range(20):
+            self.counters.increment("a")
+        self.counters.increment("a", -5)
+        self.counters.increment(b"ab", 7)
+
+        self.assertEqual(self.counters.value("a"), 15)
+        self.assertEqual(self.counters.value(b"ab"), 7)
+        self.assertEqual(self.counters.shards("a"), 4)
+        self.assertLessEqual(self.kvs.count(b"key"), 4 + 1)
+
+        with self.kvdb.transaction() as txn:
+            self.assertEqual(self.counters.value("a", txn=txn), 15)
+
+        self.counters.reset("a")
+        self.assertEqual(self.counters.value("a"), 0)
+        self.assertEqual(self.counters.value("ab"), 7)
+
+    def test_concurrent(self):
+        def work() -> None:
+            for _ in range(200):
+                self.counters.increment("a")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.counters.value("a"), 8 * 200)
+
+    def test_adaptation(self):
+        c = counters.Counters(
+            self.kvdb, self.kvs, max_shards=8, window=10, raise_rate=0.2
+        )
+        shards = counters._Shards(1)
+
+        for conflicts in (3, 3, 3, 3):
+            for i in range(10):
+                c._record(shards, i < conflicts)
+        self.assertEqual(shards.count, 8)
+
+        for i in range(10):
+            c._record(shards, i < 1)
+        self.assertEqual(shards.count, 8)
+
+        for _ in range(20):
+            c._record(shards, False)
+        self.assertEqual(shards.count, 2)
+
+    def test_invalid(self):
+        for kwargs in (
+            {"min_shards": 0},
+            {"min_shards": 4, "max_shards": 2},
+            {"max_shards": 1 << 16},
+            {"window": 0},
+        ):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    counters.Counters(self.kvdb, self.kvs, **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -8,6 +8,11 @@ from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
 
 from hse3 import hse
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 
 class CursorTests(HseTestCase):
     @classmethod
@@ -132,6 +137,34 @@ class CursorTests(HseTestCase):
                     and not cursor.eof
                 )
 
+    @unittest.skipIf(pyarrow is None, "requires pyarrow")
+    def test_record_batches(self):
+        self.kvs.put(b"key5", None)
+
+        with self.kvs.cursor() as cursor:
+            batches = list(cursor.record_batches(batch_size=4))
+            self.assertTrue(cursor.eof)
+        self.assertListEqual([b.num_rows for b in batches], [4, 2])
+        table = pyarrow.Table.from_batches(batches)
+        self.assertListEqual(
+            table.column("key").to_pylist(), [f"key{i}".encode() for i in range(6)]
+        )
+        self.assertListEqual(
+            table.column("value").to_pylist(),
+            [f"value{i}".encode() for i in range(5)] + [b""],
+        )
+
+        with self.kvs.cursor() as cursor:
+            batches = list(cursor.record_batches(filt_min="key1", filt_max="key3"))
+        self.assertEqual(len(batches), 1)
+        self.assertListEqual(
+            batches[0].column(0).to_pylist(), [b"key1", b"key2", b"key3"]
+        )
+
+        with self.kvs.cursor() as cursor:
+            batches = list(cursor.record_batches(batch_bytes=1))
+        self.assertListEqual([b.num_rows for b in batches], [1] * 6)
+
 
 if __name__ == "__main__":
     unittest.main(argv=UNKNOWN)
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import io
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import dump, hse
+
+
+class DumpTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.src = kvs_fixture(cls.kvdb, "src", cparams=("prefix.length=3",))
+        cls.dst = kvs_fixture(cls.kvdb, "dst", cparams=("prefix.length=3",))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.src.close()
+        cls.dst.close()
+        cls.kvdb.kvs_drop("src")
+        cls.kvdb.kvs_drop("dst")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        for i in range(100):
+            self.src.put(f"key{i:03}", f"value{i}")
+        self.src.put("abc", None)
+
+    def tearDown(self) -> None:
+        for kvs in (self.src, self.dst):
+            kvs.prefix_delete("key")
+            kvs.prefix_delete("abc")
+        return super().tearDown()
+
+    def __dump(self, **kwargs) -> io.BytesIO:
+        buf = io.BytesIO()
+        dump.dump(self.src, buf, block_size=64, **kwargs)
+        return buf
+
+    def test_round_trip(self):
+        buf = self.__dump()
+        self.assertGreater(len(dump.index(buf)), 1)
+
+        self.assertEqual(dump.load(self.dst, buf), 101)
+        with self.src.cursor() as a, self.dst.cursor() as b:
+            self.assertListEqual(list(a.items()), list(b.items()))
+
+    def test_filter(self):
+        buf = self.__dump(filt="key")
+        self.assertEqual(sum(1 for _ in dump.scan(buf)), 100)
+
+    def test_range(self):
+        buf = self.__dump()
+        keys = [k for k, _ in dump.scan(buf, filt_min="key010", filt_max="key02")]
+        self.assertListEqual(keys, [f"key{i:03}".encode() for i in range(10, 30)])
+
+        self.assertEqual(dump.load(self.dst, buf, "key090", "key099"), 10)
+        self.assertIsNone(self.dst.get("key089")[0])
+        self.assertTupleEqual(self.dst.get("key090"), (b"value90", 7))
+
+    def test_corruption(self):
+        buf = self.__dump()
+        data = bytearray(buf.getvalue())
+        data[dump.index(buf)[0].offset] ^= 0xFF
+
+        with self.assertRaises(dump.DumpFormatError):
+            list(dump.scan(io.BytesIO(bytes(data))))
+
+        with self.assertRaises(dump.DumpFormatError):
+            dump.index(io.BytesIO(b"garbage"))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
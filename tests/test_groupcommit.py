@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import errno
+import threading
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse
+from hse3.groupcommit import GroupCommit
+
+
+class _FailingKvdb:
+    def sync(self) -> None:
+        raise OSError(errno.EIO, "I/O error")
+
+
+class GroupCommitTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "group-commit")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("group-commit")
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def test_merge(self):
+        barrier = threading.Barrier(16)
+        errors = []
+
+        def writer(group: GroupCommit, i: int) -> None:
+            try:
+                barrier.wait()
+                self.kvs.put(f"key{i}", f"value{i}")
+                group.sync()
+            except BaseException as e:
+                errors.append(e)
+
+        with GroupCommit(self.kvdb, window=0.05) as group:
+            threads = [
+                threading.Thread(target=writer, args=(group, i)) for i in range(16)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertListEqual(errors, [])
+        self.assertEqual(group.requests, 16)
+        self.assertGreaterEqual(group.syncs, 1)
+        self.assertLess(group.syncs, 16)
+
+    def test_async(self):
+        with GroupCommit(self.kvdb, window=0.01) as group:
+            futures = [group.sync(flags=hse.KvdbSyncFlag.ASYNC) for _ in range(4)]
+            for future in futures:
+                assert future is not None
+                self.assertIsNone(future.result(timeout=10))
+        self.assertEqual(group.syncs, 1)
+
+    def test_max_group(self):
+        # A full group is synced without waiting out the window
+        with GroupCommit(self.kvdb, window=3600, max_group=2) as group:
+            futures = [group.sync(flags=hse.KvdbSyncFlag.ASYNC) for _ in range(2)]
+            for future in futures:
+                assert future is not None
+                future.result(timeout=10)
+
+    def test_error(self):
+        with GroupCommit(_FailingKvdb(), window=0) as group:  # type: ignore
+            with self.assertRaises(OSError) as ctx:
+                group.sync()
+            self.assertEqual(ctx.exception.errno, errno.EIO)
+
+            # The thread keeps serving requests
+            future = group.sync(flags=hse.KvdbSyncFlag.ASYNC)
+            assert future is not None
+            self.assertIsInstance(future.exception(timeout=10), OSError)
+
+    def test_lifecycle(self):
+        group = GroupCommit(self.kvdb)
+        with self.assertRaises(RuntimeError):
+            group.sync()
+
+        group.start()
+        with self.assertRaises(RuntimeError):
+            group.start()
+        future = group.sync(flags=hse.KvdbSyncFlag.ASYNC)
+        group.stop()
+        group.stop()
+        assert future is not None
+        self.assertTrue(future.done())
+
+        for kwargs in ({"window": -1}, {"max_group": 0}):
+            with self.assertRaises(ValueError):
+                GroupCommit(self.kvdb, **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
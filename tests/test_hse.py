@@ -2,6 +2,9 @@
 #
 # SPDX-FileCopyrightText: Copyright 2020 Micron Technology, Inc.
 
+import enum
+import subprocess
+import sys
 import unittest
 
 from common import UNKNOWN
@@ -19,6 +22,36 @@ class HseTests(unittest.TestCase):
                     with self.assertRaises(hse.HseException):
                         hse.param(args[0])
 
+    def test_enums_unique(self):
+        # Checked here rather than with @unique on every import
+        enums = [
+            obj
+            for obj in vars(hse).values()
+            if isinstance(obj, type) and issubclass(obj, enum.Enum)
+        ]
+        self.assertGreater(len(enums), 5)
+        for cls in enums:
+            with self.subTest(enum=cls.__name__):
+                values = [m.value for m in cls.__members__.values()]
+                self.assertEqual(len(set(values)), len(values))
+
+    def test_import_is_light(self):
+        # Startup time matters to short-lived tools, see bench_import.py
+        code = (
+            "import sys; before = set(sys.modules); import hse3.hse; "
+            "print(' '.join(set(sys.modules) - before))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        )
+        imported = set(result.stdout.split())
+        self.assertIn("hse3.hse", imported)
+        for module in ("asyncio", "pathlib", "typing"):
+            self.assertNotIn(module, imported)
+
 
 if __name__ == "__main__":
     unittest.main(argv=UNKNOWN)
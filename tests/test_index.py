@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import errno
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, index, values
+
+RPARAMS = ("transactions.enabled=true",)
+
+
+class IndexTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.users = kvs_fixture(cls.kvdb, "users", rparams=RPARAMS)
+        cls.users.codec = values.PickleCodec()
+        cls.by_email = kvs_fixture(cls.kvdb, "users.email", rparams=RPARAMS)
+        cls.by_tag = kvs_fixture(cls.kvdb, "users.tag", rparams=RPARAMS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for kvs in (cls.users, cls.by_email, cls.by_tag):
+            name = kvs.name
+            kvs.close()
+            cls.kvdb.kvs_drop(name)
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.indexed = index.IndexedKvs(
+            self.kvdb,
+            self.users,
+            email=index.Index(self.by_email, lambda u: [u["email"]], unique=True),
+            tag=index.Index(self.by_tag, lambda u: u.get("tags")),
+        )
+        self.indexed.put("u1", {"email": "a@example.com", "tags": ["x", "y"]})
+        self.indexed.put("u2", {"email": "b@example.com", "tags": ["y"]})
+        self.indexed.put("u3", {"email": "c@example.com"})
+
+    def tearDown(self) -> None:
+        for key in ("u1", "u2", "u3", "u4", "u5"):
+            self.indexed.delete(key)
+        return super().tearDown()
+
+    def entries(self, kvs: hse.Kvs):
+        with self.kvdb.transaction() as txn:
+            with kvs.cursor(txn=txn) as cursor:
+                return [k for k, _ in cursor.items()]
+
+    def test_lookup(self):
+        self.assertListEqual(
+            self.indexed.lookup("email", "b@example.com"),
+            [(b"u2", {"email": "b@example.com", "tags": ["y"]})],
+        )
+        self.assertListEqual(
+            [k for k, _ in self.indexed.lookup("tag", "y")], [b"u1", b"u2"]
+        )
+        self.assertListEqual(
+            [k for k, _ in self.indexed.lookup_many("tag", ["y", "x", "z"])],
+            [b"u1", b"u2"],
+        )
+        self.assertListEqual(self.indexed.lookup("tag", "z"), [])
+        self.assertListEqual(
+            list(self.indexed.primary_keys("tag", ["x", "y"])), [b"u1", b"u1", b"u2"]
+        )
+
+    def test_update(self):
+        self.indexed.put("u1", {"email": "d@example.com", "tags": ["z"]})
+        self.assertListEqual(self.indexed.lookup("email", "a@example.com"), [])
+        self.assertListEqual([k for k, _ in self.indexed.lookup("tag", "y")], [b"u2"])
+        self.assertListEqual([k for k, _ in self.indexed.lookup("tag", "z")], [b"u1"])
+        self.assertEqual(len(self.entries(self.by_tag)), 2)
+
+    def test_delete(self):
+        self.indexed.delete("u1")
+        self.assertIsNone(self.indexed.get("u1"))
+        self.assertEqual(len(self.entries(self.by_email)), 2)
+        self.assertEqual(len(self.entries(self.by_tag)), 1)
+
+    def test_unique(self):
+        with self.assertRaises(index.IndexConflictError):
+            self.indexed.put("u4", {"email": "a@example.com"})
+        self.assertIsNone(self.indexed.get("u4"))
+        self.assertEqual(len(self.entries(self.by_email)), 3)
+
+    def test_unique_concurrent(self):
+        # Neither transaction sees the other's claim, so both pass the check
+        # and HSE catches the conflict when the second writes the same entry
+        with self.kvdb.transaction() as txn1, self.kvdb.transaction() as txn2:
+            self.indexed.put("u4", {"email": "e@example.com"}, txn=txn1)
+            with self.assertRaises(hse.HseException) as ctx:
+                self.indexed.put("u5", {"email": "e@example.com"}, txn=txn2)
+            self.assertEqual(ctx.exception.returncode, errno.ECANCELED)
+            txn2.abort()
+            txn1.commit()
+
+        self.assertListEqual(
+            [k for k, _ in self.indexed.lookup("email", "e@example.com")], [b"u4"]
+        )
+        self.assertIsNone(self.indexed.get("u5"))
+
+    def test_shared_transaction(self):
+        with self.kvdb.transaction() as txn:
+            self.indexed.put("u4", {"email": "e@example.com"}, txn=txn)
+            self.assertEqual(
+                len(self.indexed.lookup("email", "e@example.com", txn=txn)), 1
+            )
+            self.assertListEqual(self.indexed.lookup("email", "e@example.com"), [])
+            txn.abort()
+        self.assertListEqual(self.indexed.lookup("email", "e@example.com"), [])
+
+    def test_rebuild(self):
+        self.assertEqual(self.indexed.rebuild("tag"), 3)
+        self.assertListEqual(
+            [k for k, _ in self.indexed.lookup("tag", "y")], [b"u1", b"u2"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
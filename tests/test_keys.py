@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import datetime
+import random
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, keys, limits
+
+
+class KeyCodecTests(unittest.TestCase):
+    def assertOrderPreserved(self, codec: keys.KeyCodec, values) -> None:
+        encoded = sorted((codec.encode(*v), v) for v in values)
+        self.assertListEqual([v for _, v in encoded], sorted(values))
+        for key, value in encoded:
+            self.assertTupleEqual(codec.decode(key), value)
+
+    def test_abstract_segment(self):
+        with self.assertRaises(TypeError):
+            keys.Segment()
+        self.assertIsInstance(keys.UInt(), keys.Segment)
+
+    def test_integers(self):
+        rng = random.Random(0)
+        codec = keys.KeyCodec(keys.UInt(2), keys.Int(4))
+        values = [
+            (rng.randrange(1 << 16), rng.randrange(-(1 << 31), 1 << 31))
+            for _ in range(1000)
+        ]
+        self.assertOrderPreserved(codec, values)
+        self.assertEqual(len(codec.encode(1, -1)), 6)
+
+        with self.assertRaises(OverflowError):
+            codec.encode(1 << 16, 0)
+        with self.assertRaises(OverflowError):
+            codec.encode(0, 1 << 31)
+
+    def test_floats(self):
+        rng = random.Random(0)
+        codec = keys.KeyCodec(keys.Float())
+        values = [(rng.uniform(-1e9, 1e9),) for _ in range(1000)]
+        values += [(0.0,), (float("inf"),), (float("-inf"),), (5e-324,)]
+        self.assertOrderPreserved(codec, values)
+
+    def test_timestamps(self):
+        codec = keys.KeyCodec(keys.Timestamp())
+        utc = datetime.timezone.utc
+        values = [
+            (datetime.datetime(1969, 7, 20, 20, 17, tzinfo=utc),),
+            (datetime.datetime(1970, 1, 1, tzinfo=utc),),
+            (datetime.datetime(2022, 2, 2, 2, 2, 2, 2, tzinfo=utc),),
+        ]
+        self.assertOrderPreserved(codec, values)
+        self.assertEqual(
+            codec.encode(datetime.datetime(2022, 1, 1)),
+            codec.encode(datetime.datetime(2022, 1, 1, tzinfo=utc)),
+        )
+
+    def test_variable_length(self):
+        codec = keys.KeyCodec(keys.Bytes(), keys.Str(), keys.UInt(1))
+        values = [
+            (b"", "", 0),
+            (b"a", "b", 1),
+            (b"a", "b", 255),
+            (b"a\x00", "", 0),
+            (b"a\x00\x00", "\x00", 2),
+            (b"a\xff", "z", 0),
+            (b"ab", "é", 0),
+        ]
+        self.assertOrderPreserved(codec, values)
+
+        with self.assertRaises(ValueError):
+            codec.decode(codec.encode(b"a", "b", 1)[:-2])
+        with self.assertRaises(ValueError):
+            codec.encode(b"a" * limits.KVS_KEY_LEN_MAX, "", 0)
+
+    def test_fixed_width(self):
+        codec = keys.KeyCodec(keys.Str(4), keys.Bytes(2))
+        self.assertEqual(codec.encode("ab", b"c"), b"ab\x00\x00c\x00")
+        self.assertTupleEqual(codec.decode(b"ab\x00\x00c\x00"), ("ab", b"c"))
+
+        with self.assertRaises(ValueError):
+            codec.encode("abcde", b"")
+
+        # NUL bytes round-trip unless they would be mistaken for padding
+        for value in ("a\x00b", ""):
+            self.assertTupleEqual(
+                codec.decode(codec.encode(value, b"\x00a")), (value, b"\x00a")
+            )
+        with self.assertRaises(ValueError):
+            codec.encode("", b"a\x00")
+        with self.assertRaises(ValueError):
+            codec.encode("a\x00", b"")
+
+    def test_prefix_length(self):
+        codec = keys.KeyCodec(keys.UInt(4), keys.Str(8), keys.Bytes())
+        self.assertEqual(codec.prefix_length(), 4)
+        self.assertEqual(codec.prefix_length(2), 12)
+
+        with self.assertRaises(ValueError):
+            codec.prefix_length(3)
+
+        wide = keys.KeyCodec(keys.Bytes(limits.KVS_PFX_LEN_MAX + 1))
+        with self.assertRaises(ValueError):
+            wide.prefix_length()
+
+
+class KeyCodecKvsTests(HseTestCase):
+    codec = keys.KeyCodec(keys.UInt(4), keys.Str(), keys.UInt(4))
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(
+            cls.kvdb,
+            "kvs",
+            cparams=(f"prefix.length={cls.codec.prefix_length()}",),
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def test_prefix_filter(self):
+        for tenant in (1, 2):
+            for name in ("a", "ab"):
+                for i in (10, 9, 256):
+                    self.kvs.put(self.codec.encode(tenant, name, i), b"")
+
+        with self.kvs.cursor(self.codec.prefix(1, "a")) as cursor:
+            found = [self.codec.decode(k) for k, _ in cursor.items()]
+        self.assertListEqual(found, [(1, "a", 9), (1, "a", 10), (1, "a", 256)])
+
+        self.kvs.prefix_delete(self.codec.prefix(1))
+        with self.kvs.cursor() as cursor:
+            found = [self.codec.decode(k)[0] for k, _ in cursor.items()]
+        self.assertListEqual(found, [2] * 6)
+
+        self.kvs.prefix_delete(self.codec.prefix(2))
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
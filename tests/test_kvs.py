@@ -9,6 +9,11 @@ from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
 
 from hse3 import hse
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class Key(SupportsBytes):
     def __init__(self, key: str) -> None:
@@ -60,6 +65,59 @@ class KvsTests(HseTestCase):
                 self.kvs.delete(key)
                 self.assertTupleEqual(self.kvs.get(key), (None, 0))
 
+    def test_get_into(self):
+        self.kvs.put("key1", "value")
+
+        buf = bytearray(8)
+        self.assertEqual(self.kvs.get_into("key1", buf), 5)
+        self.assertEqual(buf[:5], b"value")
+
+        # Truncated values still report their full length
+        view = memoryview(buf)[6:]
+        self.assertEqual(self.kvs.get_into("key1", view), 5)
+        self.assertEqual(buf[6:], b"va")
+        self.assertEqual(self.kvs.get_into("key1", bytearray()), 5)
+
+        self.assertIsNone(self.kvs.get_into("key2", buf))
+        with self.assertRaises(BufferError):
+            self.kvs.get_into("key1", b"readonly")  # type: ignore
+
+        self.kvs.delete("key1")
+
+    def test_put_memoryview(self):
+        self.kvs.put("key1", memoryview(b"value"))
+        self.assertEqual(self.kvs.get("key1")[0], b"value")
+
+        # Strided views are copied, not read as if contiguous
+        self.kvs.put("key1", memoryview(b"abcdef")[::2])
+        self.assertEqual(self.kvs.get("key1")[0], b"ace")
+
+        self.kvs.delete("key1")
+
+    def test_aggregates(self):
+        for i in range(10):
+            self.kvs.put(f"key{i}", b"v" * i)
+        self.kvs.put("abc1", b"value")
+
+        try:
+            self.assertEqual(self.kvs.count("key"), 10)
+            self.assertEqual(self.kvs.count(b"key"), 10)
+            self.assertEqual(self.kvs.count(), 11)
+            self.assertEqual(self.kvs.count("xyz"), 0)
+
+            self.assertEqual(self.kvs.size("key"), 10 * 4 + sum(range(10)))
+            self.assertEqual(self.kvs.size("xyz"), 0)
+
+            self.assertEqual(self.kvs.first("key"), b"key0")
+            self.assertEqual(self.kvs.last("key"), b"key9")
+            self.assertEqual(self.kvs.first(), b"abc1")
+            self.assertEqual(self.kvs.last(), b"key9")
+            self.assertIsNone(self.kvs.first("xyz"))
+            self.assertIsNone(self.kvs.last("xyz"))
+        finally:
+            self.kvs.prefix_delete("key")
+            self.kvs.prefix_delete("abc")
+
     def test_prefix_delete(self):
         for pfx in ("key", b"key"):
             with self.subTest(type=type(pfx)):
@@ -132,6 +190,42 @@ class KvsTests(HseTestCase):
     def test_name(self):
         assert self.kvs.name == "kvs"
 
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_arrays(self):
+        keys = numpy.array([3, 1, 1 << 40], dtype=numpy.uint64)
+        values = numpy.arange(12, dtype=numpy.float32).reshape(3, 4)
+        self.kvs.put_array(keys, values)
+
+        try:
+            with self.kvs.cursor() as cursor:
+                found = [k for k, _ in cursor.items()]
+            self.assertListEqual(
+                found, [int(k).to_bytes(8, "big") for k in (1, 3, 1 << 40)]
+            )
+
+            out, found = self.kvs.get_array(
+                numpy.array([1, 3, 5, 1 << 40]), dtype=numpy.float32, shape=(4,)
+            )
+            self.assertListEqual(found.tolist(), [True, True, False, True])
+            self.assertTrue((out[[0, 1, 3]] == values[[1, 0, 2]]).all())
+            self.assertTrue((out[2] == 0).all())
+
+            out = numpy.full((2, 4), -1, dtype=numpy.float32)
+            self.assertIs(self.kvs.get_array(numpy.array([1, 7]), out=out)[0], out)
+            self.assertListEqual(out[1].tolist(), [-1] * 4)
+
+            with self.assertRaises(ValueError):
+                self.kvs.get_array(keys, dtype=numpy.float32, shape=(2,))
+            with self.assertRaises(ValueError):
+                self.kvs.put_array(numpy.array([-1]), values[:1])
+            with self.assertRaises(ValueError):
+                self.kvs.put_array(keys, values[:2])
+            with self.assertRaises(TypeError):
+                self.kvs.put_array(numpy.array([1.0]), values[:1])
+        finally:
+            for k in keys.tolist():
+                self.kvs.delete(int(k).to_bytes(8, "big"))
+
 
 if __name__ == "__main__":
     unittest.main(argv=UNKNOWN)
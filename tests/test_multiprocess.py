@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import os
+import sys
+import unittest
+from typing import Callable
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse
+from hse3.multiprocess import KvdbServer
+
+
+def run_child(fn: Callable[[], bool]) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = 0 if fn() else 1
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+@unittest.skipIf(sys.version_info < (3, 9), "requires shared memory and waitstatus")
+class MultiprocessTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.server = KvdbServer(
+            ARGS.home,
+            ["kvs", "other"],
+            config=ARGS.config,
+            init_params=("rest.enabled=false",),
+            create=True,
+        )
+        cls.client = cls.server.connect()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.client.close()
+        cls.server.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def tearDown(self) -> None:
+        self.client.prefix_delete("kvs", "key")
+        self.client.prefix_delete("other", "key")
+        return super().tearDown()
+
+    def test_round_trip(self):
+        self.client.put("kvs", "key1", b"value1")
+        self.client.put("kvs", b"key2", memoryview(b"value2"))
+
+        self.assertEqual(self.client.get("kvs", "key1"), b"value1")
+        self.assertEqual(bytes(self.client.get_view("kvs", "key2")), b"value2")
+        self.assertIsNone(self.client.get("other", "key1"))
+        self.assertIsNone(self.client.get_view("kvs", "key3"))
+
+        self.client.delete("kvs", "key1")
+        self.assertIsNone(self.client.get("kvs", "key1"))
+
+        self.client.prefix_delete("kvs", "key")
+        self.assertIsNone(self.client.get("kvs", "key2"))
+
+    def test_large_value(self):
+        value = bytes(range(256)) * 4096
+        self.client.put("kvs", "key1", value)
+        self.assertEqual(self.client.get("kvs", "key1"), value)
+
+    def test_get_many(self):
+        values = {f"key{i:02}": bytes([i]) * (i * 100) for i in range(40)}
+        for key, value in values.items():
+            self.client.put("kvs", key, value)
+        keys = [*values, "key99"]
+        expected = [*values.values(), None]
+
+        self.assertListEqual(self.client.get_many("kvs", keys), expected)
+        views = self.client.get_many_views("kvs", keys)
+        self.assertListEqual([v if v is None else bytes(v) for v in views], expected)
+        self.assertListEqual(self.client.get_many("kvs", []), [])
+
+        # A small segment needs several round trips, and one to itself for a
+        # value which only fits in the whole value area
+        self.client.put("kvs", "key50", b"x" * 5000)
+        with self.server.connect(size=5376) as client:
+            self.assertListEqual(
+                client.get_many("kvs", [*keys, "key50"]), [*expected, b"x" * 5000]
+            )
+            with self.assertRaises(ValueError):
+                client.get_many_views("kvs", keys)
+
+            self.client.put("kvs", "key51", b"x" * 6000)
+            with self.assertRaises(ValueError):
+                client.get("kvs", "key51")
+
+    def test_errors(self):
+        with self.assertRaises(hse.HseException):
+            self.client.put("kvs", b"", b"value")
+        with self.assertRaises(KeyError):
+            self.client.get("missing", "key1")
+
+        # The connection is still usable
+        self.client.put("kvs", "key1", b"value1")
+        self.assertEqual(self.client.get("kvs", "key1"), b"value1")
+
+    def test_forked_worker(self):
+        def worker() -> bool:
+            with self.server.connect() as client:
+                client.put("kvs", "key1", b"from worker")
+                return client.get("kvs", "key1") == b"from worker"
+
+        self.assertEqual(run_child(worker), 0)
+        self.assertEqual(self.client.get("kvs", "key1"), b"from worker")
+
+    def test_close_connected(self):
+        # The owner stops serving connected clients before closing the KVDB
+        home = ARGS.home / "close"
+        home.mkdir(exist_ok=True)
+        server = KvdbServer(
+            home,
+            ["kvs"],
+            config=ARGS.config,
+            init_params=("rest.enabled=false",),
+            create=True,
+        )
+        try:
+            with server.connect() as client:
+                client.put("kvs", "key1", b"value1")
+                server.close()
+                self.assertEqual(server._process.exitcode, 0)
+        finally:
+            server.close()
+            hse.Kvdb.drop(home)
+
+    def test_fork_safety(self):
+        home = ARGS.home / "fork"
+        home.mkdir(exist_ok=True)
+        kvdb = kvdb_fixture(home)
+        kvs = kvs_fixture(kvdb, "kvs")
+        cursor = kvs.cursor()
+
+        def child() -> bool:
+            # Inherited handles are disowned rather than used
+            try:
+                kvs.put(b"key1", b"value1")
+                return False
+            except hse.HseException:
+                pass
+            try:
+                cursor.read()
+                return False
+            except RuntimeError:
+                pass
+            cursor.destroy()
+
+            for fn in (lambda: hse.init(ARGS.config), lambda: hse.Kvdb.open(home)):
+                try:
+                    fn()
+                    return False
+                except RuntimeError:
+                    pass
+
+            hse.fini()
+            return True
+
+        try:
+            self.assertEqual(run_child(child), 0)
+
+            # The parent's handles are unaffected
+            kvs.put(b"key1", b"value1")
+            self.assertEqual(kvs.get(b"key1")[0], b"value1")
+        finally:
+            cursor.destroy()
+            kvs.close()
+            kvdb.kvs_drop("kvs")
+            kvdb.close()
+            hse.Kvdb.drop(home)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse
+from hse3.pagination import Paginator, page
+
+
+class PaginationTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+
+        cls.keys = [f"key{i:02}".encode() for i in range(25)]
+        for key in cls.keys:
+            cls.kvs.put(key, key.upper())
+        cls.kvs.put("other", "value")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def test_forward_and_back(self):
+        with Paginator(self.kvs, "key", limit=10) as paginator:
+            pages = [paginator.page()]
+            while pages[-1].next is not None:
+                pages.append(paginator.page(pages[-1].next))
+
+            self.assertListEqual([len(p.items) for p in pages], [10, 10, 5])
+            self.assertListEqual([k for p in pages for k, _ in p.items], self.keys)
+            self.assertEqual(pages[0].items[0], (b"key00", b"KEY00"))
+            self.assertIsNone(pages[0].prev)
+
+            # Walk back from the last page
+            back = [pages[-1]]
+            while back[-1].prev is not None:
+                back.append(paginator.page(back[-1].prev))
+            self.assertListEqual(
+                [p.items for p in back[1:]], [p.items for p in pages[1::-1]]
+            )
+
+            # Forward again from a page reached backwards
+            self.assertListEqual(paginator.page(back[-1].next).items, pages[1].items)
+
+    def test_unprefixed(self):
+        first = page(self.kvs, limit=20)
+        second = page(self.kvs, first.next, limit=20)
+        self.assertEqual(len(first.items), 20)
+        self.assertListEqual([k for k, _ in second.items], [*self.keys[20:], b"other"])
+        self.assertIsNone(second.next)
+
+    def test_writes_between_pages(self):
+        first = page(self.kvs, prefix="key", limit=10)
+        self.kvs.delete(b"key10")
+        try:
+            self.kvs.put(b"key095", b"new")
+            second = page(self.kvs, first.next, prefix="key", limit=10)
+            self.assertEqual(second.items[0][0], b"key095")
+            self.assertNotIn(b"key10", [k for k, _ in second.items])
+        finally:
+            self.kvs.delete(b"key095")
+            self.kvs.put(b"key10", b"KEY10")
+
+    def test_empty(self):
+        result = page(self.kvs, prefix="xyz")
+        self.assertListEqual(result.items, [])
+        self.assertIsNone(result.next)
+        self.assertIsNone(result.prev)
+
+    def test_invalid_tokens(self):
+        token = page(self.kvs, prefix="key", limit=10).next
+        for bad in ("", "!!!!", "AAAA"):
+            with self.subTest(token=bad):
+                with self.assertRaises(ValueError):
+                    page(self.kvs, bad, prefix="key")
+        with self.assertRaises(ValueError):
+            page(self.kvs, token, prefix="oth")
+        with self.assertRaises(ValueError):
+            Paginator(self.kvs, limit=0)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
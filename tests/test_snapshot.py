@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse
+
+RPARAMS = ("transactions.enabled=true",)
+
+
+class SnapshotTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs1 = kvs_fixture(cls.kvdb, "kvs1", rparams=RPARAMS)
+        cls.kvs2 = kvs_fixture(cls.kvdb, "kvs2", rparams=RPARAMS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for kvs in (cls.kvs1, cls.kvs2):
+            name = kvs.name
+            kvs.close()
+            cls.kvdb.kvs_drop(name)
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def put(self, kvs: hse.Kvs, key: str, value: str) -> None:
+        with self.kvdb.transaction() as txn:
+            kvs.put(key, value, txn=txn)
+
+    def setUp(self) -> None:
+        super().setUp()
+        for i in range(3):
+            self.put(self.kvs1, f"key{i}", f"a{i}")
+            self.put(self.kvs2, f"key{i}", f"b{i}")
+
+    def tearDown(self) -> None:
+        with self.kvdb.transaction() as txn:
+            self.kvs1.prefix_delete("key", txn=txn)
+            self.kvs2.prefix_delete("key", txn=txn)
+        return super().tearDown()
+
+    def test_point_in_time(self):
+        with self.kvdb.snapshot() as snap:
+            self.put(self.kvs1, "key0", "changed")
+            self.put(self.kvs2, "key3", "b3")
+
+            self.assertEqual(snap.get(self.kvs1, "key0"), b"a0")
+            self.assertListEqual(
+                snap.get_many(self.kvs2, ["key0", "key3", "key2"]), [b"b0", None, b"b2"]
+            )
+            self.assertListEqual(
+                [k for k, _ in snap.cursor(self.kvs2).items()],
+                [b"key0", b"key1", b"key2"],
+            )
+
+        self.assertTrue(snap.closed)
+        with self.assertRaises(ValueError):
+            snap.get(self.kvs1, "key0")
+
+    def test_cursor_reuse(self):
+        with self.kvdb.snapshot() as snap:
+            cursor = snap.cursor(self.kvs1, "key1")
+            self.assertListEqual([k for k, _ in cursor.items()], [b"key1", b"key2"])
+            self.assertTrue(cursor.eof)
+
+            again = snap.cursor(self.kvs1, "key0", "key1")
+            self.assertIs(again, cursor)
+            self.assertListEqual(
+                list(again.items()), [(b"key0", b"a0"), (b"key1", b"a1")]
+            )
+
+    def test_cursor_in_use(self):
+        with self.kvdb.snapshot() as snap:
+            cursor = snap.cursor(self.kvs1)
+            self.assertTupleEqual(cursor.read(), (b"key0", b"a0"))
+
+            # The scan in progress is not moved by a second caller
+            with self.assertRaises(RuntimeError):
+                snap.cursor(self.kvs1, "key2")
+            self.assertTupleEqual(cursor.read(), (b"key1", b"a1"))
+
+            cursor.destroy()
+            again = snap.cursor(self.kvs1, "key2")
+            self.assertIsNot(again, cursor)
+            self.assertListEqual([k for k, _ in again.items()], [b"key2"])
+
+    def test_cursor_with(self):
+        with self.kvdb.snapshot() as snap:
+            self.put(self.kvs1, "key3", "a3")
+            for _ in range(2):
+                with snap.cursor(self.kvs1, "key1") as cursor:
+                    self.assertListEqual(
+                        [k for k, _ in cursor.items()], [b"key1", b"key2"]
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import threading
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, limits, tail, values
+
+
+class TailTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        cls.kvs = kvs_fixture(cls.kvdb, "kvs")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        for i in range(3):
+            self.kvs.put(f"key{i:02}", f"value{i}")
+
+    def tearDown(self) -> None:
+        self.kvs.codec = None
+        self.kvs.prefix_delete("key")
+        return super().tearDown()
+
+    def test_writes(self):
+        writes = self.kvs.writes
+        self.kvs.put("key99", None)
+        self.kvs.delete("key99")
+        self.kvs.prefix_delete("key9")
+        self.assertEqual(self.kvs.writes, writes + 3)
+
+    def test_poll(self):
+        with tail.Tail(self.kvs, filt="key") as t:
+            self.assertListEqual(
+                [k for k, _ in t.poll()], [b"key00", b"key01", b"key02"]
+            )
+            self.assertListEqual(t.poll(), [])
+
+            self.kvs.put("key04", "value4")
+            self.kvs.put("key03", "value3")
+            self.kvs.put("key01", "changed")
+            self.assertListEqual(
+                t.poll(), [(b"key03", b"value3"), (b"key04", b"value4")]
+            )
+            self.assertEqual(t.last_key, b"key04")
+
+        self.assertTrue(t.closed)
+        with self.assertRaises(ValueError):
+            t.poll()
+
+    def test_limit(self):
+        with tail.Tail(self.kvs, filt="key") as t:
+            self.assertListEqual([k for k, _ in t.poll(limit=2)], [b"key00", b"key01"])
+            self.assertListEqual([k for k, _ in t.poll(limit=2)], [b"key02"])
+            self.assertListEqual(t.poll(limit=2), [])
+            with self.assertRaises(ValueError):
+                t.poll(limit=0)
+
+    def test_max_key_length(self):
+        longest = b"key" + b"\xff" * (limits.KVS_KEY_LEN_MAX - 3)
+        self.kvs.put(longest, "value")
+        with tail.Tail(self.kvs, after=longest) as t:
+            self.assertListEqual(t.poll(), [])
+        with tail.Tail(self.kvs, after="key02") as t:
+            self.assertListEqual(t.poll(), [(longest, b"value")])
+            self.assertListEqual(t.poll(), [])
+
+    def test_after(self):
+        self.kvs.codec = values.StrCodec()
+        with tail.Tail(self.kvs, after="key01") as t:
+            self.assertListEqual(t.poll(), [(b"key02", "value2")])
+
+    def test_follow(self):
+        def writer():
+            for i in range(3, 10):
+                self.kvs.put(f"key{i:02}", f"value{i}")
+
+        with tail.Tail(self.kvs, after="key02", interval=60) as t:
+            thread = threading.Thread(target=writer)
+            thread.start()
+            # Local writes wake the tail long before the interval passes
+            keys = [k for k, _ in t.follow(idle_timeout=1)]
+            thread.join()
+
+        self.assertListEqual(keys, [f"key{i:02}".encode() for i in range(3, 10)])
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import threading
+import time
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, values
+from hse3.tiering import HeatTracker, Migration, TieredKvs
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _items(kvs: hse.Kvs):
+    items = {}
+    with kvs.cursor() as cursor:
+        while True:
+            key, value = cursor.read()
+            if cursor.eof:
+                return items
+            items[key] = value
+
+
+class TieringTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.source = kvs_fixture(self.kvdb, "source", cparams=("prefix.length=3",))
+
+    def tearDown(self) -> None:
+        self.source.close()
+        for name in self.kvdb.kvs_names:
+            self.kvdb.kvs_drop(name)
+        return super().tearDown()
+
+    def test_heat(self):
+        clock = Clock()
+        other = kvs_fixture(self.kvdb, "other")
+        try:
+            with HeatTracker(half_life=10, clock=clock) as tracker:
+                tiered = TieredKvs(self.source, tracker=tracker)
+                for i in range(4):
+                    tiered.put(f"key{i}", "value")
+                other.put("key", "value")
+                self.assertEqual(tiered.get("key1"), (b"value", 5))
+                self.assertEqual(tracker.heat(), {"source": 5, "other": 1})
+
+                clock.now += 10
+                tracker.read("other", 4)
+                self.assertEqual(tracker.heat(), {"source": 2.5, "other": 4.5})
+                self.assertListEqual(tracker.hottest(2), ["other", "source"])
+
+            # Unregistered
+            other.put("key", "value")
+            self.assertEqual(tracker.heat()["other"], 4.5)
+        finally:
+            other.close()
+
+    def test_migrate(self):
+        for i in range(100):
+            self.source.put(f"key{i:03}", f"value{i}")
+        tiered = TieredKvs(self.source)
+
+        stop = threading.Event()
+        written = []
+
+        def writer() -> None:
+            # Paced, since the migration only catches up with writes slower
+            # than it copies
+            for i in range(200):
+                if stop.is_set():
+                    break
+                tiered.put(f"new{i:05}", "value")
+                tiered.delete(f"key{i % 100:03}")
+                written.append(i)
+                time.sleep(0.0005)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            migration = Migration(
+                self.kvdb, tiered, "target", mclass=hse.Mclass.CAPACITY, batch=8
+            )
+            source = migration.run()
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertIs(source, self.source)
+        target = tiered.kvs
+        try:
+            self.assertEqual(target.name, "target")
+            self.assertEqual(target.param("prefix.length"), "3")
+            self.assertGreaterEqual(migration.copied, 1)
+
+            expected = {f"key{i:03}".encode(): f"value{i}".encode() for i in range(100)}
+            for i in written:
+                expected[f"new{i:05}".encode()] = b"value"
+                expected.pop(f"key{i % 100:03}".encode(), None)
+            self.assertDictEqual(_items(target), expected)
+            self.assertEqual(tiered.get("key099")[0], expected.get(b"key099"))
+        finally:
+            target.close()
+
+    def test_replay_order(self):
+        self.source.put("key1", "new")
+        self.source.put("key2", "value")
+        self.source.put("pfx1", "value")
+        tiered = TieredKvs(self.source)
+        migration = Migration(
+            self.kvdb, tiered, "target", mclass=hse.Mclass.CAPACITY, batch=8
+        )
+        target = migration._open(self.source)
+        try:
+            # Events recorded out of order, and a delete which a later put
+            # has overtaken, still leave the target equal to the source
+            migration._events.extend(
+                [
+                    hse.ChangeEvent(hse.ChangeOp.PUT, self.source, b"key1", b"new"),
+                    hse.ChangeEvent(hse.ChangeOp.PUT, self.source, b"key1", b"old"),
+                    hse.ChangeEvent(hse.ChangeOp.DELETE, self.source, b"key2", None),
+                    hse.ChangeEvent(hse.ChangeOp.DELETE, self.source, b"key3", None),
+                    hse.ChangeEvent(
+                        hse.ChangeOp.PREFIX_DELETE, self.source, b"pfx", None
+                    ),
+                ]
+            )
+            target.put("key3", "stale")
+            target.put("pfx2", "stale")
+            migration._replay(self.source, target, float("inf"))
+
+            self.assertDictEqual(_items(target), _items(self.source))
+            self.assertEqual(migration.replayed, 5)
+        finally:
+            target.close()
+
+    def test_replay_codec(self):
+        class MetaCodec(values.PickleCodec):
+            reserved_prefix = b"pfx0"
+
+        self.source.codec = MetaCodec()
+        self.source.put("pfx0meta", b"\xffnot a pickle")
+        self.source.put_obj("pfx1", {"a": 1})
+        tiered = TieredKvs(self.source)
+        migration = Migration(
+            self.kvdb, tiered, "target", mclass=hse.Mclass.CAPACITY, batch=8
+        )
+        target = migration._open(self.source)
+        try:
+            # Entries under a prefix delete are copied as stored, including
+            # the codec's own metadata
+            migration._events.append(
+                hse.ChangeEvent(hse.ChangeOp.PREFIX_DELETE, self.source, b"pfx", None)
+            )
+            migration._replay(self.source, target, float("inf"))
+
+            self.assertDictEqual(_items(target), _items(self.source))
+            self.assertDictEqual(target.get_obj("pfx1"), {"a": 1})
+        finally:
+            target.close()
+
+    def test_unconfigured(self):
+        tiered = TieredKvs(self.source)
+        with self.assertRaises(ValueError):
+            Migration(self.kvdb, tiered, "target", mclass=hse.Mclass.STAGING).run()
+        self.assertNotIn("target", self.kvdb.kvs_names)
+        self.assertIs(tiered.kvs, self.source)
+
+        with self.assertRaises(ValueError):
+            Migration(self.kvdb, tiered, "target", batch=0)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import time
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, ttl
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TtlTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Prefix deletes must match the prefix length, so every test starts
+        # from a new KVS rather than deleting the entries of the last one
+        self.kvs = kvs_fixture(
+            self.kvdb, "kvs", cparams=(f"prefix.length={ttl.PREFIX_LENGTH}",)
+        )
+        self.clock = Clock()
+        self.store = ttl.TtlStore(self.kvs, bucket=10, clock=self.clock)
+
+    def tearDown(self) -> None:
+        self.kvs.close()
+        self.kvdb.kvs_drop("kvs")
+        return super().tearDown()
+
+    def test_prefix_length(self):
+        kvs = kvs_fixture(self.kvdb, "short", cparams=("prefix.length=1",))
+        try:
+            with self.assertRaises(ValueError):
+                ttl.TtlStore(kvs)
+        finally:
+            kvs.close()
+            self.kvdb.kvs_drop("short")
+
+    def test_expiry(self):
+        self.store.put("key1", "value1", ttl=5)
+        self.store.put(b"key2", b"value2", ttl=25)
+        self.assertEqual(self.store.get("key1"), b"value1")
+        self.assertEqual(self.store.ttl("key1"), 5)
+        self.assertIsNone(self.store.get("key3"))
+        self.assertIsNone(self.store.ttl("key3"))
+
+        # Expired entries are hidden before their bucket is deleted
+        self.clock.now += 5
+        self.assertIsNone(self.store.get("key1"))
+        self.assertIsNone(self.store.ttl("key1"))
+        self.assertEqual(self.store.get("key2"), b"value2")
+        self.assertEqual(self.kvs.count(b"T"), 2)
+        self.assertEqual(self.store.expire(), 0)
+
+        # The bucket of key1 ends 10 seconds in
+        self.clock.now += 5
+        self.assertEqual(self.store.expire(), 1)
+        self.assertEqual(self.store.expire(), 0)
+        self.assertEqual(self.kvs.count(b"T"), 1)
+        self.assertEqual(self.store.get("key2"), b"value2")
+
+        self.assertEqual(self.store.vacuum(), 1)
+        self.assertEqual(self.kvs.count(b"L"), 1)
+
+        self.assertEqual(self.store.expire(now=self.clock.now + 100), 1)
+        self.assertIsNone(self.store.get("key2"))
+        self.assertEqual(self.kvs.count(b"T"), 0)
+
+    def test_overwrite(self):
+        self.store.put("key1", "value1", ttl=5)
+        self.store.put("key1", "value2", ttl=50)
+        self.assertEqual(self.kvs.count(b"T"), 1)
+
+        self.clock.now += 20
+        self.assertEqual(self.store.expire(), 0)
+        self.assertEqual(self.store.vacuum(), 0)
+        self.assertEqual(self.store.get("key1"), b"value2")
+
+        self.store.delete("key1")
+        self.store.delete("key1")
+        self.assertIsNone(self.store.get("key1"))
+        self.assertEqual(self.kvs.count(), 0)
+
+    def test_many_buckets(self):
+        for i in range(100):
+            self.store.put(f"key{i:03}", b"value", ttl=i)
+
+        self.clock.now += 50
+        # Buckets ending at 1010, 1020, ..., 1050 seconds, and the bucket of
+        # the entry expiring right away
+        self.assertEqual(self.store.expire(), 6)
+        self.assertEqual(self.store.vacuum(), 51)
+        for i in range(100):
+            self.assertEqual(self.store.get(f"key{i:03}") is not None, i > 50)
+        self.assertEqual(self.kvs.count(b"T"), 49)
+
+    def test_sweeper(self):
+        self.store.put("key1", "value1", ttl=1)
+        self.clock.now += 10
+
+        with ttl.Sweeper(self.store, interval=0.01, vacuum_every=1) as sweeper:
+            deadline = time.monotonic() + 10
+            while self.kvs.count() > 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertGreater(sweeper.sweeps, 0)
+        self.assertEqual(self.kvs.count(), 0)
+
+        sweeper.stop()
+        with self.assertRaises(ValueError):
+            ttl.Sweeper(self.store, vacuum_every=0)
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import os
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase
+
+from hse3 import tune
+
+KVDB_PARAMS = {"durability.interval_ms": ["10", "100"]}
+KVS_PARAMS = {"transactions.enabled": ["false", "true"]}
+
+
+class TuneTests(HseTestCase):
+    def test_grid(self):
+        configs = tune.grid(KVDB_PARAMS, KVS_PARAMS)
+        self.assertEqual(len(configs), 4)
+        self.assertEqual(
+            configs[1],
+            tune.Config(("durability.interval_ms=10",), ("transactions.enabled=true",)),
+        )
+        self.assertListEqual(tune.grid(), [tune.Config()])
+
+    def test_sample(self):
+        kvdb = {"a": [str(i) for i in range(100)], "b": [str(i) for i in range(100)]}
+
+        configs = tune.sample(10, kvdb, seed=1)
+        self.assertEqual(len(configs), 10)
+        self.assertEqual(len(set(configs)), 10)
+        self.assertListEqual(configs, tune.sample(10, kvdb, seed=1))
+        self.assertNotEqual(configs, tune.sample(10, kvdb, seed=2))
+        for config in configs:
+            self.assertEqual([p.split("=")[0] for p in config.kvdb], ["a", "b"])
+
+        # Small spaces are returned whole
+        self.assertCountEqual(
+            tune.sample(10, KVDB_PARAMS, KVS_PARAMS), tune.grid(KVDB_PARAMS, KVS_PARAMS)
+        )
+
+    def test_operations(self):
+        workload = tune.Workload(ops=1000, keys=50, reads=0.5, scans=0.2, seed=3)
+        ops, keys = tune._operations(workload)
+        self.assertEqual(tune._operations(workload), (ops, keys))
+        self.assertEqual(len(ops), 1000)
+        self.assertTrue(all(0 <= k < 50 for k in keys))
+        self.assertAlmostEqual(ops.count(tune._GET) / 1000, 0.5, delta=0.1)
+        self.assertAlmostEqual(ops.count(tune._SCAN) / 1000, 0.2, delta=0.1)
+
+        zipf = tune._operations(workload._replace(distribution="zipf"))[1]
+        self.assertGreater(zipf.count(0), zipf.count(49))
+
+    def test_sweep(self):
+        workload = tune.Workload(ops=200, keys=100, reads=0.5, scans=0.1)
+        configs = tune.grid(KVDB_PARAMS)
+        results = list(tune.sweep(workload, configs, directory=str(ARGS.home)))
+
+        self.assertListEqual([r.config for r in results], configs)
+        for r in results:
+            self.assertGreater(r.throughput, 0)
+            self.assertLessEqual(r.p50, r.p99)
+            self.assertLessEqual(r.p99, r.p999)
+            self.assertGreaterEqual(r.used_bytes, 0)
+        self.assertListEqual(os.listdir(ARGS.home), [])
+
+        self.assertIs(
+            tune.best(results, "throughput"), max(results, key=lambda r: r.throughput)
+        )
+        self.assertIs(tune.best(results, "p99"), min(results, key=lambda r: r.p99))
+        with self.assertRaises(ValueError):
+            tune.best(results, "latency")
+
+    def test_invalid_workload(self):
+        for workload in (
+            tune.Workload(ops=0),
+            tune.Workload(reads=0.8, scans=0.4),
+            tune.Workload(keys=1000, key_size=2),
+            tune.Workload(distribution="pareto"),
+        ):
+            with self.subTest(workload=workload):
+                with self.assertRaises(ValueError):
+                    tune.sweep(workload, [tune.Config()])
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+#
+# SPDX-FileCopyrightText: Copyright 2022 Micron Technology, Inc.
+
+import pickle
+import unittest
+
+from common import ARGS, UNKNOWN, HseTestCase, kvdb_fixture, kvs_fixture
+
+from hse3 import hse, values
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class CodecTests(unittest.TestCase):
+    def test_struct(self):
+        codec = values.StructCodec("<qd")
+        buf = codec.encode((1, 2.5))
+        self.assertIs(codec.encode((3, 4.5)), buf)
+        self.assertTupleEqual(codec.decode(bytes(buf)), (3, 4.5))
+
+    def test_abstract(self):
+        class EncodeOnly(values.Codec):
+            def encode(self, obj):
+                return obj
+
+        for cls in (values.Codec, EncodeOnly):
+            with self.subTest(cls=cls), self.assertRaises(TypeError):
+                cls()
+
+    @unittest.skipUnless(pickle.HIGHEST_PROTOCOL >= 5, "requires pickle protocol 5")
+    def test_pickle_out_of_band(self):
+        codec = values.PickleCodec()
+        obj = {"a": bytearray(b"x" * 1000), "b": [1, 2, 3]}
+        data = bytes(codec.encode(obj))
+        self.assertEqual(data.count(b"x" * 1000), 1)
+        self.assertDictEqual(codec.decode(data), obj)
+
+    def test_pickle_in_band(self):
+        codec = values.PickleCodec(protocol=4)
+        obj = {"a": bytearray(b"x" * 1000)}
+        self.assertDictEqual(codec.decode(bytes(codec.encode(obj))), obj)
+
+    @unittest.skipIf(msgpack is None, "requires msgpack")
+    def test_msgpack(self):
+        codec = values.MsgpackCodec()
+        obj = {"a": [1, 2, 3], "b": "c"}
+        self.assertDictEqual(codec.decode(bytes(codec.encode(obj))), obj)
+
+
+class KvsCodecTests(HseTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.kvdb = kvdb_fixture()
+        kvs_fixture(cls.kvdb, "kvs").close()
+        cls.kvs = cls.kvdb.kvs_open("kvs", codec=values.PickleCodec())
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.kvs.close()
+        cls.kvdb.kvs_drop("kvs")
+
+        cls.kvdb.close()
+        hse.Kvdb.drop(ARGS.home)
+
+        return super().tearDownClass()
+
+    def tearDown(self) -> None:
+        self.kvs.codec = values.PickleCodec()
+        self.kvs.prefix_delete("key")
+        return super().tearDown()
+
+    def test_put_get(self):
+        self.kvs.put_obj("keya", {"x": 1})
+        self.assertDictEqual(self.kvs.get_obj("keya"), {"x": 1})
+        self.assertIsNone(self.kvs.get_obj("keyb"))
+        self.assertEqual(self.kvs.get_obj("keyb", default=0), 0)
+
+        value, _ = self.kvs.get("keya")
+        self.assertDictEqual(self.kvs.codec.decode(value), {"x": 1})
+
+    def test_large_value(self):
+        # Larger than the initial size hint, forcing a second lookup
+        big = b"y" * 100000
+        self.kvs.put_obj("keya", big)
+        self.assertEqual(self.kvs.get_obj("keya"), big)
+        self.kvs.put_obj("keyb", 1)
+        self.assertEqual(self.kvs.get_obj("keyb"), 1)
+
+        # Small values shrink the hint again, and large ones still fit
+        for _ in range(8):
+            self.assertEqual(self.kvs.get_obj("keyb"), 1)
+        self.assertEqual(self.kvs.get_obj("keya"), big)
+
+    def test_bytes(self):
+        self.kvs.codec = values.BytesCodec()
+        self.kvs.put_obj("keya", bytearray(b"xyz"))
+        self.kvs.put_obj("keyb", b"")
+        self.assertEqual(self.kvs.get_obj("keya"), b"xyz")
+        self.assertEqual(self.kvs.get_obj("keyb"), b"")
+
+    def test_cursor(self):
+        self.kvs.codec = values.StructCodec("<ii")
+        for i in range(5):
+            self.kvs.put_obj(f"key{i}", (i, -i))
+
+        with self.kvs.cursor() as cursor:
+            items = list(cursor.items())
+        self.assertListEqual(items, [(f"key{i}".encode(), (i, -i)) for i in range(5)])
+
+        with self.kvs.cursor() as cursor:
+            cursor.codec = None
+            key, value = next(cursor.items())
+        self.assertEqual(key, b"key0")
+        self.assertEqual(value, bytes(8))
+
+    def test_no_codec(self):
+        self.kvs.codec = None
+        with self.assertRaises(ValueError):
+            self.kvs.put_obj("keya", 1)
+        with self.assertRaises(ValueError):
+            self.kvs.get_obj("keya")
+
+
+if __name__ == "__main__":
+    unittest.main(argv=UNKNOWN)